@@ -1,14 +1,41 @@
 # app.py - Review generation module (Gradio removed)
+import asyncio
 import json
-import requests
+import re
+import httpx
 import random
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 
+from llm_cache import llm_cache, cached_lookup, cached_lookup_async
+from rate_limiter import get_rate_limiter, estimate_request_tokens, retry_after_from_error
+from resilience import get_circuit_breaker, classify_error, is_account_error, PERMANENT, RATE_LIMITED
+from llm_providers import OpenAICompatibleProvider, register_provider, get_provider, build_messages, cache_model_key
+from sentiment import score_texts, rating_stars
+from review_synth import ReviewSynthesizer
+from name_sampler import LazyShuffle, NameSampler, register_name_pool, name_sampler
+
 # -------------------- CONFIG --------------------
 HF_API_KEY = "Your-Api-key"  # optional: replace with your key
-API_URL = "https://api.groq.com/openai/v1/chat/completions"
-HEADERS = {"Authorization": f"Bearer {HF_API_KEY}", "Content-Type": "application/json"}
+API_BASE_URL = "https://api.groq.com/openai/v1"
+REVIEW_MODEL = "llama-3.3-70b-versatile"
+REVIEW_TIMEOUT = httpx.Timeout(8.0, connect=2.0)   # kept tight: the local synthesizer covers failures
+
+# "remote": the review model writes reviews and the local synthesizer fills any that fail
+# "local": synthesizer only, no network (low-priority bulk runs); see review_synth.py
+REVIEW_SOURCE = "remote"
+
+# Batched mode asks for every review of a property in one JSON completion
+REVIEW_BATCH_MODE = True
+REVIEW_BATCH_TOKENS_PER_REVIEW = 110
+REVIEW_BATCH_TIMEOUT = httpx.Timeout(20.0, connect=2.0)
+
+# Per-review requests in flight at once (async pipeline and batched-mode fallbacks)
+REVIEW_MAX_IN_FLIGHT = 5
+
+# Reviews go through the shared provider layer (see llm_providers.py)
+if HF_API_KEY:
+    register_provider(OpenAICompatibleProvider("groq", "Groq", api_key=HF_API_KEY, base_url=API_BASE_URL))
 
 # -------------------- TEXT PARSER --------------------
 def parse_text_to_features(raw_text: str) -> dict:
@@ -56,13 +83,14 @@ def parse_text_to_features(raw_text: str) -> dict:
 
     # Extract common fields from overview (best-effort)
     overview = sections["overview"]
+    location = detect_location(overview)
     features = {
         "property_name": extract_field(overview, "Project Name:") or extract_field(overview, "Project:"),
         "project_name": extract_field(overview, "Project Name:") or extract_field(overview, "Project:"),
         "builder": extract_field(overview, "Builder:"),
         "location": extract_field(overview, "Location:") or sections["location"] or None,
-        "city": extract_city(overview),
-        "state": extract_state(overview),
+        "city": location["city"],
+        "state": location["state"],
         "address": extract_field(overview, "Location:") or None,
         "area": extract_field(overview, "Area Range:"),
         "launch_date": None,
@@ -89,32 +117,10 @@ def extract_field(text: str, key: str) -> Optional[str]:
         return None
 
 def extract_city(text: str) -> Optional[str]:
-    if not text:
-        return None
-    t = text.lower()
-    if "bangalore" in t or "bengaluru" in t:
-        return "Bangalore"
-    if "chennai" in t:
-        return "Chennai"
-    if "hyderabad" in t:
-        return "Hyderabad"
-    if "mumbai" in t:
-        return "Mumbai"
-    return None
+    return detect_location(text)["city"]
 
 def extract_state(text: str) -> Optional[str]:
-    if not text:
-        return None
-    t = text.lower()
-    if "bangalore" in t or "karnataka" in t:
-        return "Karnataka"
-    if "chennai" in t or "tamil nadu" in t:
-        return "Tamil Nadu"
-    if "hyderabad" in t or "telangana" in t:
-        return "Telangana"
-    if "mumbai" in t or "maharashtra" in t:
-        return "Maharashtra"
-    return None
+    return detect_location(text)["state"]
 
 # -------------------- REQUIRED FIELD CLEANER --------------------
 REQUIRED_FIELDS = {
@@ -171,35 +177,89 @@ def parse_date(date_str: Optional[str]) -> Optional[datetime.date]:
         return None
 
 # -------------------- REGION DETECTION --------------------
+# All-caps keywords (state abbreviations) match case-sensitively so "up" in prose is ignored
 REGION_KEYWORDS = {
     "tamil": ["tamil nadu", "chennai", "coimbatore", "madurai", "trichy", "salem", "vellore"],
     "kannada": ["karnataka", "bengaluru", "bangalore", "mysore", "mangalore"],
     "telugu": ["telangana", "andhra", "hyderabad", "visakhapatnam", "vizag"],
-    "hindi": ["delhi", "new delhi", "uttar pradesh", "up", "rajasthan", "madhya pradesh", "punjab", "haryana"],
+    "hindi": ["delhi", "new delhi", "uttar pradesh", "UP", "rajasthan", "madhya pradesh", "punjab", "haryana",
+              "noida", "greater noida", "ghaziabad", "gurgaon", "gurugram", "faridabad", "lucknow", "jaipur"],
     "marathi": ["maharashtra", "mumbai", "pune", "nagpur"],
     "bengali": ["west bengal", "kolkata", "howrah"],
     "kerala": ["kerala", "kochi", "kozhikode", "thiruvananthapuram", "trivandrum"],
     "gujarati": ["gujarat", "ahmedabad", "surat", "vadodara"]
 }
 
+# keyword -> (city, state); state keywords have no city
+LOCATION_PLACES = {
+    "tamil nadu": (None, "Tamil Nadu"), "chennai": ("Chennai", "Tamil Nadu"),
+    "coimbatore": ("Coimbatore", "Tamil Nadu"), "madurai": ("Madurai", "Tamil Nadu"),
+    "trichy": ("Trichy", "Tamil Nadu"), "salem": ("Salem", "Tamil Nadu"), "vellore": ("Vellore", "Tamil Nadu"),
+    "karnataka": (None, "Karnataka"), "bengaluru": ("Bangalore", "Karnataka"), "bangalore": ("Bangalore", "Karnataka"),
+    "mysore": ("Mysore", "Karnataka"), "mangalore": ("Mangalore", "Karnataka"),
+    "telangana": (None, "Telangana"), "andhra": (None, "Andhra Pradesh"), "hyderabad": ("Hyderabad", "Telangana"),
+    "visakhapatnam": ("Visakhapatnam", "Andhra Pradesh"), "vizag": ("Visakhapatnam", "Andhra Pradesh"),
+    "delhi": ("Delhi", "Delhi"), "new delhi": ("New Delhi", "Delhi"), "uttar pradesh": (None, "Uttar Pradesh"),
+    "UP": (None, "Uttar Pradesh"), "rajasthan": (None, "Rajasthan"), "madhya pradesh": (None, "Madhya Pradesh"),
+    "punjab": (None, "Punjab"), "haryana": (None, "Haryana"),
+    "noida": ("Noida", "Uttar Pradesh"), "greater noida": ("Greater Noida", "Uttar Pradesh"),
+    "ghaziabad": ("Ghaziabad", "Uttar Pradesh"), "gurgaon": ("Gurgaon", "Haryana"), "gurugram": ("Gurgaon", "Haryana"),
+    "faridabad": ("Faridabad", "Haryana"), "lucknow": ("Lucknow", "Uttar Pradesh"), "jaipur": ("Jaipur", "Rajasthan"),
+    "maharashtra": (None, "Maharashtra"), "mumbai": ("Mumbai", "Maharashtra"), "pune": ("Pune", "Maharashtra"),
+    "nagpur": ("Nagpur", "Maharashtra"),
+    "west bengal": (None, "West Bengal"), "kolkata": ("Kolkata", "West Bengal"), "howrah": ("Howrah", "West Bengal"),
+    "kerala": (None, "Kerala"), "kochi": ("Kochi", "Kerala"), "kozhikode": ("Kozhikode", "Kerala"),
+    "thiruvananthapuram": ("Thiruvananthapuram", "Kerala"), "trivandrum": ("Thiruvananthapuram", "Kerala"),
+    "gujarat": (None, "Gujarat"), "ahmedabad": ("Ahmedabad", "Gujarat"), "surat": ("Surat", "Gujarat"),
+    "vadodara": ("Vadodara", "Gujarat"),
+}
+
+def build_location_matcher():
+    """One compiled word-boundary alternation over every keyword, longest first"""
+    lookup = {}
+    for region, keywords in REGION_KEYWORDS.items():
+        for kw in keywords:
+            city, state = LOCATION_PLACES.get(kw, (None, None))
+            lookup[kw if kw.isupper() else kw.lower()] = (region, city, state)
+    alternatives = []
+    for kw in sorted(lookup, key=len, reverse=True):
+        escaped = r"\s+".join(re.escape(part) for part in kw.split())
+        alternatives.append(f"(?-i:{escaped})" if kw.isupper() else escaped)
+    pattern = re.compile(r"\b(?:" + "|".join(alternatives) + r")\b", re.IGNORECASE)
+    return pattern, lookup
+
+LOCATION_PATTERN, LOCATION_LOOKUP = build_location_matcher()
+
+def detect_location(*texts: Optional[str]) -> Dict[str, Optional[str]]:
+    """
+    Region, city and state from one scan of the given texts. Earlier texts win, so
+    pass structured fields (city_name, locality_name) before free text.
+    """
+    found = {"region": None, "city": None, "state": None}
+    text = " | ".join(str(t) for t in texts if t)
+    for match in LOCATION_PATTERN.finditer(text):
+        kw = match.group(0)
+        if not kw.isupper():
+            kw = " ".join(kw.lower().split())
+        entry = LOCATION_LOOKUP.get(kw)
+        if entry is None:
+            continue
+        for key, value in zip(("region", "city", "state"), entry):
+            if found[key] is None and value:
+                found[key] = value
+        if all(found.values()):
+            break
+    return found
+
 def detect_region_from_features(features: dict) -> str:
-    # features should be a dict — we flatten relevant fields into a string
+    # features should be a dict; structured PropInfo fields come first
     if not isinstance(features, dict):
         return "general"
-    fields = []
-    for k in ("location", "city", "state", "address", "area"):
-        v = features.get(k)
-        if v:
-            fields.append(str(v).lower())
-    text = " ".join(fields)
-    for region, kws in REGION_KEYWORDS.items():
-        for kw in kws:
-            if kw in text:
-                return region
-    return "general"
+    fields = [features.get(k) for k in ("city_name", "locality_name", "location", "city", "state", "address", "area")]
+    return detect_location(*fields)["region"] or "general"
 
 # -------------------- NAME POOLS --------------------
-# (full pools kept as in original - unchanged)
+# (full pools kept as in original; registered with name_sampler below)
 NAMES_BY_REGION = {
     "tamil": {
       "first": [
@@ -520,55 +580,124 @@ NAMES_BY_REGION = {
     }
 }
 
-def generate_unique_name(used_first: set, region: str) -> str:
-    region_pool = NAMES_BY_REGION.get(region, NAMES_BY_REGION["general"])
-    firsts = region_pool["first"]
-    lasts = region_pool["last"]
-    available = [f for f in firsts if f not in used_first]
-    if not available:
-        f = random.choice(firsts)
-        l = random.choice(lasts)
-        return f"{f}{random.randint(10,99)} {l}"
-    f = random.choice(available)
-    used_first.add(f)
-    l = random.choice(lasts)
-    return f"{f} {l}"
-
-# -------------------- UNIQUE REVIEW DATE --------------------
-def random_unique_review_date(launch_date: Optional[str], used_dates: set) -> str:
-    launch = parse_date(launch_date)
-    today = datetime.now().date()
-    if not launch or launch > today:
-        launch = today - timedelta(days=60)
-    delta = (today - launch).days
-    if delta < 1:
-        return today.strftime("%Y-%m-%d")
-    attempts = 0
-    while attempts < 200:
-        d = launch + timedelta(days=random.randint(0, delta))
-        s = d.strftime("%Y-%m-%d")
-        if s not in used_dates:
-            used_dates.add(s)
-            return s
-        attempts += 1
-    return today.strftime("%Y-%m-%d")
+# Deduplicated, frozen copies of the pools above; each property draws from its own sampler
+for _region, _pool in NAMES_BY_REGION.items():
+    register_name_pool(_region, _pool["first"], _pool["last"])
+
+# -------------------- UNIQUE REVIEW DATES --------------------
+REVIEW_DATE_DEFAULT_WINDOW_DAYS = 60   # window used when the launch date is unknown or in the future
+
+class ReviewDateAllocator:
+    """
+    Distinct review dates for one property. The launch window is parsed once and days
+    are drawn without replacement in O(1) each. Once every day of the window is taken
+    (window shorter than the review count), dates repeat round-robin from launch day,
+    so reviews spread evenly instead of piling onto today.
+    """
+
+    def __init__(self, launch_date: Optional[str]):
+        today = datetime.now().date()
+        launch = parse_date(launch_date)
+        if not launch or launch > today:
+            launch = today - timedelta(days=REVIEW_DATE_DEFAULT_WINDOW_DAYS)
+        self.start = launch
+        self.days = (today - launch).days + 1
+        self._order = LazyShuffle(self.days)
+        self._overflow = 0
+
+    def next_date(self) -> str:
+        if self._order.remaining():
+            offset = self._order.next_index()
+        else:
+            offset = self._overflow % self.days
+            self._overflow += 1
+        return (self.start + timedelta(days=offset)).strftime("%Y-%m-%d")
 
 # -------------------- HF CALL (safe) --------------------
-def call_hf(prompt: str, max_tokens: int = 140) -> Optional[str]:
-    # If no HF key, gracefully return None and use fallback
-    if not HF_API_KEY:
+def review_provider():
+    """Provider for the review model, or None (e.g. no key) so callers use the fallback"""
+    try:
+        return get_provider(REVIEW_MODEL)
+    except RuntimeError:
         return None
+
+def record_review_error(error: Exception, breaker, limiter) -> None:
+    kind = classify_error(error)
+    if kind == RATE_LIMITED:
+        # Quota pressure, not degradation: the endpoint answered
+        breaker.record_success()
+        retry_after = retry_after_from_error(error)
+        limiter.penalize(retry_after if retry_after is not None else 5.0)
+    elif kind != PERMANENT or is_account_error(error):
+        # Bad key / exhausted quota will never succeed; 5xx and timeouts mean the provider is degraded
+        breaker.record_failure()
+    else:
+        # A bad request is this prompt's fault, not the endpoint's
+        breaker.release_probe()
+
+def call_hf(prompt: str, max_tokens: int = 140, use_cache: bool = True, timeout: Any = REVIEW_TIMEOUT) -> Optional[str]:
+    # No provider for the review model (e.g. no key): gracefully return None and use fallback
+    provider = review_provider()
+    if provider is None:
+        return None
+    temperature = 0.8
+    cache_key, cached = cached_lookup(cache_model_key(provider, REVIEW_MODEL), prompt, temperature, max_tokens, use_cache)
+    if cached is not None:
+        return cached
+    # Fails fast to the fallback review while the endpoint keeps erroring
+    breaker = get_circuit_breaker(provider.label)
+    if not breaker.allow():
+        return None
+    limiter = get_rate_limiter(provider.name)
+    reserved_tokens = 0
     try:
-        payload = {
-            "model":"llama-3.3-70b-versatile",
-            "messages":[{"role":"user","content":prompt}],
-            "max_tokens": max_tokens,
-            "temperature": 0.8
-        }
-        r = requests.post(API_URL, headers=HEADERS, json=payload, timeout=20)
-        j = r.json()
-        return j.get("choices", [{}])[0].get("message", {}).get("content")
-    except Exception:
+        tokens = estimate_request_tokens(prompt, max_tokens)
+        limiter.acquire_sync(tokens)
+        reserved_tokens = tokens
+        result = provider.complete_sync(REVIEW_MODEL, build_messages(prompt), max_tokens, temperature, timeout)
+        breaker.record_success()
+        limiter.settle(reserved_tokens, (result["usage"] or {}).get("total_tokens"))
+        content = result["text"]
+        if cache_key and content:
+            llm_cache.set(cache_key, content)
+        return content
+    except Exception as e:
+        limiter.refund(reserved_tokens)
+        record_review_error(e, breaker, limiter)
+        return None
+
+async def call_hf_async(prompt: str, max_tokens: int = 140, use_cache: bool = True, timeout: Any = REVIEW_TIMEOUT) -> Optional[str]:
+    """Non-blocking call_hf over the provider's shared keep-alive pool"""
+    provider = review_provider()
+    if provider is None:
+        return None
+    temperature = 0.8
+    cache_key, cached = await cached_lookup_async(cache_model_key(provider, REVIEW_MODEL), prompt, temperature, max_tokens, use_cache)
+    if cached is not None:
+        return cached
+    breaker = get_circuit_breaker(provider.label)
+    if not breaker.allow():
+        return None
+    limiter = get_rate_limiter(provider.name)
+    reserved_tokens = 0
+    try:
+        tokens = estimate_request_tokens(prompt, max_tokens)
+        await limiter.acquire(tokens)
+        reserved_tokens = tokens
+        result = await provider.complete(REVIEW_MODEL, build_messages(prompt), max_tokens, temperature, timeout)
+        breaker.record_success()
+        limiter.settle(reserved_tokens, (result["usage"] or {}).get("total_tokens"))
+        content = result["text"]
+        if cache_key and content:
+            await llm_cache.aset(cache_key, content)
+        return content
+    except asyncio.CancelledError:
+        limiter.refund(reserved_tokens)
+        breaker.release_probe()
+        raise
+    except Exception as e:
+        limiter.refund(reserved_tokens)
+        record_review_error(e, breaker, limiter)
         return None
 
 # -------------------- LANGUAGE PROMPTS --------------------
@@ -600,36 +729,31 @@ def decide_review_mode(launch_date_str: Optional[str], possession_date_str: Opti
     return "general"
 
 # -------------------- SENTIMENT -> RATING --------------------
-POSITIVE_WORDS = {"good","great","excellent","love","nice","amazing","comfortable","super"}
-NEGATIVE_WORDS = {"bad","poor","noisy","dirty","delay","slow","problem","issue","disappointed"}
+# Scoring lives in sentiment.py; below this confidence the slot's intended sentiment decides
+RATING_MIN_CONFIDENCE = 0.3
+SENTIMENT_DEFAULT_RATING = {"positive": 4, "negative": 2}
 
 def rating_from_text(review_text: str) -> (int,str):
-    txt = (review_text or "").lower()
-    pos = any(w in txt for w in POSITIVE_WORDS)
-    neg = any(w in txt for w in NEGATIVE_WORDS)
-    if pos and not neg:
-        score = random.choice([4,5])
-    elif neg and not pos:
-        score = random.choice([1,2])
-    else:
-        score = random.choice([2,3,4])
-    stars = "⭐"*score + "☆"*(5-score)
-    return score, f"{stars} ({score}/5)"
+    ratings, _ = score_texts([review_text])
+    score = int(ratings[0])
+    return score, f"{rating_stars(score)} ({score}/5)"
 
 # -------------------- PROMPT BUILDER --------------------
+MODE_INSTRUCTIONS = {
+    "locality": "Focus on locality, neighbourhood and nearby conveniences.",
+    "amenities": "Focus on amenities (gym, pool, clubhouse, parking, security).",
+    "hand_over": "Talk about possession and handover experience.",
+    "under_construction": "Talk about construction status, expected completion and investment potential.",
+    "general": "Give a general, human-like review about the property.",
+}
+
+def sentiment_instruction(sentiment: str) -> str:
+    return "Tone: slightly critical, mention small issues." if sentiment == "negative" else "Tone: positive/neutral, not marketing."
+
 def build_prompt_for_mode(mode: str, lang: str, features: dict, sentiment: str) -> str:
     base_lang = LANG_PROMPTS.get(lang, LANG_PROMPTS["general"])
-    if mode == "locality":
-        mode_instr = "Focus on locality, neighbourhood and nearby conveniences."
-    elif mode == "amenities":
-        mode_instr = "Focus on amenities (gym, pool, clubhouse, parking, security)."
-    elif mode == "hand_over":
-        mode_instr = "Talk about possession and handover experience."
-    elif mode == "under_construction":
-        mode_instr = "Talk about construction status, expected completion and investment potential."
-    else:
-        mode_instr = "Give a general, human-like review about the property."
-    sentiment_instr = "Tone: slightly critical, mention small issues." if sentiment == "negative" else "Tone: positive/neutral, not marketing."
+    mode_instr = MODE_INSTRUCTIONS.get(mode, MODE_INSTRUCTIONS["general"])
+    sentiment_instr = sentiment_instruction(sentiment)
 
     return f"""{base_lang}
 {mode_instr}
@@ -642,60 +766,181 @@ Property details:
 Write a short 2-3 sentence review in simple Indian English. Only output the review text.
 """
 
-def generate_review_text(mode: str, lang: str, features: dict, sentiment: str) -> str:
+def build_batch_review_prompt(features: dict, slots: List[dict]) -> str:
+    """One prompt asking for every review slot at once; the property context is sent a single time"""
+    slot_lines = []
+    for idx, slot in enumerate(slots, 1):
+        slot_lines.append(
+            f"Slot {idx}: {LANG_PROMPTS.get(slot['lang'], LANG_PROMPTS['general'])} "
+            f"{MODE_INSTRUCTIONS.get(slot['mode'], MODE_INSTRUCTIONS['general'])} "
+            f"{sentiment_instruction(slot['sentiment'])}"
+        )
+    slot_text = "\n".join(slot_lines)
+
+    return f"""Write {len(slots)} different short customer reviews of the property below, one per slot.
+Each review is 2-3 sentences in simple Indian English and follows its slot's instructions.
+Do not repeat sentences across reviews.
+
+Property details:
+{json.dumps(features, ensure_ascii=False, separators=(",", ":"))}
+
+Slots:
+{slot_text}
+
+Output JSON only, no markdown, exactly one object per slot:
+[{{"slot": 1, "review": "review text"}}, {{"slot": 2, "review": "review text"}}]
+"""
+
+BATCH_REVIEW_ITEM_PATTERN = re.compile(r'"slot"\s*:\s*(\d+)\s*,\s*"review"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+def parse_batch_reviews(text: Optional[str], count: int) -> Dict[int, str]:
+    """Map slot number -> review text; slots that are missing or malformed are left out"""
+    if not text:
+        return {}
+    cleaned = text.strip()
+    if cleaned.startswith("```"):
+        cleaned = cleaned.strip("`")
+        if cleaned.startswith("json"):
+            cleaned = cleaned[4:]
+    reviews: Dict[int, str] = {}
+    try:
+        items = json.loads(cleaned)
+        if isinstance(items, list):
+            for position, item in enumerate(items, 1):
+                if isinstance(item, dict):
+                    slot, review = item.get("slot", position), item.get("review")
+                else:
+                    slot, review = position, item
+                if isinstance(slot, int) and isinstance(review, str) and review.strip():
+                    reviews[slot] = review.strip()
+    except (ValueError, TypeError):
+        # Truncated or slightly malformed JSON: salvage the complete objects
+        for match in BATCH_REVIEW_ITEM_PATTERN.finditer(cleaned):
+            try:
+                review = json.loads(f'"{match.group(2)}"')
+            except ValueError:
+                continue
+            if review.strip():
+                reviews[int(match.group(1))] = review.strip()
+    return {slot: review for slot, review in reviews.items() if 1 <= slot <= count}
+
+def generate_review_text(mode: str, lang: str, features: dict, sentiment: str) -> Optional[str]:
+    """Review from the remote model, or None so build_reviews synthesizes one locally"""
     prompt = build_prompt_for_mode(mode, lang, features, sentiment)
     text = call_hf(prompt, max_tokens=140)
     if text and isinstance(text, str) and text.strip():
         return text.strip()
-    # fallback simple English summary
-    fallback = f"Good project by {features.get('builder') or 'the builder'}. Nice location and amenities. Worth considering."
-    if lang != "general":
-        # keep fallback short romanised hint (best-effort)
-        return fallback
-    return fallback
+    return None
+
+async def generate_review_text_async(mode: str, lang: str, features: dict, sentiment: str) -> Optional[str]:
+    prompt = build_prompt_for_mode(mode, lang, features, sentiment)
+    text = await call_hf_async(prompt, max_tokens=140)
+    if text and isinstance(text, str) and text.strip():
+        return text.strip()
+    return None
 
 # -------------------- SINGLE REVIEW GENERATION --------------------
-def generate_single_review(features: dict, used_first_names: set, used_dates: set, detected_region: str) -> dict:
+def plan_review_slot(features: dict, names: NameSampler, dates: ReviewDateAllocator, detected_region: str) -> dict:
+    """Pick reviewer, date, language, mode and sentiment for one review"""
     # choose language: 10% regional, 90% english
     lang = detected_region if (detected_region != "general" and random.random() < 0.10) else "general"
 
-    # generate full name → "First Last"
-    full_name = generate_unique_name(used_first_names, detected_region)
-
-    # split into firstname + lastname
-    try:
-        first_name, last_name = full_name.split(" ", 1)
-    except:
-        first_name = full_name
-        last_name = ""
-
-    review_date = random_unique_review_date(features.get("launch_date"), used_dates)
-    mode = decide_review_mode(features.get("launch_date"), features.get("possession_date"))
-    sentiment = random.choices(["positive", "negative"], weights=[0.75, 0.25])[0]
-    review_text = generate_review_text(mode, lang, features, sentiment)
-    rating_val, rating_ui = rating_from_text(review_text)
+    # reviewer name, first name distinct within the property
+    first_name, last_name = names.next_name()
 
     return {
         "first_name": first_name,
         "last_name": last_name,
-        "date": review_date,
-        "rating_value": rating_val,
-        "review": review_text
+        "date": dates.next_date(),
+        "mode": decide_review_mode(features.get("launch_date"), features.get("possession_date")),
+        "lang": lang,
+        "sentiment": random.choices(["positive", "negative"], weights=[0.75, 0.25])[0],
     }
 
+def build_reviews(features: dict, slots: List[dict], review_texts: List[Optional[str]]) -> List[dict]:
+    """
+    Review dicts for planned slots. Missing texts (remote failure or local mode) come
+    from the template synthesizer; all texts are rated in one scoring call.
+    """
+    if not all(review_texts):
+        synth = ReviewSynthesizer(features)
+        review_texts = [
+            text or synth.compose(slot["mode"], slot["sentiment"], slot["lang"])
+            for slot, text in zip(slots, review_texts)
+        ]
+    ratings, confidence = score_texts(review_texts)
+    reviews = []
+    for slot, review_text, rating, conf in zip(slots, review_texts, ratings, confidence):
+        rating_val = int(rating)
+        if conf < RATING_MIN_CONFIDENCE:
+            rating_val = SENTIMENT_DEFAULT_RATING.get(slot["sentiment"], rating_val)
+        reviews.append({
+            "first_name": slot["first_name"],
+            "last_name": slot["last_name"],
+            "date": slot["date"],
+            "rating_value": rating_val,
+            "review": review_text
+        })
+    return reviews
 
-# -------------------- MULTI REVIEW GENERATOR (TEXT INPUT) --------------------
-def generate_reviews_from_text(raw_text: str, count: int):
+def generate_single_review(features: dict, names: NameSampler, dates: ReviewDateAllocator, detected_region: str) -> dict:
+    slot = plan_review_slot(features, names, dates, detected_region)
+    review_text = generate_review_text(slot["mode"], slot["lang"], features, slot["sentiment"])
+    return build_reviews(features, [slot], [review_text])[0]
+
+# -------------------- BATCHED REVIEW GENERATION --------------------
+def generate_reviews_batched(features: dict, count: int, names: NameSampler, dates: ReviewDateAllocator, detected_region: str) -> List[dict]:
+    """All reviews from one JSON completion; only slots that fail to parse get their own call"""
+    slots = [plan_review_slot(features, names, dates, detected_region) for _ in range(count)]
+    prompt = build_batch_review_prompt(features, slots)
+    text = call_hf(prompt, max_tokens=REVIEW_BATCH_TOKENS_PER_REVIEW * count + 60, timeout=REVIEW_BATCH_TIMEOUT)
+    parsed = parse_batch_reviews(text, count)
+
+    texts = [
+        parsed.get(idx) or generate_review_text(slot["mode"], slot["lang"], features, slot["sentiment"])
+        for idx, slot in enumerate(slots, 1)
+    ]
+    return build_reviews(features, slots, texts)
+
+
+# -------------------- CONCURRENT REVIEW GENERATION --------------------
+async def generate_review_texts_concurrently(features: dict, slots: List[dict], max_in_flight: int = REVIEW_MAX_IN_FLIGHT) -> List[Optional[str]]:
     """
-    Returns:
-      - json_str (stringified list)
-      - reviews (list of dicts)
-    This maintains backward compatibility with the original Gradio wrapper.
+    One request per slot, at most max_in_flight at a time. Slots (names, dates) are
+    planned before any request starts, so the uniqueness guarantees are unchanged.
     """
-    # parse -> features dict
-    parsed = parse_text_to_features(raw_text)
-    features = clean_input_json(parsed)
+    semaphore = asyncio.Semaphore(max(1, max_in_flight))
+
+    async def run(slot: dict) -> str:
+        async with semaphore:
+            return await generate_review_text_async(slot["mode"], slot["lang"], features, slot["sentiment"])
+
+    return list(await asyncio.gather(*[run(slot) for slot in slots]))
 
+async def generate_reviews_concurrently(features: dict, slots: List[dict], max_in_flight: int = REVIEW_MAX_IN_FLIGHT) -> List[dict]:
+    texts = await generate_review_texts_concurrently(features, slots, max_in_flight)
+    return build_reviews(features, slots, texts)
+
+async def generate_reviews_batched_async(features: dict, slots: List[dict]) -> List[dict]:
+    """Async batched mode: one JSON completion, failed slots retried concurrently"""
+    count = len(slots)
+    text = await call_hf_async(
+        build_batch_review_prompt(features, slots),
+        max_tokens=REVIEW_BATCH_TOKENS_PER_REVIEW * count + 60,
+        timeout=REVIEW_BATCH_TIMEOUT
+    )
+    parsed = parse_batch_reviews(text, count)
+
+    missing = [slot for idx, slot in enumerate(slots, 1) if not parsed.get(idx)]
+    retried = iter(await generate_review_texts_concurrently(features, missing)) if missing else iter(())
+    texts = [parsed.get(idx) or next(retried) for idx in range(1, count + 1)]
+    return build_reviews(features, slots, texts)
+
+# -------------------- MULTI REVIEW GENERATOR --------------------
+REVIEW_FEATURE_LIST_LIMIT = 12   # amenities / highlights sent to the review prompt
+
+def finalize_review_features(features: dict):
+    """Normalize dates and detect the region once for a features dict"""
     # normalize dates if present
     if features.get("launch_date"):
         features["launch_date"] = normalize_date(features["launch_date"])
@@ -704,15 +949,91 @@ def generate_reviews_from_text(raw_text: str, count: int):
 
     # detect region once from features
     detected_region = detect_region_from_features(features)
+    return features, detected_region
 
-    used_first = set()
-    used_dates = set()
-    reviews = []
-    for _ in range(max(1, int(count))):
-        reviews.append(generate_single_review(features, used_first, used_dates, detected_region))
+def features_from_transformed(data: dict) -> dict:
+    """Review features straight from the dict DataTransformer.transform produced"""
+    location = data.get("location")
+    place = detect_location(data.get("city_name"), data.get("locality_name"), location)
+    amenities = [str(a) for a in (data.get("amenities") or []) if a][:REVIEW_FEATURE_LIST_LIMIT]
+    highlights = [str(h) for h in (data.get("highlights") or []) if h][:REVIEW_FEATURE_LIST_LIMIT]
 
-    return json.dumps(reviews, indent=2, ensure_ascii=False), reviews
+    features = clean_input_json({
+        "property_name": data.get("project_name"),
+        "project_name": data.get("project_name"),
+        "builder": data.get("builder"),
+        "location": location,
+        "city": data.get("city_name") or place["city"],
+        "state": place["state"],
+        "address": location,
+        "area": data.get("area_range"),
+        "launch_date": None,
+        "possession_date": data.get("possession_date"),
+        "amenities": ", ".join(amenities) or ", ".join(highlights) or None,
+        "highlights": ", ".join(highlights) or None,
+        "project_type": "Residential",
+    })
+    features["city_name"] = data.get("city_name")
+    features["locality_name"] = data.get("locality_name")
+    return features
 
-# Module ends here. This file is intended to be imported by main.py
+def prepare_review_features(raw_text: str, city_name: Optional[str] = None, locality_name: Optional[str] = None):
+    """Compatibility path: parse === SECTION === text into a features dict"""
+    # parse -> features dict
+    parsed = parse_text_to_features(raw_text)
+    features = clean_input_json(parsed)
+    features["city_name"] = city_name
+    features["locality_name"] = locality_name
+    return finalize_review_features(features)
+
+def generate_reviews_for_features(features: dict, detected_region: str, count: int, source: Optional[str] = None) -> List[dict]:
+    names = name_sampler(detected_region)
+    dates = ReviewDateAllocator(features.get("launch_date"))
+    count = max(1, int(count))
+    if (source or REVIEW_SOURCE) == "local":
+        slots = [plan_review_slot(features, names, dates, detected_region) for _ in range(count)]
+        return build_reviews(features, slots, [None] * count)
+    if REVIEW_BATCH_MODE:
+        return generate_reviews_batched(features, count, names, dates, detected_region)
+    slots = [plan_review_slot(features, names, dates, detected_region) for _ in range(count)]
+    texts = [generate_review_text(slot["mode"], slot["lang"], features, slot["sentiment"]) for slot in slots]
+    return build_reviews(features, slots, texts)
 
+async def generate_reviews_for_features_async(features: dict, detected_region: str, count: int, source: Optional[str] = None) -> List[dict]:
+    names = name_sampler(detected_region)
+    dates = ReviewDateAllocator(features.get("launch_date"))
+    slots = [plan_review_slot(features, names, dates, detected_region) for _ in range(max(1, int(count)))]
+    if (source or REVIEW_SOURCE) == "local":
+        return build_reviews(features, slots, [None] * len(slots))
+    if REVIEW_BATCH_MODE:
+        return await generate_reviews_batched_async(features, slots)
+    return await generate_reviews_concurrently(features, slots)
 
+def generate_reviews_from_features(data: dict, count: int, source: Optional[str] = None) -> List[dict]:
+    """Reviews for a property from its DataTransformer.transform output (source overrides REVIEW_SOURCE)"""
+    features, detected_region = finalize_review_features(features_from_transformed(data))
+    return generate_reviews_for_features(features, detected_region, count, source)
+
+async def generate_reviews_from_features_async(data: dict, count: int, source: Optional[str] = None) -> List[dict]:
+    """Async variant of generate_reviews_from_features: requests issued concurrently"""
+    features, detected_region = finalize_review_features(features_from_transformed(data))
+    return await generate_reviews_for_features_async(features, detected_region, count, source)
+
+def generate_reviews_from_text(raw_text: str, count: int, city_name: Optional[str] = None, locality_name: Optional[str] = None):
+    """
+    Returns:
+      - json_str (stringified list)
+      - reviews (list of dicts)
+    This maintains backward compatibility with the original Gradio wrapper.
+    """
+    features, detected_region = prepare_review_features(raw_text, city_name, locality_name)
+    reviews = generate_reviews_for_features(features, detected_region, count)
+    return json.dumps(reviews, indent=2, ensure_ascii=False), reviews
+
+async def generate_reviews_from_text_async(raw_text: str, count: int, city_name: Optional[str] = None, locality_name: Optional[str] = None):
+    """Async variant of generate_reviews_from_text: same return value, requests issued concurrently"""
+    features, detected_region = prepare_review_features(raw_text, city_name, locality_name)
+    reviews = await generate_reviews_for_features_async(features, detected_region, count)
+    return json.dumps(reviews, indent=2, ensure_ascii=False), reviews
+
+# Module ends here. This file is intended to be imported by main.py
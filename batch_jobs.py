@@ -0,0 +1,510 @@
+# batch_jobs.py - Bulk batch-job mode for catalog-scale regeneration
+"""
+Turns a file of IncomingPropertyData payloads into a JSONL file of chat completion
+requests (one SEO prompt and one FAQ prompt per property, plus one locality FAQ
+prompt per uncached locality), submits it through a batch-style provider and, once
+the job is complete, fans the results back through
+extract_sections -> format_output -> send_to_company_api.
+
+Bulk backfills go through the batch provider instead of /process-property, so they
+do not compete with interactive traffic for the realtime rate limit.
+
+Usage:
+    python batch_jobs.py prepare payloads.jsonl        # -> job id
+    python batch_jobs.py submit <job_id> [--provider local|openai]
+    python batch_jobs.py status <job_id>
+    python batch_jobs.py collect <job_id> [--no-send] [--reviews local|remote]
+    python batch_jobs.py run payloads.jsonl            # all of the above, local provider
+
+Job files live in batch_jobs/<job_id>/:
+    input.jsonl     one request per line ({"custom_id", "method", "url", "body"})
+    manifest.json   payloads and the custom_ids that belong to each property
+    output.jsonl    one result per line ({"custom_id", "response", "error"})
+    status.json     provider, batch id and state
+"""
+import argparse
+import asyncio
+import json
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from main import (
+    OPENAI_MODEL,
+    IncomingPropertyData,
+    DataTransformer,
+    SEO_SECTIONS,
+    get_sections_to_generate,
+    get_existing_content,
+    get_fallback_seo_text_from_payload,
+    create_optimized_prompt,
+    create_faq_prompt,
+    SEO_SYSTEM_PROMPT,
+    FAQ_SYSTEM_PROMPT,
+    plan_output_budget,
+    plan_faq_budget,
+    generate_with_openai,
+    clean_generated_content,
+    extract_sections,
+    plan_locality_faq_budget,
+    assemble_faqs,
+    generate_reviews,
+    format_output,
+    save_generated_data,
+    index_generated_data,
+    send_to_company_api,
+    openai_client,
+)
+from llm_providers import build_messages
+from faq_engine import (
+    LOCALITY_FAQ_SYSTEM_PROMPT,
+    create_locality_faq_prompt,
+    generic_locality_faqs,
+    get_cached_locality_faqs,
+    get_cached_locality_faqs_async,
+    locality_key,
+    parse_faq_json,
+    store_locality_faqs,
+)
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIG --------------------
+BATCH_JOBS_DIR = "batch_jobs"
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+SEO_TEMPERATURE = 0.8
+FAQ_TEMPERATURE = 0.8
+LOCALITY_FAQ_TEMPERATURE = 0.7
+LOCAL_BATCH_CONCURRENCY = 2      # the local stand-in trickles requests so it never crowds realtime traffic
+COLLECT_CONCURRENCY = 4          # properties finalized (reviews + callback) at once
+BATCH_REVIEW_SOURCE = "local"    # bulk runs use the offline review synthesizer (see review_synth.py)
+
+# Called as complete(prompt, system_prompt, max_tokens, temperature) -> completion text
+CompletionFunction = Callable[[str, Optional[str], int, float], Awaitable[str]]
+
+
+# -------------------- JOB FILES --------------------
+def job_dir(job_id: str) -> Path:
+    return Path(BATCH_JOBS_DIR) / job_id
+
+def read_json(path: Path) -> Any:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def write_json(path: Path, data: Any) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+def read_jsonl(path: Path) -> List[Dict[str, Any]]:
+    rows = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                rows.append(json.loads(line))
+    return rows
+
+def write_jsonl(path: Path, rows: List[Dict[str, Any]]) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+def update_status(job_id: str, **fields) -> Dict[str, Any]:
+    path = job_dir(job_id) / "status.json"
+    status = read_json(path) if path.exists() else {"job_id": job_id}
+    status.update(fields)
+    status["updated_at"] = datetime.now().isoformat()
+    write_json(path, status)
+    return status
+
+def load_payloads(payload_file: str) -> List[Dict[str, Any]]:
+    """Read payloads from a JSON list, a single JSON object or a JSONL file"""
+    text = Path(payload_file).read_text(encoding='utf-8').strip()
+    if not text:
+        return []
+    try:
+        data = json.loads(text)
+        return data if isinstance(data, list) else [data]
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+# -------------------- PREPARE --------------------
+def build_batch_request(
+    custom_id: str,
+    system_prompt: str,
+    prompt: str,
+    budget: Dict[str, Any],
+    temperature: float
+) -> Dict[str, Any]:
+    """One line of the batch input file (OpenAI Batch API request format)"""
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": {
+            "model": OPENAI_MODEL,
+            "messages": build_messages(prompt, system_prompt),
+            "max_tokens": budget['max_tokens'],
+            "temperature": temperature,
+        },
+    }
+
+def prepare_batch_job(payload_file: str) -> str:
+    """Validate payloads, build the SEO and FAQ prompts and write the job's input file"""
+    payloads = load_payloads(payload_file)
+    job_id = datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+    directory = job_dir(job_id)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    requests_out = []
+    properties = []
+    locality_ids: Dict[str, str] = {}    # one locality FAQ request per uncached locality in the job
+    for index, body_data in enumerate(payloads):
+        entry = {"index": index, "payload": body_data, "sections": [], "seo_id": None, "faq_id": None,
+                 "locality_faq_id": None, "error": None}
+        properties.append(entry)
+        try:
+            transformed_data = DataTransformer.transform(IncomingPropertyData(**body_data))
+        except Exception as e:
+            logger.error(f"❌ Payload {index} failed validation: {e}")
+            entry["error"] = f"Validation error: {str(e)}"
+            continue
+
+        entry["propid"] = transformed_data.get('propertyID')
+        sections = get_sections_to_generate(transformed_data)
+        entry["sections"] = sections
+
+        if sections:
+            entry["seo_id"] = f"prop-{index}-seo"
+            requests_out.append(build_batch_request(
+                entry["seo_id"],
+                SEO_SYSTEM_PROMPT,
+                create_optimized_prompt(transformed_data),
+                plan_output_budget(sections),
+                SEO_TEMPERATURE
+            ))
+
+        # The FAQ request cannot wait for the SEO result in the same batch, so it is
+        # grounded on the existing description (or the payload fallback text)
+        seo_context = transformed_data.get('property_description') or get_fallback_seo_text_from_payload(body_data)
+        entry["faq_id"] = f"prop-{index}-faq"
+        requests_out.append(build_batch_request(
+            entry["faq_id"],
+            FAQ_SYSTEM_PROMPT,
+            create_faq_prompt(transformed_data, seo_context),
+            plan_faq_budget(),
+            FAQ_TEMPERATURE
+        ))
+
+        locality = locality_key(transformed_data)
+        if locality and get_cached_locality_faqs(transformed_data) is None:
+            if locality not in locality_ids:
+                locality_ids[locality] = f"locality-{len(locality_ids)}"
+                requests_out.append(build_batch_request(
+                    locality_ids[locality],
+                    LOCALITY_FAQ_SYSTEM_PROMPT,
+                    create_locality_faq_prompt(transformed_data),
+                    plan_locality_faq_budget(),
+                    LOCALITY_FAQ_TEMPERATURE
+                ))
+            entry["locality_faq_id"] = locality_ids[locality]
+
+    write_jsonl(directory / "input.jsonl", requests_out)
+    write_json(directory / "manifest.json", {"source": str(payload_file), "properties": properties})
+    update_status(job_id, state="prepared", requests=len(requests_out), properties=len(properties))
+
+    logger.info(f"📦 Prepared batch job {job_id}: {len(properties)} properties, {len(requests_out)} requests")
+    return job_id
+
+
+# -------------------- PROVIDERS --------------------
+class BatchProvider(ABC):
+    """Submits a batch input file and hands back the output file once the job is done"""
+
+    name = "base"
+
+    @abstractmethod
+    async def submit(self, input_path: Path) -> str:
+        """Start the job and return the provider's batch id"""
+
+    @abstractmethod
+    async def status(self, batch_id: str) -> str:
+        """One of: in_progress, completed, failed"""
+
+    @abstractmethod
+    async def fetch_results(self, batch_id: str, output_path: Path) -> None:
+        """Write the provider's results to output_path as JSONL"""
+
+
+async def complete_with_openai(prompt: str, system_prompt: Optional[str], max_tokens: int, temperature: float) -> str:
+    return await generate_with_openai(prompt, max_tokens=max_tokens, temperature=temperature, system_prompt=system_prompt)
+
+
+class LocalFileBatchProvider(BatchProvider):
+    """
+    File-based stand-in for a batch API: runs the input file through a completion
+    function with low concurrency and writes results in the batch output format.
+    """
+
+    name = "local"
+
+    def __init__(self, complete: Optional[CompletionFunction] = None, concurrency: int = LOCAL_BATCH_CONCURRENCY):
+        self.complete = complete or complete_with_openai
+        self.concurrency = concurrency
+
+    async def run_request(self, request: Dict[str, Any], semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        body = request["body"]
+        messages = body["messages"]
+        system_prompt = messages[0]["content"] if messages[0]["role"] == "system" else None
+        async with semaphore:
+            try:
+                content = await self.complete(messages[-1]["content"], system_prompt, body["max_tokens"], body["temperature"])
+                return {
+                    "custom_id": request["custom_id"],
+                    "response": {"status_code": 200, "body": {"choices": [{"message": {"content": content}}]}},
+                    "error": None,
+                }
+            except Exception as e:
+                logger.error(f"❌ Batch request {request['custom_id']} failed: {e}")
+                return {"custom_id": request["custom_id"], "response": None, "error": {"message": str(e)}}
+
+    async def submit(self, input_path: Path) -> str:
+        requests_in = read_jsonl(input_path)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        logger.info(f"🗂️ Local batch: running {len(requests_in)} requests ({self.concurrency} at a time)")
+        results = await asyncio.gather(*[self.run_request(r, semaphore) for r in requests_in])
+
+        result_path = input_path.with_name("local_results.jsonl")
+        write_jsonl(result_path, results)
+        return str(result_path)
+
+    async def status(self, batch_id: str) -> str:
+        return "completed" if Path(batch_id).exists() else "failed"
+
+    async def fetch_results(self, batch_id: str, output_path: Path) -> None:
+        if Path(batch_id) != output_path:
+            Path(batch_id).replace(output_path)
+
+
+class OpenAIBatchProvider(BatchProvider):
+    """OpenAI Batch API: separate quota from realtime calls, results within the completion window"""
+
+    name = "openai"
+
+    async def submit(self, input_path: Path) -> str:
+        with open(input_path, 'rb') as f:
+            uploaded = await openai_client.files.create(file=f, purpose="batch")
+        batch = await openai_client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=BATCH_COMPLETION_WINDOW
+        )
+        logger.info(f"📤 Submitted OpenAI batch {batch.id} (file {uploaded.id})")
+        return batch.id
+
+    async def status(self, batch_id: str) -> str:
+        batch = await openai_client.batches.retrieve(batch_id)
+        if batch.status == "completed":
+            return "completed"
+        if batch.status in ("failed", "expired", "cancelled"):
+            return "failed"
+        return "in_progress"
+
+    async def fetch_results(self, batch_id: str, output_path: Path) -> None:
+        batch = await openai_client.batches.retrieve(batch_id)
+        if not batch.output_file_id:
+            raise RuntimeError(f"Batch {batch_id} has no output file")
+        content = await openai_client.files.content(batch.output_file_id)
+        output_path.write_bytes(content.content)
+
+
+BATCH_PROVIDERS = {
+    "local": LocalFileBatchProvider,
+    "openai": OpenAIBatchProvider,
+}
+
+def get_batch_provider(name: str) -> BatchProvider:
+    if name not in BATCH_PROVIDERS:
+        raise RuntimeError(f"Unknown batch provider '{name}' (choose from {', '.join(BATCH_PROVIDERS)})")
+    return BATCH_PROVIDERS[name]()
+
+
+# -------------------- SUBMIT / STATUS --------------------
+async def submit_batch_job(job_id: str, provider: BatchProvider) -> str:
+    update_status(job_id, state="submitting", provider=provider.name)
+    batch_id = await provider.submit(job_dir(job_id) / "input.jsonl")
+    update_status(job_id, state="submitted", batch_id=batch_id)
+    return batch_id
+
+async def check_batch_job(job_id: str, provider: Optional[BatchProvider] = None) -> str:
+    """Poll the provider and download the output file once the job is complete"""
+    status = read_json(job_dir(job_id) / "status.json")
+    if status.get("state") in ("completed", "collected"):
+        return status["state"]
+    if not status.get("batch_id"):
+        return status.get("state", "unknown")
+
+    provider = provider or get_batch_provider(status.get("provider", "local"))
+    state = await provider.status(status["batch_id"])
+    if state == "completed":
+        await provider.fetch_results(status["batch_id"], job_dir(job_id) / "output.jsonl")
+    update_status(job_id, state=state)
+    return state
+
+
+# -------------------- COLLECT --------------------
+def completion_text(result: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Completion text from one batch output line, or None if the request failed"""
+    if not result or result.get("error"):
+        return None
+    response = result.get("response") or {}
+    if response.get("status_code") != 200:
+        return None
+    try:
+        return response["body"]["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        return None
+
+def build_generated_content(transformed_data: Dict[str, Any], sections: List[str], seo_text: Optional[str]) -> Dict[str, Any]:
+    """Map a combined SEO completion onto the same dict generate_seo_content returns"""
+    generated_content = get_existing_content(transformed_data)
+    if not sections:
+        generated_content['generation_skipped'] = True
+        return generated_content
+
+    cleaned = clean_generated_content(seo_text) if seo_text else ""
+    extracted = extract_sections(cleaned, sections) if cleaned else {}
+    for name, flag, result_key in SEO_SECTIONS:
+        if transformed_data.get(flag) and cleaned:
+            content = extracted.get(name)
+            generated_content[result_key] = clean_generated_content(content) if content else None
+    generated_content['generation_skipped'] = False
+    return generated_content
+
+async def finalize_property(entry: Dict[str, Any], results: Dict[str, Dict[str, Any]], send: bool,
+                            review_source: str = BATCH_REVIEW_SOURCE) -> Dict[str, Any]:
+    """Turn one property's batch results into the callback payload and deliver it"""
+    body_data = entry["payload"]
+    if entry.get("error"):
+        prop_info = body_data.get('prop_info') if isinstance(body_data, dict) else None
+        prop = prop_info[0] if isinstance(prop_info, list) and prop_info and isinstance(prop_info[0], dict) else {}
+        formatted_output = {
+            "propid": prop.get('propertyID'),
+            "prop_name": prop.get('propertyName'),
+            "error_note": entry["error"]
+        }
+    else:
+        transformed_data = DataTransformer.transform(IncomingPropertyData(**body_data))
+
+        seo_error = None
+        seo_text = completion_text(results.get(entry["seo_id"])) if entry["seo_id"] else None
+        if entry["seo_id"] and not seo_text:
+            seo_error = (results.get(entry["seo_id"]) or {}).get("error") or "missing from batch output"
+            seo_error = f"Content generation failed: {seo_error}"
+            logger.error(f"❌ Property {entry.get('propid')}: {seo_error}")
+        generated_content = build_generated_content(transformed_data, entry["sections"], seo_text)
+
+        property_faqs = []
+        faq_text = completion_text(results.get(entry["faq_id"]))
+        if faq_text:
+            try:
+                property_faqs = parse_faq_json(faq_text)
+            except Exception as e:
+                logger.error(f"❌ FAQ parsing failed for property {entry.get('propid')}: {e}")
+
+        # Properties sharing a locality share one completion; the first one parsed is cached
+        locality_faqs = await get_cached_locality_faqs_async(transformed_data)
+        locality_text = completion_text(results.get(entry["locality_faq_id"])) if entry.get("locality_faq_id") else None
+        if locality_faqs is None and locality_text:
+            try:
+                locality_faqs = await store_locality_faqs(transformed_data, locality_text)
+            except Exception as e:
+                logger.error(f"❌ Locality FAQ parsing failed for property {entry.get('propid')}: {e}")
+        faqs = assemble_faqs(transformed_data, property_faqs, locality_faqs or generic_locality_faqs(transformed_data))
+
+        reviews = await generate_reviews(transformed_data, count=10, source=review_source)
+
+        formatted_output = format_output(transformed_data, generated_content, reviews, faqs, error_note=seo_error)
+
+    save_generated_data(formatted_output)
+    await index_generated_data(formatted_output)
+    if send:
+        callback_result = await send_to_company_api(formatted_output)
+        logger.info(f"📡 Callback result for {formatted_output.get('propid')}: {callback_result}")
+    return formatted_output
+
+async def collect_batch_job(job_id: str, send: bool = True, review_source: str = BATCH_REVIEW_SOURCE) -> List[Dict[str, Any]]:
+    """Fan the completed job's results back out to every property's callback"""
+    directory = job_dir(job_id)
+    output_path = directory / "output.jsonl"
+    if not output_path.exists():
+        raise RuntimeError(f"Batch job {job_id} has no output yet (state: {read_json(directory / 'status.json').get('state')})")
+
+    results = {row["custom_id"]: row for row in read_jsonl(output_path)}
+    properties = read_json(directory / "manifest.json")["properties"]
+    semaphore = asyncio.Semaphore(COLLECT_CONCURRENCY)
+
+    async def run(entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            try:
+                return await finalize_property(entry, results, send, review_source)
+            except Exception as e:
+                logger.error(f"❌ Failed to finalize property {entry.get('propid')}: {e}")
+                return None
+
+    outputs = await asyncio.gather(*[run(entry) for entry in properties])
+    delivered = [o for o in outputs if o is not None]
+    update_status(job_id, state="collected", delivered=len(delivered), failed=len(outputs) - len(delivered))
+    logger.info(f"✅ Batch job {job_id}: {len(delivered)}/{len(outputs)} properties delivered")
+    return delivered
+
+
+# -------------------- CLI --------------------
+async def run_command(args: argparse.Namespace) -> None:
+    if args.command == "prepare":
+        print(prepare_batch_job(args.payload_file))
+    elif args.command == "submit":
+        print(await submit_batch_job(args.job_id, get_batch_provider(args.provider)))
+    elif args.command == "status":
+        print(await check_batch_job(args.job_id))
+    elif args.command == "collect":
+        await collect_batch_job(args.job_id, send=not args.no_send, review_source=args.reviews)
+    elif args.command == "run":
+        job_id = prepare_batch_job(args.payload_file)
+        await submit_batch_job(job_id, LocalFileBatchProvider())
+        if await check_batch_job(job_id) != "completed":
+            raise RuntimeError(f"Batch job {job_id} did not complete")
+        await collect_batch_job(job_id, send=not args.no_send, review_source=args.reviews)
+        print(job_id)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Batch regeneration of property content")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("prepare", help="build the batch input file from a payload file")
+    p.add_argument("payload_file")
+    p = sub.add_parser("submit", help="submit a prepared job")
+    p.add_argument("job_id")
+    p.add_argument("--provider", default="local", choices=list(BATCH_PROVIDERS))
+    p = sub.add_parser("status", help="poll a submitted job and download its results")
+    p.add_argument("job_id")
+    p = sub.add_parser("collect", help="fan results out to format_output and the callback API")
+    p.add_argument("job_id")
+    p.add_argument("--no-send", action="store_true", help="save results without calling the company API")
+    p.add_argument("--reviews", default=BATCH_REVIEW_SOURCE, choices=["local", "remote"],
+                   help="local: offline review synthesizer; remote: review model with local fallback")
+    p = sub.add_parser("run", help="prepare, run locally and collect in one go")
+    p.add_argument("payload_file")
+    p.add_argument("--no-send", action="store_true", help="save results without calling the company API")
+    p.add_argument("--reviews", default=BATCH_REVIEW_SOURCE, choices=["local", "remote"],
+                   help="local: offline review synthesizer; remote: review model with local fallback")
+
+    asyncio.run(run_command(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+# faq_engine.py - Hybrid FAQ assembly: data templates + per-locality answers + LLM for the rest
+"""
+Most FAQ categories do not need a model call per property:
+
+  - template FAQs: location, configuration, price, possession and RERA come straight
+    from the DataTransformer.transform output;
+  - locality FAQs: Location, Home Loans and Other questions are the same for every
+    project in a locality, so they are generated once per locality (no project name
+    in the prompt) and reused from the on-disk LLM cache;
+  - property FAQs: only the property-specific questions (amenities, layouts, project
+    features) are left to the per-property completion in main.generate_faqs.
+
+Every group is a list of raw FAQ dicts ({"question", "answers_text", "category"}) that
+main.format_faqs turns into the output format. merge_faqs keeps the template and
+locality slots and gives the property FAQs whatever is left of FAQ_MAX. batch_jobs.py adds one locality request
+per uncached locality to a job and stores the results here.
+"""
+import asyncio
+import json
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from llm_cache import llm_cache, make_cache_key
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIG --------------------
+FAQ_MAX = 10
+LOCALITY_FAQ_COUNT = 3
+LOCALITY_FAQ_CACHE_VERSION = "v1"     # bump to regenerate every cached locality set
+CATEGORY_ORDER = ["Location", "Configuration", "Price", "Possession", "Status", "Other", "Home Loans"]
+
+# Called as complete(prompt, system_prompt) -> completion text
+FAQCompletion = Callable[[str, str], Awaitable[str]]
+
+LOCALITY_FAQ_SYSTEM_PROMPT = f"""You are an expert real estate FAQ generator for Homes247.in portal.
+
+Each request names a LOCALITY and CITY. Generate {LOCALITY_FAQ_COUNT} FAQs that home buyers ask
+about living in that locality. The answers are shown on every project page in the
+locality, so:
+1. Cover these categories: Location (connectivity, neighborhood, nearby facilities),
+   Home Loans (appreciation potential, rental demand, contact homes247 for loan) and
+   Other (neighborhood safety)
+2. NEVER mention a project or builder name; say "this project" if needed
+3. Each FAQ has a clear question, 1-2 realistic answers and a category label
+4. Give general but realistic answers; do not invent specific numbers
+5. DO NOT use dash symbols (–, -, —) anywhere in questions or answers
+
+OUTPUT FORMAT (JSON only, no markdown):
+[
+  {{
+    "question": "Your question here?",
+    "answer_count": 1,
+    "answers_text": ["First answer here"],
+    "category": "Location"
+  }}
+]"""
+
+
+# -------------------- PARSING --------------------
+def parse_faq_json(generated_text: str) -> List[Dict[str, Any]]:
+    """Raw FAQ dicts from a JSON completion (raises on invalid JSON); entries without answers are dropped"""
+    text = generated_text.strip()
+    if text.startswith("```json"):
+        text = text[7:]
+    if text.startswith("```"):
+        text = text[3:]
+    if text.endswith("```"):
+        text = text[:-3]
+    faqs = json.loads(text.strip())
+    if not isinstance(faqs, list):
+        raise ValueError("FAQ completion is not a JSON list")
+    return [
+        {"question": f["question"], "answers_text": list(f["answers_text"]), "category": f.get("category", "General")}
+        for f in faqs
+        if isinstance(f, dict) and f.get("question") and f.get("answers_text")
+    ]
+
+def merge_faqs(
+    template: List[Dict[str, Any]],
+    specific: List[Dict[str, Any]],
+    locality: List[Dict[str, Any]],
+    limit: int = FAQ_MAX,
+) -> List[Dict[str, Any]]:
+    """
+    Drop repeated questions (template wins, then property, then locality) and fit `limit`:
+    template and locality FAQs keep their slots, property FAQs get the slots left over.
+    The result is ordered by category.
+    """
+    seen = set()
+
+    def unique(group: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        kept = []
+        for faq in group:
+            key = re.sub(r"[^a-z0-9]+", " ", faq["question"].lower()).strip()
+            if key and key not in seen:
+                seen.add(key)
+                kept.append(faq)
+        return kept
+
+    template, specific, locality = unique(template), unique(specific), unique(locality)
+    template = template[:limit]
+    locality = locality[:limit - len(template)]
+    specific = specific[:limit - len(template) - len(locality)]
+    rank = {category: index for index, category in enumerate(CATEGORY_ORDER)}
+    return sorted(template + specific + locality, key=lambda f: rank.get(f.get("category"), len(rank)))
+
+
+# -------------------- TEMPLATE FAQS --------------------
+def readable_range(value: Any) -> str:
+    """"₹ 0.45 Cr - 0.80 Cr" -> "₹ 0.45 Cr to 0.80 Cr" so dash removal keeps it readable"""
+    return str(value).replace(" - ", " to ")
+
+def build_template_faqs(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """FAQs answered directly from the transformed property data (no model call)"""
+    project = data.get("project_name") or "this project"
+    builder = data.get("builder")
+    faqs = []
+
+    def add(category: str, question: str, answer: str) -> None:
+        faqs.append({"question": question, "answers_text": [answer], "category": category})
+
+    if data.get("location"):
+        by_builder = f" It is developed by {builder}." if builder else ""
+        add("Location", f"Where is {project} located?", f"{project} is located in {data['location']}.{by_builder}")
+
+    configurations = [c for c in (data.get("configurations") or []) if c]
+    if configurations or data.get("area_range"):
+        units = f"{', '.join(configurations)} homes" if configurations else "homes"
+        sizes = f" with sizes from {readable_range(data['area_range'])}" if data.get("area_range") else ""
+        total = f" across {data['total_units']} units" if data.get("total_units") else ""
+        add("Configuration", f"What configurations are available in {project}?", f"{project} offers {units}{sizes}{total}.")
+
+    if data.get("price_range"):
+        add("Price", f"What is the price range at {project}?",
+            f"Prices at {project} range from {readable_range(data['price_range'])}. "
+            "Contact Homes247 for the latest offers and payment plans.")
+
+    if data.get("possession_date"):
+        status = f" The project is currently {data['status'].lower()}." if data.get("status") else ""
+        add("Possession", f"When is possession expected at {project}?",
+            f"Possession of {project} is expected by {data['possession_date']}.{status}")
+
+    if data.get("rera_id"):
+        add("Other", f"Is {project} RERA registered?",
+            f"Yes, {project} is registered under RERA with ID {data['rera_id']}.")
+
+    return faqs
+
+def generic_locality_faqs(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Data-free stand-ins used when no locality answers (or no Home Loans answer) are available"""
+    project = data.get("project_name") or "this project"
+    return [{
+        "question": f"Can I get a home loan for {project}?",
+        "answers_text": ["Yes, leading banks offer home loans for projects like this. "
+                         "Contact Homes247 for home loan assistance and the best available rates."],
+        "category": "Home Loans",
+    }]
+
+
+# -------------------- LOCALITY ANSWER CACHE --------------------
+def locality_key(data: Dict[str, Any]) -> Optional[str]:
+    """Normalized "locality, city" the generic answers are shared by, or None"""
+    location = data.get("location")
+    if not location:
+        return None
+    return " ".join(str(location).lower().split())
+
+def locality_cache_key(key: str) -> str:
+    return make_cache_key("faq-locality", f"{LOCALITY_FAQ_CACHE_VERSION}:{key}", 0, 0)
+
+def create_locality_faq_prompt(data: Dict[str, Any]) -> str:
+    """Locality-only request (send with LOCALITY_FAQ_SYSTEM_PROMPT); identical for every project there"""
+    location = str(data.get("location") or "")
+    locality, _, city = location.partition(",")
+    return f"""LOCALITY: {locality.strip() or location}
+CITY: {city.strip() or 'Not specified'}
+
+Generate {LOCALITY_FAQ_COUNT} locality FAQs now in JSON format only:"""
+
+def decode_locality_faqs(cached: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+    if not cached:
+        return None
+    try:
+        return json.loads(cached)
+    except ValueError:
+        return None
+
+def get_cached_locality_faqs(data: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    key = locality_key(data)
+    return decode_locality_faqs(llm_cache.get(locality_cache_key(key))) if key else None
+
+async def get_cached_locality_faqs_async(data: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """get_cached_locality_faqs for coroutines (disk reads run off the event loop)"""
+    key = locality_key(data)
+    return decode_locality_faqs(await llm_cache.aget(locality_cache_key(key))) if key else None
+
+async def store_locality_faqs(data: Dict[str, Any], generated_text: str) -> List[Dict[str, Any]]:
+    """Parse a locality completion and keep it for every project in the locality (written off the event loop)"""
+    faqs = parse_faq_json(generated_text)
+    key = locality_key(data)
+    if key and faqs:
+        await llm_cache.aset(locality_cache_key(key), json.dumps(faqs, ensure_ascii=False))
+    return faqs
+
+def with_home_loan_faq(data: Dict[str, Any], locality: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Locality FAQs with the Home Loans / contact Homes247 entry every FAQ set carries"""
+    if any(faq.get("category") == "Home Loans" for faq in locality):
+        return locality
+    return locality + generic_locality_faqs(data)
+
+_locality_in_flight: Dict[str, asyncio.Future] = {}
+
+async def get_locality_faqs(data: Dict[str, Any], complete: FAQCompletion) -> List[Dict[str, Any]]:
+    """
+    Locality FAQs from the cache, generating them on a miss. Concurrent properties in
+    the same locality share one request. Falls back to generic_locality_faqs on error.
+    """
+    key = locality_key(data)
+    if not key:
+        return generic_locality_faqs(data)
+    cached = await get_cached_locality_faqs_async(data)
+    if cached:
+        return cached
+
+    pending = _locality_in_flight.get(key)
+    if pending is not None:
+        try:
+            return await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            if not pending.cancelled():
+                raise
+            return generic_locality_faqs(data)
+        except Exception:
+            return generic_locality_faqs(data)
+
+    future = asyncio.get_running_loop().create_future()
+    _locality_in_flight[key] = future
+    try:
+        logger.info(f"🔄 Generating locality FAQs for '{key}'...")
+        text = await complete(create_locality_faq_prompt(data), LOCALITY_FAQ_SYSTEM_PROMPT)
+        faqs = await store_locality_faqs(data, text)
+        future.set_result(faqs)
+        return faqs
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        logger.error(f"❌ Locality FAQ generation failed for '{key}': {e}")
+        future.set_exception(e)
+        future.exception()  # mark retrieved when no one else is waiting
+        return generic_locality_faqs(data)
+    finally:
+        _locality_in_flight.pop(key, None)
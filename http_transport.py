@@ -0,0 +1,284 @@
+# http_transport.py - Shared pooled HTTP transport for all outbound traffic
+"""
+One sync and one async httpx client used by every outbound call: the Google scraper,
+the company callback and the LLM providers (OpenAI, Groq).
+
+  - per-host connection pools: each host in HOST_POOL_LIMITS gets its own mounted
+    transport with its own connection limit; other hosts share the default pool
+  - keep-alive: idle connections are reused for KEEPALIVE_EXPIRY seconds
+  - optional HTTP/2 when the `h2` package is installed
+  - DNS caching: resolved addresses are reused for DNS_CACHE_TTL seconds
+  - metrics: requests, new connections, connection setup time and DNS hit rate per
+    host, plus live pool occupancy (see transport_stats)
+"""
+import asyncio
+import logging
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpcore
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIG --------------------
+HTTP2_ENABLED = True                 # only takes effect when the optional `h2` package is installed
+DEFAULT_MAX_CONNECTIONS = 20         # pool for hosts without their own entry
+HOST_POOL_LIMITS = {                 # host -> max connections
+    "api.openai.com": 20,
+    "api.groq.com": 10,
+    "www.google.com": 4,
+}
+MAX_KEEPALIVE_PER_POOL = 10
+KEEPALIVE_EXPIRY = 30.0              # seconds an idle connection is kept for reuse
+DNS_CACHE_TTL = 300.0
+DEFAULT_TIMEOUT = httpx.Timeout(180.0, connect=10.0)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# -------------------- METRICS --------------------
+class HostMetrics:
+    """Counters per host, shared by the sync and async clients"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hosts: Dict[str, Dict[str, float]] = {}
+
+    def _host(self, host: str) -> Dict[str, float]:
+        return self.hosts.setdefault(host, {
+            "requests": 0,
+            "connections_opened": 0,
+            "connect_seconds": 0.0,
+            "dns_hits": 0,
+            "dns_misses": 0,
+        })
+
+    def incr(self, host: str, key: str, amount: float = 1) -> None:
+        with self._lock:
+            self._host(host)[key] += amount
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            result = {}
+            for host, counters in self.hosts.items():
+                stats = dict(counters)
+                opened = stats["connections_opened"]
+                stats["connect_seconds"] = round(stats["connect_seconds"], 3)
+                stats["avg_connect_ms"] = round(1000 * counters["connect_seconds"] / opened, 1) if opened else None
+                stats["reuse_ratio"] = round(1 - opened / stats["requests"], 3) if stats["requests"] else None
+                result[host] = stats
+            return result
+
+
+metrics = HostMetrics()
+
+
+# -------------------- DNS CACHE --------------------
+class DNSCache:
+    """TTL cache in front of getaddrinfo"""
+
+    def __init__(self, ttl: float = DNS_CACHE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, int], Tuple[List[str], float]] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, host: str, port: int) -> Optional[List[str]]:
+        with self._lock:
+            entry = self._entries.get((host, port))
+            if entry and time.monotonic() - entry[1] < self.ttl:
+                return entry[0]
+            return None
+
+    def store(self, host: str, port: int, addresses: List[str]) -> None:
+        with self._lock:
+            self._entries[(host, port)] = (addresses, time.monotonic())
+
+    def forget(self, host: str, port: int) -> None:
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+    def resolve(self, host: str, port: int) -> str:
+        """Blocking resolve through the cache (callers pass literal IPs straight through)"""
+        addresses = self.lookup(host, port)
+        if addresses:
+            metrics.incr(host, "dns_hits")
+            return addresses[0]
+        metrics.incr(host, "dns_misses")
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        if not addresses:
+            raise OSError(f"DNS lookup returned no addresses for {host}")
+        self.store(host, port, addresses)
+        return addresses[0]
+
+
+dns_cache = DNSCache()
+
+
+def is_ip_address(host: str) -> bool:
+    for family in (socket.AF_INET, socket.AF_INET6):
+        try:
+            socket.inet_pton(family, host)
+            return True
+        except OSError:
+            continue
+    return False
+
+
+class CachingSyncBackend(httpcore.SyncBackend):
+    """Resolves through the DNS cache and times connection setup (TLS still uses the hostname)"""
+
+    def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        target = host if is_ip_address(host) else dns_cache.resolve(host, port)
+        started = time.monotonic()
+        try:
+            stream = super().connect_tcp(target, port, timeout=timeout, local_address=local_address, socket_options=socket_options)
+        except Exception:
+            dns_cache.forget(host, port)
+            raise
+        metrics.incr(host, "connections_opened")
+        metrics.incr(host, "connect_seconds", time.monotonic() - started)
+        return stream
+
+
+class CachingAsyncBackend(httpcore.AsyncNetworkBackend):
+    """Async counterpart of CachingSyncBackend (resolution misses run in a worker thread)"""
+
+    def __init__(self):
+        self._backend = httpcore.AnyIOBackend()
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        if is_ip_address(host):
+            target = host
+        else:
+            target = dns_cache.lookup(host, port)
+            if target:
+                metrics.incr(host, "dns_hits")
+                target = target[0]
+            else:
+                target = await asyncio.to_thread(dns_cache.resolve, host, port)
+        started = time.monotonic()
+        try:
+            stream = await self._backend.connect_tcp(
+                target, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+            )
+        except Exception:
+            dns_cache.forget(host, port)
+            raise
+        metrics.incr(host, "connections_opened")
+        metrics.incr(host, "connect_seconds", time.monotonic() - started)
+        return stream
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds):
+        await self._backend.sleep(seconds)
+
+
+# -------------------- CLIENTS --------------------
+def build_limits(max_connections: int) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=min(MAX_KEEPALIVE_PER_POOL, max_connections),
+        keepalive_expiry=KEEPALIVE_EXPIRY
+    )
+
+def attach_backend(transport: Any, backend: Any) -> Any:
+    """Swap the httpcore network backend so connections go through the DNS cache"""
+    pool = getattr(transport, "_pool", None)
+    if pool is not None and hasattr(pool, "_network_backend"):
+        pool._network_backend = backend
+    else:
+        logger.warning("⚠️ HTTP transport internals changed; DNS cache disabled for this pool")
+    return transport
+
+def build_transports(asynchronous: bool) -> Tuple[Any, Dict[str, Any]]:
+    """Default transport plus one mounted transport per configured host"""
+    transport_class = httpx.AsyncHTTPTransport if asynchronous else httpx.HTTPTransport
+    backend = CachingAsyncBackend() if asynchronous else CachingSyncBackend()
+    http2 = HTTP2_ENABLED and HTTP2_AVAILABLE
+
+    default = attach_backend(transport_class(limits=build_limits(DEFAULT_MAX_CONNECTIONS), http2=http2), backend)
+    mounts = {
+        f"all://{host}": attach_backend(transport_class(limits=build_limits(limit), http2=http2), backend)
+        for host, limit in HOST_POOL_LIMITS.items()
+    }
+    return default, mounts
+
+def count_request(request: httpx.Request) -> None:
+    metrics.incr(request.url.host, "requests")
+
+async def count_request_async(request: httpx.Request) -> None:
+    count_request(request)
+
+
+_sync_client: Optional[httpx.Client] = None
+_async_client: Optional[httpx.AsyncClient] = None
+_clients_lock = threading.Lock()
+
+
+def get_sync_client() -> httpx.Client:
+    """Process-wide blocking client (worker threads, scraper)"""
+    global _sync_client
+    with _clients_lock:
+        if _sync_client is None or _sync_client.is_closed:
+            default, mounts = build_transports(asynchronous=False)
+            _sync_client = httpx.Client(
+                transport=default,
+                mounts=mounts,
+                timeout=DEFAULT_TIMEOUT,
+                event_hooks={"request": [count_request]}
+            )
+        return _sync_client
+
+def get_async_client() -> httpx.AsyncClient:
+    """Process-wide async client (LLM calls, callbacks)"""
+    global _async_client
+    with _clients_lock:
+        if _async_client is None or _async_client.is_closed:
+            default, mounts = build_transports(asynchronous=True)
+            _async_client = httpx.AsyncClient(
+                transport=default,
+                mounts=mounts,
+                timeout=DEFAULT_TIMEOUT,
+                event_hooks={"request": [count_request_async]}
+            )
+        return _async_client
+
+def pool_occupancy(client: Optional[Any]) -> Dict[str, Dict[str, int]]:
+    """Open / idle connections per pool of a client"""
+    if client is None or client.is_closed:
+        return {}
+    pools = {"default": getattr(client, "_transport", None)}
+    pools.update({str(pattern.pattern): transport for pattern, transport in getattr(client, "_mounts", {}).items() if transport})
+    occupancy = {}
+    for name, transport in pools.items():
+        connections = list(getattr(getattr(transport, "_pool", None), "connections", []))
+        occupancy[name] = {
+            "open": len(connections),
+            "idle": sum(1 for c in connections if c.is_idle()),
+        }
+    return occupancy
+
+def transport_stats() -> Dict[str, Any]:
+    return {
+        "http2": HTTP2_ENABLED and HTTP2_AVAILABLE,
+        "hosts": metrics.snapshot(),
+        "sync_pools": pool_occupancy(_sync_client),
+        "async_pools": pool_occupancy(_async_client),
+    }
+
+async def close_transport() -> None:
+    """Close both shared clients (they are recreated on next use)"""
+    if _async_client is not None and not _async_client.is_closed:
+        await _async_client.aclose()
+    if _sync_client is not None and not _sync_client.is_closed:
+        _sync_client.close()
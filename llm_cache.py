@@ -0,0 +1,288 @@
+# llm_cache.py - Content-addressed cache for LLM completions
+"""
+Two-tier cache for LLM completions shared by main.py (SEO, FAQs) and app.py (reviews).
+
+Keys are a SHA-256 hash of (model, prompt, temperature, max_tokens), so a byte-identical
+request is answered locally instead of going to the network. The in-memory tier is an
+LRU bounded by entry count; the on-disk tier is a SQLite file that survives restarts,
+with TTL expiry and size-based eviction of the least recently used entries.
+
+Disk reads do not write: access times are collected in memory and flushed with the
+next write (or every CACHE_TOUCH_FLUSH_EVERY hits). Async callers use aget/aset and
+cached_lookup_async, which answer memory hits inline and run SQLite in a worker thread.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIG --------------------
+LLM_CACHE_ENABLED = True
+CACHE_DB_FILE = "llm_cache.sqlite3"
+CACHE_TTL_SECONDS = 7 * 24 * 3600       # 7 days
+CACHE_MEMORY_ENTRIES = 512              # in-memory LRU size
+CACHE_DISK_MAX_BYTES = 200 * 1024 * 1024  # 200 MB of cached completions
+CACHE_EVICTION_CHECK_EVERY = 50         # writes between disk size checks
+CACHE_TOUCH_FLUSH_EVERY = 100           # disk hits between access-time flushes
+
+
+def make_cache_key(model: str, prompt: Any, temperature: float, max_tokens: int) -> str:
+    """Hash the request parameters that determine a completion"""
+    material = json.dumps(
+        {
+            "model": model,
+            "prompt": prompt,
+            "temperature": round(float(temperature), 4),
+            "max_tokens": int(max_tokens),
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """In-memory LRU in front of a persistent SQLite store"""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = CACHE_DB_FILE,
+        ttl_seconds: float = CACHE_TTL_SECONDS,
+        memory_entries: int = CACHE_MEMORY_ENTRIES,
+        disk_max_bytes: int = CACHE_DISK_MAX_BYTES,
+    ):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self.disk_max_bytes = disk_max_bytes
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes_since_check = 0
+        self._touched: Dict[str, float] = {}
+
+        self.counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "writes": 0,
+            "expired": 0,
+            "evicted": 0,
+        }
+
+        if db_path:
+            self._open_disk()
+
+    # ---------- disk tier ----------
+    def _open_disk(self) -> None:
+        try:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL,"
+                " size INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_accessed ON completions(accessed_at)")
+            conn.commit()
+            self._conn = conn
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ LLM disk cache unavailable ({e}); using memory tier only")
+            self._conn = None
+
+    def _disk_get(self, key: str, now: float) -> Optional[str]:
+        if self._conn is None:
+            return None
+        try:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                # The row goes with the next eviction pass (or is replaced by set)
+                self.counters["expired"] += 1
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= CACHE_TOUCH_FLUSH_EVERY:
+                self._flush_touches()
+                self._conn.commit()
+            return value
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ LLM disk cache read failed: {e}")
+            return None
+
+    def _flush_touches(self) -> None:
+        """Write the collected access times (the LRU order eviction uses); caller commits"""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE completions SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()],
+            )
+            self._touched = {}
+
+    def _disk_set(self, key: str, value: str, now: float) -> None:
+        if self._conn is None:
+            return
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, value, created_at, accessed_at, size) VALUES (?, ?, ?, ?, ?)",
+                (key, value, now, now, len(value.encode("utf-8"))),
+            )
+            self._touched.pop(key, None)
+            self._flush_touches()
+            self._conn.commit()
+            self._writes_since_check += 1
+            if self._writes_since_check >= CACHE_EVICTION_CHECK_EVERY:
+                self._writes_since_check = 0
+                self._evict_disk(now)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ LLM disk cache write failed: {e}")
+
+    def _evict_disk(self, now: float) -> None:
+        """Drop expired rows, then least recently used rows until under the size limit"""
+        cur = self._conn.execute("DELETE FROM completions WHERE created_at < ?", (now - self.ttl_seconds,))
+        self.counters["expired"] += cur.rowcount
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total > self.disk_max_bytes:
+            target = int(self.disk_max_bytes * 0.9)
+            rows = self._conn.execute("SELECT key, size FROM completions ORDER BY accessed_at ASC").fetchall()
+            doomed = []
+            for key, size in rows:
+                if total <= target:
+                    break
+                doomed.append((key,))
+                total -= size
+            self._conn.executemany("DELETE FROM completions WHERE key = ?", doomed)
+            self.counters["evicted"] += len(doomed)
+        self._conn.commit()
+
+    # ---------- public API ----------
+    def _memory_get(self, key: str, now: float) -> Optional[str]:
+        """Memory tier lookup; caller holds the lock"""
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        value, created_at = entry
+        if now - created_at <= self.ttl_seconds:
+            self._memory.move_to_end(key)
+            self.counters["memory_hits"] += 1
+            return value
+        del self._memory[key]
+        self.counters["expired"] += 1
+        return None
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached completion or None"""
+        now = time.time()
+        with self._lock:
+            value = self._memory_get(key, now)
+            if value is not None:
+                return value
+
+            value = self._disk_get(key, now)
+            if value is not None:
+                self._remember(key, value, now)
+                self.counters["disk_hits"] += 1
+                return value
+
+            self.counters["misses"] += 1
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        """Store a completion in both tiers"""
+        if not value:
+            return
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            self._disk_set(key, value, now)
+            self.counters["writes"] += 1
+
+    async def aget(self, key: str) -> Optional[str]:
+        """get() for the event loop: memory hits inline, the disk tier in a worker thread"""
+        with self._lock:
+            value = self._memory_get(key, time.time())
+            if value is not None:
+                return value
+            if self._conn is None:
+                self.counters["misses"] += 1
+                return None
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: str) -> None:
+        """set() for the event loop; the SQLite write and commit run in a worker thread"""
+        if not value:
+            return
+        if self._conn is None:
+            self.set(key, value)
+            return
+        await asyncio.to_thread(self.set, key, value)
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self.counters["bypassed"] += 1
+
+    def _remember(self, key: str, value: str, created_at: float) -> None:
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._touched = {}
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM completions")
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.counters)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+            stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 3) if lookups else 0.0
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_enabled"] = self._conn is not None
+            return stats
+
+
+# Process-wide cache shared by main.py and app.py
+llm_cache = LLMCache()
+
+
+def cached_lookup(model: str, prompt: Any, temperature: float, max_tokens: int, use_cache: bool = True):
+    """
+    Returns (key, cached_value). key is None when caching is disabled or bypassed,
+    in which case the caller should not store the result.
+    """
+    if not LLM_CACHE_ENABLED:
+        return None, None
+    if not use_cache:
+        llm_cache.record_bypass()
+        return None, None
+    key = make_cache_key(model, prompt, temperature, max_tokens)
+    return key, llm_cache.get(key)
+
+
+async def cached_lookup_async(model: str, prompt: Any, temperature: float, max_tokens: int, use_cache: bool = True):
+    """cached_lookup for coroutines: disk reads do not block the event loop"""
+    if not LLM_CACHE_ENABLED:
+        return None, None
+    if not use_cache:
+        llm_cache.record_bypass()
+        return None, None
+    key = make_cache_key(model, prompt, temperature, max_tokens)
+    return key, await llm_cache.aget(key)
@@ -0,0 +1,406 @@
+# llm_providers.py - One provider interface for every LLM call
+"""
+main.py (SEO sections, FAQs) and app.py (reviews) both call LLMs through this module.
+
+Each call names a model; MODEL_ROUTES maps it to a registered provider. Remote providers
+speak the OpenAI chat completions protocol (OpenAI itself, Groq) and share the pooled
+clients from http_transport.py. The "local" provider is a deterministic offline backend with
+configurable latency that returns well-formed section, FAQ or review text (single or
+batched JSON), so the whole pipeline can be benchmarked and load-tested without
+network access:
+
+    LLM_BACKEND=local LOCAL_LLM_LATENCY=0.5 uvicorn main:app
+
+Every provider returns the same result dict:
+    {"text", "finish_reason", "usage": {"prompt_tokens", "completion_tokens", "total_tokens", "cached_tokens"} | None,
+     "model", "provider"}
+and streams chunks shaped {"delta", "finish_reason", "usage"}.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from openai import AsyncOpenAI, OpenAI
+
+from http_transport import get_async_client, get_sync_client, close_transport
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIG --------------------
+# "remote" routes by model, "local" sends every call to the offline backend
+LLM_BACKEND = os.getenv("LLM_BACKEND", "remote")
+
+# model -> provider name
+MODEL_ROUTES = {
+    "gpt-4o-mini": "openai",
+    "llama-3.3-70b-versatile": "groq",
+    "local": "local",
+}
+
+# Offline backend: fixed latency per call plus optional decode time
+LOCAL_LATENCY_SECONDS = float(os.getenv("LOCAL_LLM_LATENCY", "0.2"))
+LOCAL_TOKENS_PER_SECOND = float(os.getenv("LOCAL_LLM_TOKENS_PER_SECOND", "0"))  # 0 = no decode delay
+LOCAL_STREAM_CHUNK_CHARS = 24
+LOCAL_SECTION_WORDS = {"PROPERTY DESCRIPTION": 900}
+LOCAL_DEFAULT_SECTION_WORDS = 300
+LOCAL_TOKENS_PER_WORD = 1.35
+LOCAL_PREFIX_CACHE_MIN_TOKENS = 1024   # mirrors the provider rule: only long prefixes are cached
+LOCAL_PREFIX_CACHE_BLOCK = 128         # ... in blocks of this many tokens
+
+def build_messages(prompt: str, system_prompt: Optional[str] = None) -> List[Dict[str, str]]:
+    """Static instructions go first as the system message so providers can cache the shared prefix"""
+    messages = [{"role": "system", "content": system_prompt}] if system_prompt else []
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+def usage_to_dict(usage: Any) -> Optional[Dict[str, int]]:
+    """Normalize an SDK usage object (or dict) to plain token counts, including prefix-cache hits"""
+    if usage is None:
+        return None
+    get = usage.get if isinstance(usage, dict) else (lambda key: getattr(usage, key, None))
+    details = get("prompt_tokens_details")
+    if isinstance(details, dict):
+        cached_tokens = details.get("cached_tokens")
+    else:
+        cached_tokens = getattr(details, "cached_tokens", None)
+    return {
+        "prompt_tokens": get("prompt_tokens"),
+        "completion_tokens": get("completion_tokens"),
+        "total_tokens": get("total_tokens"),
+        "cached_tokens": cached_tokens or 0,
+    }
+
+
+class LLMProvider(ABC):
+    """Interface every backend implements"""
+
+    name = "base"
+    label = "Base"        # circuit breaker / log name
+    offline = False
+
+    @abstractmethod
+    async def complete(self, model: str, messages: List[Dict[str, str]], max_tokens: int,
+                       temperature: float, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """One completion as {"text", "finish_reason", "usage", "model", "provider"}"""
+
+    @abstractmethod
+    async def open_stream(self, model: str, messages: List[Dict[str, str]], max_tokens: int,
+                          temperature: float, timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Open a stream (awaitable, so opening can be retried) and return its chunk iterator"""
+
+    @abstractmethod
+    def complete_sync(self, model: str, messages: List[Dict[str, str]], max_tokens: int,
+                      temperature: float, timeout: Any = None) -> Dict[str, Any]:
+        """Blocking variant for code running in worker threads"""
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """Any endpoint speaking the OpenAI chat completions protocol (OpenAI, Groq)"""
+
+    def __init__(self, name: str, label: str, api_key: str, base_url: Optional[str] = None):
+        self.name = name
+        self.label = label
+        self.api_key = api_key
+        # Retries are handled by the resilience layer, not inside the SDK
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=get_async_client(), max_retries=0)
+        self.sync_client = OpenAI(api_key=api_key, base_url=base_url, http_client=get_sync_client(), max_retries=0)
+
+    def result(self, model: str, response: Any) -> Dict[str, Any]:
+        choice = response.choices[0]
+        return {
+            "text": choice.message.content,
+            "finish_reason": choice.finish_reason,
+            "usage": usage_to_dict(response.usage),
+            "model": model,
+            "provider": self.name,
+        }
+
+    async def complete(self, model, messages, max_tokens, temperature, timeout=None):
+        response = await self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            timeout=timeout
+        )
+        return self.result(model, response)
+
+    async def open_stream(self, model, messages, max_tokens, temperature, timeout=None):
+        stream = await self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            timeout=timeout,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+
+        async def chunks():
+            async for chunk in stream:
+                choice = chunk.choices[0] if chunk.choices else None
+                yield {
+                    "delta": choice.delta.content if choice else None,
+                    "finish_reason": choice.finish_reason if choice else None,
+                    "usage": usage_to_dict(getattr(chunk, 'usage', None)),
+                }
+
+        return chunks()
+
+    def complete_sync(self, model, messages, max_tokens, temperature, timeout=None):
+        response = self.sync_client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            timeout=timeout
+        )
+        return self.result(model, response)
+
+
+# -------------------- OFFLINE BACKEND --------------------
+LOCAL_MARKER_PATTERN = re.compile(r'===\s*([A-Z][A-Z ]*?)\s*===')
+LOCAL_PROJECT_PATTERNS = [
+    re.compile(r'Project(?: Name)?:\s*(?:</strong>)?\s*([^\n<]+)', re.IGNORECASE),
+    re.compile(r'"project_name":\s*"([^"]+)"'),
+]
+
+LOCAL_REVIEW_SLOT_PATTERN = re.compile(r'^Slot (\d+):(.*)$', re.MULTILINE)
+
+LOCAL_SENTENCES = [
+    "{name} offers well planned homes with good natural light and cross ventilation.",
+    "Residents enjoy easy access to schools, hospitals, markets and daily conveniences.",
+    "The neighbourhood has steady demand from families and working professionals alike.",
+    "Road connectivity to the main business districts keeps daily commutes manageable.",
+    "The layouts use space efficiently, with practical kitchens and comfortable bedrooms.",
+    "Landscaped open areas and a clubhouse give residents room to relax after work.",
+    "Security staff, CCTV coverage and power backup add to everyday peace of mind.",
+    "Construction quality and finishing reflect the standards buyers expect today.",
+    "Property values in the area have grown steadily over the last few years.",
+    "Rental demand stays healthy thanks to nearby offices and educational institutions.",
+    "The developer has delivered several residential projects across the region.",
+    "Buyers looking for value and comfort will find {name} worth a close look.",
+]
+LOCAL_PROPERTY_HEADINGS = ["ABOUT", "HIGHLIGHTS", "AMENITIES", "SPECIFICATIONS", "WHO SHOULD BUY THIS"]
+LOCAL_FAQ_CATEGORIES = ["Location", "Configuration", "Status", "Possession", "Price", "Home Loans", "Other"]
+LOCAL_FAQ_QUESTIONS = {
+    "Location": "How well is {name} connected to the rest of the city?",
+    "Configuration": "Which apartment configurations are available at {name}?",
+    "Status": "What amenities are maintained at {name}?",
+    "Possession": "When is possession expected at {name}?",
+    "Price": "What is the starting price at {name}?",
+    "Home Loans": "Can I get a home loan for a flat at {name}?",
+    "Other": "Is the neighbourhood around {name} safe for families?",
+}
+LOCAL_REVIEW_POSITIVE = [
+    "Good location with schools and shops close by.",
+    "The flats are spacious and well ventilated.",
+    "Maintenance is good and the staff is helpful.",
+    "Happy with the amenities and the green spaces.",
+]
+LOCAL_REVIEW_CRITICAL = [
+    "Parking gets a bit crowded in the evenings.",
+    "Traffic near the main road can be slow at peak hours.",
+    "Some finishing work could have been better.",
+]
+
+
+class LocalProvider(LLMProvider):
+    """Deterministic offline backend: the same prompt always gets the same text"""
+
+    name = "local"
+    label = "Local"
+    offline = True
+
+    def __init__(self, latency_seconds: float = LOCAL_LATENCY_SECONDS, tokens_per_second: float = LOCAL_TOKENS_PER_SECOND):
+        self.latency_seconds = latency_seconds
+        self.tokens_per_second = tokens_per_second
+        self._seen_prefixes = set()
+        self._lock = threading.Lock()
+
+    # ---------- text ----------
+    def project_name(self, prompt: str) -> str:
+        for pattern in LOCAL_PROJECT_PATTERNS:
+            match = pattern.search(prompt)
+            if match and match.group(1).strip():
+                return match.group(1).strip()
+        return "the project"
+
+    def paragraph(self, rng: random.Random, name: str, words: int) -> str:
+        sentences = []
+        count = 0
+        while count < words:
+            sentence = rng.choice(LOCAL_SENTENCES).format(name=name)
+            sentences.append(sentence)
+            count += len(sentence.split())
+        return " ".join(sentences)
+
+    def section_text(self, rng: random.Random, name: str, section: str, words: int) -> str:
+        if section == "PROPERTY DESCRIPTION":
+            parts = [f"<p><strong>OVERVIEW</strong><br>\n<strong>Project Name:</strong> {name}</p>"]
+            per_heading = max(40, words // len(LOCAL_PROPERTY_HEADINGS))
+            for heading in LOCAL_PROPERTY_HEADINGS:
+                parts.append(f"<p><strong>{heading}</strong><br>\n{self.paragraph(rng, name, per_heading)}</p>")
+            return "\n\n".join(parts)
+
+        opening = f"{section.title()} for {name}."
+        paragraphs = [f"<p>{opening} {self.paragraph(rng, name, 60)}</p>"]
+        while sum(len(p.split()) for p in paragraphs) < words:
+            paragraphs.append(f"<p>{self.paragraph(rng, name, 60)}</p>")
+        return "\n\n".join(paragraphs)
+
+    def faq_text(self, rng: random.Random, name: str) -> str:
+        faqs = []
+        for index in range(10):
+            category = LOCAL_FAQ_CATEGORIES[index % len(LOCAL_FAQ_CATEGORIES)]
+            answers = [self.paragraph(rng, name, 25) for _ in range(rng.choice([1, 2]))]
+            faqs.append({
+                "question": LOCAL_FAQ_QUESTIONS[category].format(name=name),
+                "answer_count": len(answers),
+                "answers_text": answers,
+                "category": category,
+            })
+        return json.dumps(faqs, ensure_ascii=False)
+
+    def review_text(self, rng: random.Random, prompt: str) -> str:
+        sentences = rng.sample(LOCAL_REVIEW_POSITIVE, 2)
+        if "critical" in prompt:
+            sentences[1] = rng.choice(LOCAL_REVIEW_CRITICAL)
+        if rng.random() < 0.5:
+            sentences.append("Overall a decent choice for the price.")
+        return " ".join(sentences)
+
+    def review_batch_text(self, rng: random.Random, prompt: str) -> str:
+        slots = LOCAL_REVIEW_SLOT_PATTERN.findall(prompt)
+        return json.dumps(
+            [{"slot": int(number), "review": self.review_text(rng, line)} for number, line in slots],
+            ensure_ascii=False
+        )
+
+    def generate(self, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        prompt = "\n".join(m.get("content", "") for m in messages)
+        rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).hexdigest())
+        name = self.project_name(messages[-1].get("content", ""))
+        max_words = max(1, int(max_tokens / LOCAL_TOKENS_PER_WORD))
+
+        if '"answers_text"' in prompt:
+            return self.faq_text(rng, name)
+        if '"slot"' in prompt:
+            return self.review_batch_text(rng, prompt)
+
+        # Sections are requested in the variable suffix; the shared instructions describe all of them
+        sections = list(dict.fromkeys(LOCAL_MARKER_PATTERN.findall(messages[-1].get("content", ""))))
+        if sections:
+            blocks = []
+            for section in sections:
+                words = min(LOCAL_SECTION_WORDS.get(section, LOCAL_DEFAULT_SECTION_WORDS), max_words // len(sections))
+                blocks.append(f"=== {section} ===\n{self.section_text(rng, name, section, words)}")
+            return "\n\n".join(blocks)
+
+        return self.review_text(rng, prompt)
+
+    def cached_prefix_tokens(self, messages: List[Dict[str, str]]) -> int:
+        """Simulate provider prefix caching: a system prompt seen before counts as cached"""
+        if len(messages) < 2 or messages[0].get("role") != "system":
+            return 0
+        prefix = messages[0]["content"]
+        prefix_tokens = len(prefix) // 4
+        if prefix_tokens < LOCAL_PREFIX_CACHE_MIN_TOKENS:
+            return 0
+        with self._lock:
+            seen = prefix in self._seen_prefixes
+            self._seen_prefixes.add(prefix)
+        return prefix_tokens // LOCAL_PREFIX_CACHE_BLOCK * LOCAL_PREFIX_CACHE_BLOCK if seen else 0
+
+    def build_result(self, model: str, messages: List[Dict[str, str]], text: str) -> Dict[str, Any]:
+        prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+        completion_tokens = int(len(text.split()) * LOCAL_TOKENS_PER_WORD)
+        return {
+            "text": text,
+            "finish_reason": "stop",
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "cached_tokens": self.cached_prefix_tokens(messages),
+            },
+            "model": model,
+            "provider": self.name,
+        }
+
+    def delay_for(self, result: Dict[str, Any]) -> float:
+        decode = result["usage"]["completion_tokens"] / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        return self.latency_seconds + decode
+
+    # ---------- interface ----------
+    async def complete(self, model, messages, max_tokens, temperature, timeout=None):
+        result = self.build_result(model, messages, self.generate(messages, max_tokens))
+        await asyncio.sleep(self.delay_for(result))
+        return result
+
+    async def open_stream(self, model, messages, max_tokens, temperature, timeout=None):
+        result = self.build_result(model, messages, self.generate(messages, max_tokens))
+        text = result["text"]
+        pieces = [text[i:i + LOCAL_STREAM_CHUNK_CHARS] for i in range(0, len(text), LOCAL_STREAM_CHUNK_CHARS)]
+        await asyncio.sleep(self.latency_seconds)
+        per_piece = (self.delay_for(result) - self.latency_seconds) / max(1, len(pieces))
+
+        async def chunks():
+            for piece in pieces:
+                if per_piece > 0:
+                    await asyncio.sleep(per_piece)
+                yield {"delta": piece, "finish_reason": None, "usage": None}
+            yield {"delta": None, "finish_reason": "stop", "usage": result["usage"]}
+
+        return chunks()
+
+    def complete_sync(self, model, messages, max_tokens, temperature, timeout=None):
+        result = self.build_result(model, messages, self.generate(messages, max_tokens))
+        time.sleep(self.delay_for(result))
+        return result
+
+
+# -------------------- REGISTRY --------------------
+_providers: Dict[str, LLMProvider] = {}
+_registry_lock = threading.Lock()
+
+
+def register_provider(provider: LLMProvider) -> LLMProvider:
+    with _registry_lock:
+        _providers[provider.name] = provider
+    return provider
+
+def get_provider_by_name(name: str) -> LLMProvider:
+    with _registry_lock:
+        provider = _providers.get(name)
+    if provider is None:
+        raise RuntimeError(f"LLM provider '{name}' is not registered")
+    return provider
+
+def get_provider(model: str) -> LLMProvider:
+    """Provider that serves this model (every model goes to the offline backend when LLM_BACKEND=local)"""
+    if LLM_BACKEND == "local":
+        return get_provider_by_name("local")
+    name = MODEL_ROUTES.get(model)
+    if name is None:
+        raise RuntimeError(f"No LLM provider routed for model '{model}'")
+    return get_provider_by_name(name)
+
+def cache_model_key(provider: LLMProvider, model: str) -> str:
+    """Model name used in cache keys; offline text never answers for a real model"""
+    return f"{provider.name}/{model}" if provider.offline else model
+
+async def close_providers() -> None:
+    """Release the shared connection pools"""
+    await close_transport()
+
+
+register_provider(LocalProvider())
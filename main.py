@@ -2,31 +2,42 @@
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field, validator, ValidationError
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator, Callable
 import os
 from datetime import datetime
 from pathlib import Path
 from datetime import datetime
 import json
 import re
-import requests
 import logging
 from bs4 import BeautifulSoup
 import random
+import asyncio
 
-# New imports for retry/backoff and OpenAI
+# New imports for retry/backoff and pooled HTTP
 import time
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import httpx
 from urllib.parse import quote_plus
-from openai import OpenAI
+
+from llm_cache import llm_cache, cached_lookup_async
+from rate_limiter import get_rate_limiter, estimate_request_tokens, retry_after_from_error, rate_limit_stats
+from resilience import call_with_resilience, get_circuit_breaker, retry_delay, resilience_stats
+from name_sampler import NameSampler, register_name_pool
+from faq_engine import build_template_faqs, get_locality_faqs, merge_faqs, parse_faq_json, with_home_loan_faq
+from text_metrics import text_nodes
+from content_sanitizer import remove_dashes, sanitize, sanitize_many
+from near_duplicates import find_near_duplicate, get_corpus_index, record_output
+from http_transport import get_sync_client, get_async_client, transport_stats
+from llm_providers import (
+    LLM_BACKEND, OpenAICompatibleProvider, register_provider, get_provider, build_messages, cache_model_key, close_providers
+)
 
 # Import review generator
 try:
-    from app import generate_reviews_from_text
+    from app import generate_reviews_from_features_async
 except ImportError:
     print("⚠️  app.py not found. Review generation will be skipped.")
-    generate_reviews_from_text = None
+    generate_reviews_from_features_async = None
 
 
 # Setup logging
@@ -56,15 +67,15 @@ class SimpleGoogleScraper:
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        # Pooled keep-alive client shared with every other outbound call
+        self.client = get_sync_client()
     
     def quick_google_search(self, query: str, max_results: int = 2) -> str:
         try:
             encoded_query = quote_plus(query)
             url = f"https://www.google.com/search?q={encoded_query}"
             
-            response = self.session.get(url, timeout=5)
+            response = self.client.get(url, headers=self.headers, timeout=5, follow_redirects=True)
             
             if response.status_code != 200:
                 logger.warning(f"⚠️ Google returned status {response.status_code}")
@@ -167,6 +178,9 @@ INDIAN_FIRST_NAMES = [
     "Supriya","Deepthi","Sahithi","Ishita"
 ]
 
+# Deduplicated FAQ pool (the list above repeats some names); see name_sampler.py
+FAQ_NAME_POOL = register_name_pool("faq", INDIAN_FIRST_NAMES)
+
 GENERATED_DATA_FILE = "generated_content.json"
 
 # ============= CONFIGURATION =============
@@ -179,76 +193,24 @@ COMPANY_CALLBACK_API = "http://192.168.0.144/superadmin/AItasks_Controller/updat
 
 # ============= UTILITY FUNCTIONS =============
 
-def get_random_name() -> str:
-    """Get a random name from the Indian names list"""
-    return random.choice(INDIAN_FIRST_NAMES)
-
-def get_unique_names(count: int) -> List[str]:
-    """Get unique random names"""
-    if count > len(INDIAN_FIRST_NAMES):
-        return [get_random_name() for _ in range(count)]
-    return random.sample(INDIAN_FIRST_NAMES, count)
-
 def strip_html_tags(html_text: str) -> str:
     """Remove HTML tags and clean text"""
     if not html_text:
         return ""
-    soup = BeautifulSoup(html_text, "html.parser")
-    text = soup.get_text(separator=" ", strip=True)
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+    return analyze_document(html_text).text
 
 def remove_dashes_from_text(text: str) -> str:
     """
     Remove ALL dash symbols (–, -, —) from text including hyphens in words
     """
-    if not text:
-        return text
-
-    # List of all dash-like characters to remove
-    dash_characters = ['-', '–', '—']
-
-    # Remove ALL dash characters everywhere
-    for dash in dash_characters:
-        text = text.replace(dash, '')
-
-    # Remove any extra spaces created due to dash removal
-    text = re.sub(r'\s{2,}', ' ', text)
-
-    return text.strip()
+    return remove_dashes(text)
 
 def clean_generated_content(content: str) -> str:
     """
     Clean generated content - remove dashes, markdown, and format properly
-    Use this on ALL content before returning to user
+    Use this on ALL content before returning to user (see content_sanitizer.py)
     """
-    if not content:
-        return content
-    
-    # Remove markdown code blocks
-    content = content.strip()
-    if content.startswith("```html"):
-        content = content[7:]
-    if content.startswith("```"):
-        content = content[3:]
-    if content.endswith("```"):
-        content = content[:-3]
-    content = content.strip()
-    
-    # Remove section headers (### SECTION NAME)
-    content = re.sub(r'###\s+[A-Z\s]+\n', '', content)
-    
-    # Remove dashes
-    content = remove_dashes_from_text(content)
-    
-    # Remove [Skip] lines
-    content = re.sub(r'<br>\s*<strong>[^<]+:</strong>\s*\[Skip\]', '', content)
-    content = re.sub(r'\[Skip\].*?(?=<br>|</p>|$)', '', content)
-    
-    # Clean up extra whitespace
-    content = re.sub(r'\n\s*\n\s*\n+', '\n\n', content)
-    
-    return content.strip()
+    return sanitize(content)
 
 def save_generated_data(output_data: Dict[str, Any]) -> None:
     """Save generated data to file, replacing previous data if property exists"""
@@ -277,12 +239,18 @@ def save_generated_data(output_data: Dict[str, Any]) -> None:
     except Exception as e:
         logger.error(f"❌ Failed to save generated data: {e}")
 
+async def index_generated_data(output_data: Dict[str, Any]) -> None:
+    """Add saved output to the near-duplicate index without blocking the event loop"""
+    try:
+        await asyncio.to_thread(record_output, output_data)
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to update near-duplicate index: {e}")
+
 def calculate_content_richness(text: str) -> int:
     """Calculate how rich/detailed the content is (word count)"""
     if not text:
         return 0
-    clean_text = strip_html_tags(text)
-    return len(clean_text.split())
+    return analyze_document(text).word_count
 
 def count_words(text: str) -> int:
     """Count words in text (alias for calculate_content_richness)"""
@@ -316,23 +284,99 @@ def clean_html_paragraphs(html_text: str) -> str:
     """Clean HTML text and ensure proper paragraph formatting"""
     if not html_text:
         return ""
+    return analyze_document(html_text).clean_html
+
+# ============= DOCUMENT ANALYSIS =============
+
+DOCUMENT_CACHE_SIZE = 64    # recent texts whose analysis is kept (a property has ~10 fields)
+
+class AnalyzedDocument:
+    """
+    One HTML scan per text (text_metrics.text_nodes, no DOM). The stripped text nodes
+    are kept and the plain text, word count, paragraphs and cleaned HTML are derived
+    from them on first use, so count_words, is_content_sufficient and
+    clean_html_paragraphs share a single scan.
+    """
+    
+    def __init__(self, html_text: str, strings: Optional[List[str]] = None):
+        self.html = html_text or ""
+        self._strings = strings
+        self._text: Optional[str] = None
+        self._paragraphs: Optional[List[str]] = None
+        self._clean_html: Optional[str] = None
     
-    # Remove dashes
-    html_text = remove_dashes_from_text(html_text)
+    @property
+    def strings(self) -> List[str]:
+        """Non-empty, stripped text nodes in document order"""
+        if self._strings is None:
+            self._strings = text_nodes(self.html)
+        return self._strings
     
-    # Parse HTML
-    soup = BeautifulSoup(html_text, 'html.parser')
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = re.sub(r'\s+', ' ', " ".join(self.strings)).strip()
+        return self._text
     
-    # Get all text content
-    text = soup.get_text(separator='\n\n', strip=True)
+    @property
+    def word_count(self) -> int:
+        return len(self.text.split())
     
-    # Split into paragraphs and wrap in <p> tags
-    paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
+    @property
+    def paragraphs(self) -> List[str]:
+        """
+        Paragraphs clean_html_paragraphs wraps. Dashes are removed from the raw HTML
+        before the scan, as before, so encoded dashes (&ndash; &#8211;) are kept
+        """
+        if self._paragraphs is None:
+            dashless = remove_dashes_from_text(self.html)
+            strings = self.strings if dashless == self.html else text_nodes(dashless)
+            self._paragraphs = [p.strip() for s in strings for p in s.split('\n\n') if p.strip()]
+        return self._paragraphs
+    
+    @property
+    def clean_html(self) -> str:
+        if self._clean_html is None:
+            self._clean_html = '\n'.join(f'<p>{p}</p>' for p in self.paragraphs)
+            # Without markup characters the cleaned HTML parses back to exactly these
+            # paragraphs; remember it so counting the output later does not parse it again
+            if not any('<' in p or '&' in p for p in self.paragraphs):
+                remember_document(AnalyzedDocument(self._clean_html, strings=self.paragraphs))
+        return self._clean_html
+    
+    def is_sufficient(self, min_words: int = 250) -> bool:
+        return self.word_count >= min_words
+
+_documents: Dict[str, AnalyzedDocument] = {}
+
+def remember_document(doc: AnalyzedDocument) -> AnalyzedDocument:
+    _documents.pop(doc.html, None)
+    _documents[doc.html] = doc
+    while len(_documents) > DOCUMENT_CACHE_SIZE:
+        _documents.pop(next(iter(_documents)))
+    return doc
+
+def analyze_document(html_text: str) -> AnalyzedDocument:
+    """Analysis of a text, reused while it is among the DOCUMENT_CACHE_SIZE most recent"""
+    doc = _documents.get(html_text or "")
+    if doc is None:
+        return remember_document(AnalyzedDocument(html_text))
+    return remember_document(doc)
+
+def review_existing_content(field_name: str, html_text: Optional[str], min_words: int = 250) -> Optional[str]:
+    """Cleaned existing content if it has at least min_words words, else None (generate it)"""
+    if not html_text:
+        logger.info(f"⚠️ {field_name} not provided - WILL generate")
+        return None
     
-    # Create clean HTML
-    clean_html = '\n'.join([f'<p>{p}</p>' for p in paragraphs])
+    doc = analyze_document(html_text)
+    logger.info(f"📊 {field_name}: {doc.word_count} words")
+    if doc.is_sufficient(min_words):
+        logger.info(f"✅ Using existing {field_name} ({doc.word_count} words) - NO generation needed")
+        return doc.clean_html
     
-    return clean_html
+    logger.info(f"⚠️ {field_name} insufficient ({doc.word_count} words < {min_words}) - WILL generate")
+    return None
 
 # ============= INPUT MODELS =============
 
@@ -390,46 +434,250 @@ class IncomingPropertyData(BaseModel):
     highlights: Optional[List[Highlight]] = []
     developer_info: Optional[List[DeveloperInfo]] = []
 
-# ============= OPENAI CLIENT =============
+# ============= TOKEN BUDGET PLANNER =============
+
+# Words each section is asked to produce (see the section prompts)
+SECTION_WORD_TARGETS = {
+    "LOCATION DESCRIPTION": 300,
+    "PROPERTY LOCALITY DESCRIPTION": 300,
+    # overview 40 + about 300 + highlights 100 + amenities 200 + specifications 100 + who should buy 180
+    "PROPERTY DESCRIPTION": 920,
+    "DEVELOPER DETAILS DESCRIPTION": 300,
+    "DEVELOPER LISTING DESCRIPTION": 300,
+}
+FAQ_WORD_TARGET = 400                   # 3-4 property-specific FAQs (the rest come from faq_engine.py)
+LOCALITY_FAQ_WORD_TARGET = 300          # LOCALITY_FAQ_COUNT shared locality FAQs
+PROPERTY_FAQ_COUNT = "3-4"
+
+TOKENS_PER_WORD = 1.35                  # English prose
+HTML_TOKEN_OVERHEAD = 1.2               # <p>/<strong>/<br> tags and section markers
+JSON_TOKEN_OVERHEAD = 1.3               # keys, quotes and brackets in FAQ JSON
+BUDGET_HEADROOM = 1.3                   # slack above the estimate before truncating
+MIN_OUTPUT_TOKENS = 256
+
+# Request timeout derived from the budget: fixed latency + decode time at a conservative rate
+TIMEOUT_BASE_SECONDS = 15.0
+OUTPUT_TOKENS_PER_SECOND = 40.0
+
+# label -> calls, estimated/actual token totals and truncations
+token_budget_stats: Dict[str, Dict[str, Any]] = {}
+
+def build_budget(label: str, estimated_tokens: int) -> Dict[str, Any]:
+    """Turn an output token estimate into max_tokens and a request timeout"""
+    max_tokens = max(MIN_OUTPUT_TOKENS, int(estimated_tokens * BUDGET_HEADROOM))
+    timeout = round(TIMEOUT_BASE_SECONDS + max_tokens / OUTPUT_TOKENS_PER_SECOND, 1)
+    return {
+        "label": label,
+        "estimated_tokens": int(estimated_tokens),
+        "max_tokens": max_tokens,
+        "timeout": timeout
+    }
 
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
+def plan_output_budget(sections: List[str]) -> Dict[str, Any]:
+    """Budget for an SEO completion that contains exactly these sections"""
+    words = sum(SECTION_WORD_TARGETS.get(name, 300) for name in sections)
+    estimated = words * TOKENS_PER_WORD * HTML_TOKEN_OVERHEAD
+    label = sections[0] if len(sections) == 1 else f"SEO ({len(sections)} sections)"
+    return build_budget(label, estimated)
+
+def plan_faq_budget() -> Dict[str, Any]:
+    """Budget for the property-specific FAQ JSON completion"""
+    return build_budget("FAQ", FAQ_WORD_TARGET * TOKENS_PER_WORD * JSON_TOKEN_OVERHEAD)
+
+def plan_locality_faq_budget() -> Dict[str, Any]:
+    """Budget for one locality's shared FAQ JSON completion"""
+    return build_budget("FAQ (locality)", LOCALITY_FAQ_WORD_TARGET * TOKENS_PER_WORD * JSON_TOKEN_OVERHEAD)
+
+def record_token_usage(budget: Optional[Dict[str, Any]], usage: Optional[Dict[str, Any]], finish_reason: Optional[str] = None) -> None:
+    """Record the planned estimate next to the tokens the provider actually produced, plus prefix-cache hits"""
+    if not budget or usage is None:
+        return
+    actual = usage.get('completion_tokens')
+    if actual is None:
+        return
+    prompt_tokens = usage.get('prompt_tokens') or 0
+    cached_tokens = usage.get('cached_tokens') or 0
+    
+    stats = token_budget_stats.setdefault(budget['label'], {
+        "calls": 0,
+        "estimated_tokens": 0,
+        "max_tokens": 0,
+        "actual_tokens": 0,
+        "truncated": 0,
+        "prompt_tokens": 0,
+        "cached_prompt_tokens": 0,
+        "prefix_cache_hits": 0
+    })
+    stats["calls"] += 1
+    stats["estimated_tokens"] += budget['estimated_tokens']
+    stats["max_tokens"] += budget['max_tokens']
+    stats["actual_tokens"] += actual
+    stats["prompt_tokens"] += prompt_tokens
+    stats["cached_prompt_tokens"] += cached_tokens
+    if cached_tokens:
+        stats["prefix_cache_hits"] += 1
+    if finish_reason == "length":
+        stats["truncated"] += 1
+        logger.warning(f"⚠️ {budget['label']} hit its max_tokens budget ({budget['max_tokens']})")
+    
+    logger.info(
+        f"📏 Token budget {budget['label']}: estimated {budget['estimated_tokens']}, max {budget['max_tokens']}, "
+        f"used {actual}, prompt {prompt_tokens} ({cached_tokens} cached)"
+    )
 
-def generate_with_openai(prompt: str, max_tokens: int = 16000, temperature: float = 0.7) -> str:
-    """Generate content using OpenAI GPT-4o-mini with retry logic"""
-    max_attempts = 5
-    base_backoff = 1.0
+# ============= LLM CLIENT =============
+
+OPENAI_MODEL = "gpt-4o-mini"
+
+# SEO sections and FAQs go through the shared provider layer (see llm_providers.py)
+openai_provider = register_provider(OpenAICompatibleProvider("openai", "OpenAI", api_key=OPENAI_API_KEY))
+# Kept for OpenAI-only endpoints (files, batches)
+openai_client = openai_provider.client
+
+OPENAI_MAX_ATTEMPTS = 5
+OPENAI_DEFAULT_TIMEOUT = 120.0        # per attempt, when no token budget is given
+OPENAI_STREAM_OPEN_TIMEOUT = 30.0     # time allowed to open a stream
+
+def settle_abandoned_attempt(limiter: Any, reserved_tokens: int) -> Callable[[Optional[Dict[str, Any]]], None]:
+    """release_attempt hook: settle an unused hedge response, refund a failed or cancelled attempt"""
+    def release(response: Optional[Dict[str, Any]]) -> None:
+        usage = (response or {}).get("usage") or {}
+        if usage.get("total_tokens") is not None:
+            limiter.settle(reserved_tokens, usage["total_tokens"])
+        else:
+            limiter.refund(reserved_tokens)
+    return release
+
+def pause_on_rate_limit(limiter: Any) -> Callable[[Exception, int], None]:
+    """Pause the provider's shared limiter so every caller waits, instead of each task backing off alone"""
+    def pause(error: Exception, attempt: int) -> None:
+        retry_after = retry_after_from_error(error)
+        sleep_time = retry_after if retry_after is not None else retry_delay(attempt)
+        logger.info(f"⏳ Rate limited. Pausing {limiter.name} requests for {sleep_time:.2f}s before retry...")
+        limiter.penalize(sleep_time)
+    return pause
+
+async def generate_with_openai(
+    prompt: str,
+    max_tokens: int = 16000,
+    temperature: float = 0.7,
+    use_cache: bool = True,
+    budget: Optional[Dict[str, Any]] = None,
+    model: Optional[str] = None,
+    system_prompt: Optional[str] = None
+) -> str:
+    """Generate content (GPT-4o-mini unless another model is routed) with retries, hedging and circuit breaking"""
+    model = model or OPENAI_MODEL
+    provider = get_provider(model)
+    timeout = OPENAI_DEFAULT_TIMEOUT
+    if budget:
+        max_tokens = budget['max_tokens']
+        timeout = budget['timeout']
     
-    for attempt in range(1, max_attempts + 1):
-        try:
-            response = openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=temperature
-            )
-            
-            generated_text = response.choices[0].message.content
-            logger.info(f"✅ OpenAI generation successful (attempt {attempt})")
-            return generated_text
-            
-        except Exception as e:
-            error_msg = str(e)
-            logger.warning(f"OpenAI request failed (attempt {attempt}/{max_attempts}): {error_msg}")
-            
-            if "rate_limit" in error_msg.lower() or "429" in error_msg:
-                if attempt == max_attempts:
-                    raise RuntimeError(f"OpenAI API rate limit exceeded: {error_msg}")
-                sleep_time = base_backoff * (2 ** (attempt - 1)) + (0.1 * attempt)
-                logger.info(f"⏳ Rate limited. Waiting {sleep_time:.2f}s before retry...")
-                time.sleep(sleep_time)
-            else:
-                if attempt == max_attempts:
-                    raise RuntimeError(f"OpenAI API error: {error_msg}")
-                time.sleep(base_backoff * (2 ** (attempt - 1)))
+    messages = build_messages(prompt, system_prompt)
+    cache_key, cached = await cached_lookup_async(cache_model_key(provider, model), messages, temperature, max_tokens, use_cache)
+    if cached is not None:
+        logger.info(f"⚡ {provider.label} completion served from cache")
+        return cached
+    
+    limiter = get_rate_limiter(provider.name)
+    reserved_tokens = estimate_request_tokens(messages, max_tokens)
+    
+    async def create_completion():
+        return await provider.complete(model, messages, max_tokens, temperature, timeout)
+    
+    response = await call_with_resilience(
+        create_completion,
+        name=provider.label,
+        attempt_timeout=timeout,
+        max_attempts=OPENAI_MAX_ATTEMPTS,
+        before_attempt=lambda: limiter.acquire(reserved_tokens),
+        on_rate_limited=pause_on_rate_limit(limiter),
+        latency_key=f"{provider.label}:{budget['label']}" if budget else provider.label,
+        release_attempt=settle_abandoned_attempt(limiter, reserved_tokens)
+    )
+    
+    generated_text = response["text"]
+    logger.info(f"✅ {provider.label} generation successful")
+    record_token_usage(budget, response["usage"], response["finish_reason"])
+    if response["usage"]:
+        limiter.settle(reserved_tokens, response["usage"].get("total_tokens"))
+    if cache_key and generated_text:
+        await llm_cache.aset(cache_key, generated_text)
+    return generated_text
+
+async def stream_with_openai(
+    prompt: str,
+    max_tokens: int = 16000,
+    temperature: float = 0.7,
+    use_cache: bool = True,
+    budget: Optional[Dict[str, Any]] = None,
+    model: Optional[str] = None,
+    system_prompt: Optional[str] = None
+) -> AsyncIterator[str]:
+    """Stream completion text as it arrives (retries only while opening the stream)"""
+    model = model or OPENAI_MODEL
+    provider = get_provider(model)
+    timeout = OPENAI_DEFAULT_TIMEOUT
+    if budget:
+        max_tokens = budget['max_tokens']
+        timeout = budget['timeout']
+    
+    messages = build_messages(prompt, system_prompt)
+    cache_key, cached = await cached_lookup_async(cache_model_key(provider, model), messages, temperature, max_tokens, use_cache)
+    if cached is not None:
+        logger.info(f"⚡ {provider.label} completion served from cache")
+        yield cached
+        return
+    
+    limiter = get_rate_limiter(provider.name)
+    reserved_tokens = estimate_request_tokens(messages, max_tokens)
+    
+    async def open_stream():
+        return await provider.open_stream(model, messages, max_tokens, temperature, timeout)
+    
+    # A stream cannot be hedged once tokens are handed out, so only opening it is retried
+    stream = await call_with_resilience(
+        open_stream,
+        name=provider.label,
+        attempt_timeout=OPENAI_STREAM_OPEN_TIMEOUT,
+        max_attempts=OPENAI_MAX_ATTEMPTS,
+        before_attempt=lambda: limiter.acquire(reserved_tokens),
+        on_rate_limited=pause_on_rate_limit(limiter),
+        hedge=False,
+        release_attempt=settle_abandoned_attempt(limiter, reserved_tokens)
+    )
+    
+    received = []
+    finish_reason = None
+    settled = False
+    try:
+        async for chunk in stream:
+            finish_reason = chunk["finish_reason"] or finish_reason
+            if chunk["usage"]:
+                record_token_usage(budget, chunk["usage"], finish_reason)
+                limiter.settle(reserved_tokens, chunk["usage"].get("total_tokens"))
+                settled = chunk["usage"].get("total_tokens") is not None
+            if chunk["delta"]:
+                received.append(chunk["delta"])
+                yield chunk["delta"]
+    except Exception as e:
+        get_circuit_breaker(provider.label).record_failure()
+        raise RuntimeError(f"{provider.label} stream interrupted: {str(e)}")
+    finally:
+        if not settled:
+            # Interrupted or closed early without a usage chunk: charge what was sent and received
+            limiter.settle(reserved_tokens, estimate_request_tokens(messages, 0) + estimate_request_tokens("".join(received), 0))
     
-    raise RuntimeError("OpenAI generation failed after all retries")
+    generated_text = "".join(received)
+    logger.info(f"✅ {provider.label} stream completed ({len(generated_text)} chars)")
+    if cache_key and generated_text:
+        await llm_cache.aset(cache_key, generated_text)
+
+@app.on_event("shutdown")
+async def close_llm_clients():
+    """Release pooled LLM connections on shutdown"""
+    await close_providers()
 
 # main.py - Part 2 (Lines 601-1200)
 # Data Transformer with Smart Content Validation
@@ -467,93 +715,17 @@ class DataTransformer:
             area_range = f"{basic.area_min} - {basic.area_max} sq.ft"
         
         # ============= SMART CONTENT VALIDATION =============
+        # Each field is scanned once (AnalyzedDocument); existing content needs 250+ words
         
-        # Check LocalityDiscription (250+ words)
-        locality_desc = None
-        locality_needs_generation = True
-        
-        if prop.LocalityDiscription:
-            word_count = count_words(prop.LocalityDiscription)
-            logger.info(f"📊 LocalityDiscription: {word_count} words")
-            
-            if is_content_sufficient(prop.LocalityDiscription, min_words=250):
-                locality_desc = clean_html_paragraphs(prop.LocalityDiscription)
-                locality_needs_generation = False
-                logger.info(f"✅ Using existing LocalityDiscription ({word_count} words) - NO generation needed")
-            else:
-                logger.info(f"⚠️ LocalityDiscription insufficient ({word_count} words < 250) - WILL generate")
-        else:
-            logger.info("⚠️ LocalityDiscription not provided - WILL generate")
-        
-        # Check Property_LocalityDiscription (250+ words)
-        prop_locality_desc = None
-        prop_locality_needs_generation = True
-        
-        if prop.Property_LocalityDiscription:
-            word_count = count_words(prop.Property_LocalityDiscription)
-            logger.info(f"📊 Property_LocalityDiscription: {word_count} words")
-            
-            if is_content_sufficient(prop.Property_LocalityDiscription, min_words=250):
-                prop_locality_desc = clean_html_paragraphs(prop.Property_LocalityDiscription)
-                prop_locality_needs_generation = False
-                logger.info(f"✅ Using existing Property_LocalityDiscription ({word_count} words) - NO generation needed")
-            else:
-                logger.info(f"⚠️ Property_LocalityDiscription insufficient ({word_count} words < 250) - WILL generate")
-        else:
-            logger.info("⚠️ Property_LocalityDiscription not provided - WILL generate")
+        locality_desc = review_existing_content("LocalityDiscription", prop.LocalityDiscription)
+        prop_locality_desc = review_existing_content("Property_LocalityDiscription", prop.Property_LocalityDiscription)
+        property_desc = review_existing_content("property_description", basic.property_description)
         
-        # Check property_description (250+ words)
-        property_desc = None
-        property_needs_generation = True
-        
-        if basic.property_description:
-            word_count = count_words(basic.property_description)
-            logger.info(f"📊 property_description: {word_count} words")
-            
-            if is_content_sufficient(basic.property_description, min_words=250):
-                property_desc = clean_html_paragraphs(basic.property_description)
-                property_needs_generation = False
-                logger.info(f"✅ Using existing property_description ({word_count} words) - NO generation needed")
-            else:
-                logger.info(f"⚠️ property_description insufficient ({word_count} words < 250) - WILL generate")
-        else:
-            logger.info("⚠️ property_description not provided - WILL generate")
-        
-        # Check developer descriptions (250+ words each)
         developer_details_desc = None
-        developer_details_needs_generation = True
-        
         developer_listing_desc = None
-        developer_listing_needs_generation = True
-        
         if dev:
-            # Check builder_details_desc
-            if dev.builder_details_desc:
-                word_count = count_words(dev.builder_details_desc)
-                logger.info(f"📊 builder_details_desc: {word_count} words")
-                
-                if is_content_sufficient(dev.builder_details_desc, min_words=250):
-                    developer_details_desc = clean_html_paragraphs(dev.builder_details_desc)
-                    developer_details_needs_generation = False
-                    logger.info(f"✅ Using existing builder_details_desc ({word_count} words) - NO generation needed")
-                else:
-                    logger.info(f"⚠️ builder_details_desc insufficient ({word_count} words < 250) - WILL generate")
-            else:
-                logger.info("⚠️ builder_details_desc not provided - WILL generate")
-            
-            # Check builder_listing_desc
-            if dev.builder_listing_desc:
-                word_count = count_words(dev.builder_listing_desc)
-                logger.info(f"📊 builder_listing_desc: {word_count} words")
-                
-                if is_content_sufficient(dev.builder_listing_desc, min_words=250):
-                    developer_listing_desc = clean_html_paragraphs(dev.builder_listing_desc)
-                    developer_listing_needs_generation = False
-                    logger.info(f"✅ Using existing builder_listing_desc ({word_count} words) - NO generation needed")
-                else:
-                    logger.info(f"⚠️ builder_listing_desc insufficient ({word_count} words < 250) - WILL generate")
-            else:
-                logger.info("⚠️ builder_listing_desc not provided - WILL generate")
+            developer_details_desc = review_existing_content("builder_details_desc", dev.builder_details_desc)
+            developer_listing_desc = review_existing_content("builder_listing_desc", dev.builder_listing_desc)
         else:
             logger.info("⚠️ Developer info not provided - WILL generate")
         
@@ -564,6 +736,8 @@ class DataTransformer:
             "BuilderID": prop.BuilderID or (dev.BuilderID if dev else None),
             "localityID": prop.localityID,
             "location": f"{prop.locality_name}, {prop.city_name}" if prop.locality_name and prop.city_name else prop.city_name,
+            "city_name": prop.city_name,
+            "locality_name": prop.locality_name,
             "configurations": [prop.bhk] if prop.bhk else [],
             "area_range": area_range,
             "price_range": price_range,
@@ -578,19 +752,19 @@ class DataTransformer:
             
             # Existing content (if sufficient)
             "locality_description": locality_desc,
-            "locality_needs_generation": locality_needs_generation,
+            "locality_needs_generation": locality_desc is None,
             
             "prop_locality_description": prop_locality_desc,
-            "prop_locality_needs_generation": prop_locality_needs_generation,
+            "prop_locality_needs_generation": prop_locality_desc is None,
             
             "property_description": property_desc,
-            "property_needs_generation": property_needs_generation,
+            "property_needs_generation": property_desc is None,
             
             "developer_details_description": developer_details_desc,
-            "developer_details_needs_generation": developer_details_needs_generation,
+            "developer_details_needs_generation": developer_details_desc is None,
             
             "developer_listing_description": developer_listing_desc,
-            "developer_listing_needs_generation": developer_listing_needs_generation,
+            "developer_listing_needs_generation": developer_listing_desc is None,
             
             "developer_founded": dev.founded_year if dev else None,
             "developer_project_count": dev.property_count if dev else None
@@ -600,37 +774,21 @@ class DataTransformer:
 
 # ============= FAQ GENERATION =============
 
-def create_faq_prompt(data: Dict[str, Any], seo_content: str) -> str:
-    """Create prompt for FAQ generation"""
-    
-    prompt = f"""You are an expert real estate FAQ generator for Homes247.in portal.
+# Instruction prefix shared by every property FAQ request, so providers can cache it.
+# Location, price, possession, RERA and home loan FAQs come from faq_engine.py instead.
+FAQ_SYSTEM_PROMPT = f"""You are an expert real estate FAQ generator for Homes247.in portal.
 
-Based on the property information below, generate 8-10 realistic FAQs that potential buyers would ask.
-
-PROPERTY DATA:
-Project: {data['project_name']}
-Builder: {data['builder'] or 'Not specified'}
-Location: {data['location'] or 'Not specified'}
-Configurations: {', '.join(data['configurations']) if data['configurations'] else 'Not specified'}
-Area: {data['area_range'] or 'Not specified'}
-Price: {data['price_range'] or 'Not specified'}
-Possession: {data['possession_date'] or 'Not specified'}
-Status: {data['status'] or 'Not specified'}
-RERA: {data['rera_id'] or 'Not specified'}
-Amenities: {', '.join(data['amenities'][:15]) if data['amenities'] else 'Not specified'}
-
-SEO CONTENT SUMMARY:
-{seo_content[:1000]}
+Each request gives PROPERTY DATA and an SEO CONTENT SUMMARY. Based on that property
+information, generate {PROPERTY_FAQ_COUNT} realistic FAQs that potential buyers would ask
+about this specific project.
 
 INSTRUCTIONS:
-1. Generate 8-10 FAQs covering these categories:
-   - Location (connectivity, neighborhood, nearby facilities)
-   - Configuration (BHK availability, spaciousness)
+1. Generate {PROPERTY_FAQ_COUNT} FAQs covering only these categories:
+   - Configuration (spaciousness, layouts, specifications)
    - Status (specific amenity questions, staff, charges)
-   - Possession (timeline, delays)
-   - Price (starting price, payment plans, home loans)
-   - Other (security features, neighborhood safety)
-   - Home Loans (appreciation potential, rental demand, contact homes247 for loan)
+   - Other (security features, project highlights)
+   Location, price, possession, RERA and home loan questions are answered elsewhere;
+   do not generate them.
 
 2. Each FAQ must have:
    - A clear, natural question
@@ -649,103 +807,126 @@ OUTPUT FORMAT (JSON only, no markdown):
     "question": "Your question here?",
     "answer_count": 1,
     "answers_text": ["First answer here"],
-    "category": "Location"
+    "category": "Status"
   }},
   {{
     "question": "Another question?",
     "answer_count": 2,
     "answers_text": ["First perspective answer", "Second perspective answer"],
-    "category": "Price"
+    "category": "Configuration"
   }}
-]
+]"""
+
+def create_faq_prompt(data: Dict[str, Any], seo_content: str) -> str:
+    """Create the property-specific FAQ request (send with FAQ_SYSTEM_PROMPT)"""
+    
+    prompt = f"""PROPERTY DATA:
+Project: {data['project_name']}
+Builder: {data['builder'] or 'Not specified'}
+Location: {data['location'] or 'Not specified'}
+Configurations: {', '.join(data['configurations']) if data['configurations'] else 'Not specified'}
+Area: {data['area_range'] or 'Not specified'}
+Status: {data['status'] or 'Not specified'}
+Amenities: {', '.join(data['amenities'][:15]) if data['amenities'] else 'Not specified'}
+
+SEO CONTENT SUMMARY:
+{seo_content[:1000]}
 
-Generate 8-10 FAQs now in JSON format only:"""
+Generate {PROPERTY_FAQ_COUNT} FAQs now in JSON format only:"""
 
     return prompt
 
-def generate_faqs(data: Dict[str, Any], seo_content: str) -> List[Dict[str, Any]]:
-    """Generate FAQs using OpenAI and format with random names"""
-    try:
-        prompt = create_faq_prompt(data, seo_content)
-        
-        logger.info("🔄 Generating FAQs with OpenAI...")
-        generated_text = generate_with_openai(prompt, max_tokens=3000, temperature=0.8)
-        
-        # Clean the response
-        generated_text = generated_text.strip()
-        if generated_text.startswith("```json"):
-            generated_text = generated_text[7:]
-        if generated_text.startswith("```"):
-            generated_text = generated_text[3:]
-        if generated_text.endswith("```"):
-            generated_text = generated_text[:-3]
-        generated_text = generated_text.strip()
-        
-        # Parse JSON
-        faqs_raw = json.loads(generated_text)
-        
-        # Format FAQs with random names
-        formatted_faqs = []
+async def complete_locality_faqs(prompt: str, system_prompt: str) -> str:
+    """Locality FAQ completion for faq_engine (it caches the parsed result itself)"""
+    return await generate_with_openai(
+        prompt, temperature=0.7, use_cache=False, budget=plan_locality_faq_budget(), system_prompt=system_prompt
+    )
+
+async def generate_faqs(data: Dict[str, Any], seo_content: str) -> List[Dict[str, Any]]:
+    """
+    Template FAQs from the property data, locality FAQs shared across the locality and
+    an LLM call only for the property-specific questions; formatted with random names
+    """
+    async def property_faqs() -> List[Dict[str, Any]]:
+        try:
+            prompt = create_faq_prompt(data, seo_content)
+            logger.info("🔄 Generating property FAQs with OpenAI...")
+            generated_text = await generate_with_openai(
+                prompt, temperature=0.8, budget=plan_faq_budget(), system_prompt=FAQ_SYSTEM_PROMPT
+            )
+            return parse_faq_json(generated_text)
+        except Exception as e:
+            logger.error(f"❌ FAQ generation failed: {str(e)}")
+            return []
+    
+    specific, locality = await asyncio.gather(property_faqs(), get_locality_faqs(data, complete_locality_faqs))
+    formatted_faqs = assemble_faqs(data, specific, locality)
+    
+    logger.info(f"✅ Generated {len(formatted_faqs)} FAQs ({len(specific)} from the property request)")
+    return formatted_faqs
+
+def assemble_faqs(data: Dict[str, Any], specific: List[Dict[str, Any]], locality: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge template, property-specific and locality FAQs into the output format"""
+    return format_faqs(merge_faqs(build_template_faqs(data), specific, with_home_loan_faq(data, locality)))
+
+def parse_faq_response(generated_text: str) -> List[Dict[str, Any]]:
+    """Parse the FAQ JSON completion and format it with random names (raises on invalid JSON)"""
+    return format_faqs(parse_faq_json(generated_text))
+
+def format_faqs(faqs_raw: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Raw FAQ dicts -> output format, with dashes removed and distinct random names"""
+    formatted_faqs = []
+    names = NameSampler(FAQ_NAME_POOL)
+    
+    for faq in faqs_raw:
+        question = faq.get('question', '')
+        answers_text = faq.get('answers_text', [])
+        category = faq.get('category', 'General')
         
-        for faq in faqs_raw:
-            question = faq.get('question', '')
-            answers_text = faq.get('answers_text', [])
-            category = faq.get('category', 'General')
-            
-            if not question or not answers_text:
-                continue
-            
-            # CRITICAL: Remove dashes from question and answers
-            question = remove_dashes_from_text(question)
-            answers_text = [remove_dashes_from_text(ans) for ans in answers_text]
-            
-            names_needed = len(answers_text) + 1
-            unique_names = get_unique_names(names_needed)
-            
-            question_asker = unique_names[0]
-            answer_givers = unique_names[1:]
-            
-            formatted_answers = []
-            for idx, answer_text in enumerate(answers_text):
-                formatted_answers.append({
-                    "first_name": answer_givers[idx],
-                    "answer": answer_text
-                })
-            
-            formatted_faq = {
-                "question": question,
-                "answers": formatted_answers,
-                "first_name": question_asker,
-                "category": category
-            }
-            
-            formatted_faqs.append(formatted_faq)
+        if not question or not answers_text:
+            continue
         
-        logger.info(f"✅ Generated {len(formatted_faqs)} FAQs")
-        return formatted_faqs
+        # CRITICAL: Remove dashes from question and answers
+        question = remove_dashes_from_text(question)
+        answers_text = sanitize_many(answers_text, dashes_only=True)
+        
+        # Names are distinct across every FAQ of the property
+        question_asker = names.next_first()
+        
+        formatted_answers = []
+        for answer_text in answers_text:
+            formatted_answers.append({
+                "first_name": names.next_first(),
+                "answer": answer_text
+            })
+        
+        formatted_faq = {
+            "question": question,
+            "answers": formatted_answers,
+            "first_name": question_asker,
+            "category": category
+        }
         
-    except Exception as e:
-        logger.error(f"❌ FAQ generation failed: {str(e)}")
-        return []
+        formatted_faqs.append(formatted_faq)
+    
+    return formatted_faqs
 
 
 # ============= REVIEW GENERATOR =============
 
-def generate_reviews(seo_content: str, count: int = 10) -> List[Dict[str, Any]]:
-    """Generate reviews using app.py"""
-    if generate_reviews_from_text is None:
+async def generate_reviews(transformed_data: Dict[str, Any], count: int = 10, source: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Generate reviews using app.py from the transformed property data (source: "remote" / "local")"""
+    if generate_reviews_from_features_async is None:
         logger.warning("Review generator not available. Returning empty reviews.")
         return []
     
     try:
-        # Remove dashes before generating reviews
-        clean_content = remove_dashes_from_text(seo_content)
-        json_str, reviews = generate_reviews_from_text(clean_content, count)
+        reviews = await generate_reviews_from_features_async(transformed_data, count, source)
         
         # Remove dashes from generated reviews
-        for review in reviews:
-            if 'review' in review:
-                review['review'] = remove_dashes_from_text(review['review'])
+        with_text = [review for review in reviews if 'review' in review]
+        for review, text in zip(with_text, sanitize_many([r['review'] for r in with_text], dashes_only=True)):
+            review['review'] = text
         
         return reviews
     except Exception as e:
@@ -757,10 +938,21 @@ def generate_reviews(seo_content: str, count: int = 10) -> List[Dict[str, Any]]:
 
 # ============= SMART PROMPT BUILDER =============
 
-# Replace the create_optimized_prompt function in your main.py with this version
+# (section marker, needs-generation flag, transformed_data / result key)
+SEO_SECTIONS = [
+    ("LOCATION DESCRIPTION", "locality_needs_generation", "locality_description"),
+    ("PROPERTY LOCALITY DESCRIPTION", "prop_locality_needs_generation", "prop_locality_description"),
+    ("PROPERTY DESCRIPTION", "property_needs_generation", "property_description"),
+    ("DEVELOPER DETAILS DESCRIPTION", "developer_details_needs_generation", "developer_details_description"),
+    ("DEVELOPER LISTING DESCRIPTION", "developer_listing_needs_generation", "developer_listing_description"),
+]
 
-def create_optimized_prompt(data: Dict[str, Any]) -> str:
-    """Create SEO-optimized prompt with strategic keyword repetition"""
+def get_sections_to_generate(data: Dict[str, Any]) -> List[str]:
+    """Return the section markers whose content must be generated"""
+    return [name for name, flag, _ in SEO_SECTIONS if data.get(flag)]
+
+def build_prompt_context(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Derive keywords, location parts and web context shared by all section prompts"""
     
     # Extract location components
     location = data.get('location', 'Area')
@@ -796,162 +988,135 @@ def create_optimized_prompt(data: Dict[str, Any]) -> str:
         except:
             pass
     
-    sections_to_generate = []
-    prompt = f"""You are an expert SEO content writer for Homes247.in real estate portal.
-
-**CRITICAL SEO INSTRUCTIONS:**
-1. Generate 5 COMPLETELY DIFFERENT sections
-2. Each section starts with: === SECTION_NAME ===
-3. Use PRIMARY KEYWORD "{primary_keyword}" 3-4 times naturally across all sections
-4. Use SECONDARY KEYWORD "{secondary_keyword}" 2-4 times naturally
-5. Use LOCATION "{location_keyword}" frequently (4-6 times total)
-6. NO dash symbols (–, -, —)
-7. Use only <p>, <strong>, <br> tags
-8. Write in clean HTML paragraphs
-9. Keywords should appear naturally, not forced
-
-**PROPERTY DATA:**
-Project: {data['project_name']}
-Builder: {data.get('builder', 'Developer')}
-Location: {location}
-Property Type: {property_type}
-Configurations: {', '.join(configurations) if configurations else 'Various'}
-Area: {data.get('area_range', 'Varies')}
-Price: {data.get('price_range', 'Contact for pricing')}
+    return {
+        "location": location,
+        "locality": locality,
+        "city": city,
+        "configurations": configurations,
+        "property_type": property_type,
+        "primary_keyword": primary_keyword,
+        "secondary_keyword": secondary_keyword,
+        "location_keyword": location_keyword,
+        "web_context": web_context
+    }
 
-"""
+def build_section_block(section_name: str) -> str:
+    """Static instruction block for a single SEO section (property values come from the request)"""
     
     # Section 1: LocalityDiscription (ONLY LOCATION - NO PROPERTY)
-    if data['locality_needs_generation']:
-        prompt += f"""
-=== LOCATION DESCRIPTION ===
+    if section_name == "LOCATION DESCRIPTION":
+        return """
+SECTION: LOCATION DESCRIPTION
 
-Write 250-300 words about {locality} area in {city} ONLY.
-DO NOT mention "{data['project_name']}" property name.
+Write 250-300 words about the LOCALITY area in the CITY ONLY.
+DO NOT mention the PROJECT name.
 DO NOT mention any builder name.
 
 **KEYWORD USAGE (3-4 times in this section):**
-- Use "{secondary_keyword}" 2 times
-- Use "{location_keyword}" 2-3 times
+- Use the SECONDARY KEYWORD 2 times
+- Use the LOCATION KEYWORD 2-3 times
 
 **Structure:**
-<p>Paragraph 1: {locality} is a prominent locality in {city} known for excellent connectivity. Mention "{secondary_keyword}" naturally. Discuss roads, highways, metro stations, and public transport in {locality}...</p>
+<p>Paragraph 1: The LOCALITY is a prominent locality in the CITY known for excellent connectivity. Mention the SECONDARY KEYWORD naturally. Discuss roads, highways, metro stations, and public transport in the LOCALITY...</p>
 
-<p>Paragraph 2: The infrastructure in {locality} makes it ideal for residential living. Mention nearby amenities like schools, hospitals, shopping malls, and IT hubs that make "{secondary_keyword}" highly desirable...</p>
+<p>Paragraph 2: The infrastructure in the LOCALITY makes it ideal for residential living. Mention nearby amenities like schools, hospitals, shopping malls, and IT hubs that make the SECONDARY KEYWORD highly desirable...</p>
 
-<p>Paragraph 3: Growth potential of {locality} area with upcoming infrastructure projects, metro expansions, and real estate development in {city}...</p>
+<p>Paragraph 3: Growth potential of the LOCALITY area with upcoming infrastructure projects, metro expansions, and real estate development in the CITY...</p>
 
-**REMEMBER:** Use "{secondary_keyword}" naturally 2 times in this section.
+**REMEMBER:** Use the SECONDARY KEYWORD naturally 2 times in this section.
 
 """
-        sections_to_generate.append("LOCATION DESCRIPTION")
     
     # Section 2: Property_LocalityDiscription (PROPERTY + LOCATION)
-    if data['prop_locality_needs_generation']:
-        prompt += f"""
-=== PROPERTY LOCALITY DESCRIPTION ===
+    if section_name == "PROPERTY LOCALITY DESCRIPTION":
+        return """
+SECTION: PROPERTY LOCALITY DESCRIPTION
 
-Write 250-300 words about {data['project_name']} in {locality}.
-**CRITICAL:** Use "{primary_keyword}" 2-3 times naturally in this section.
+Write 250-300 words about the PROJECT in the LOCALITY.
+**CRITICAL:** Use the PRIMARY KEYWORD 2-3 times naturally in this section.
 
 **KEYWORD USAGE (4-5 times in this section):**
-- Use "{primary_keyword}" 2-3 times
-- Use "{location_keyword}" 3-4 times
-- Mention property name 2-3 times
+- Use the PRIMARY KEYWORD 2-3 times
+- Use the LOCATION KEYWORD 3-4 times
+- Mention the PROJECT name 2-3 times
 
 **Structure:**
-<p>Paragraph 1: {data['project_name']} in {locality} offers {property_type} that redefine modern living in {city}. These "{primary_keyword}" provide excellent connectivity advantages with proximity to major highways, metro stations, and business districts...</p>
+<p>Paragraph 1: The PROJECT in the LOCALITY offers the PROPERTY TYPE that redefine modern living in the CITY. These PRIMARY KEYWORD homes provide excellent connectivity advantages with proximity to major highways, metro stations, and business districts...</p>
 
-<p>Paragraph 2: Residents of {data['project_name']} benefit from {locality}'s strategic location. The "{primary_keyword}" are surrounded by quality schools, healthcare facilities, and shopping centers. Commuting from {location_keyword} to key areas is seamless...</p>
+<p>Paragraph 2: Residents of the PROJECT benefit from the LOCALITY's strategic location. The PRIMARY KEYWORD homes are surrounded by quality schools, healthcare facilities, and shopping centers. Commuting from the LOCATION KEYWORD to key areas is seamless...</p>
 
-<p>Paragraph 3: Investing in {data['project_name']} means securing one of the finest "{primary_keyword}" available. The project combines modern amenities with the location benefits of {locality}, making it ideal for families and professionals in {city}...</p>
+<p>Paragraph 3: Investing in the PROJECT means securing one of the finest PRIMARY KEYWORD homes available. The project combines modern amenities with the location benefits of the LOCALITY, making it ideal for families and professionals in the CITY...</p>
 
-**REMEMBER:** Use "{primary_keyword}" naturally 2-3 times in this section.
+**REMEMBER:** Use the PRIMARY KEYWORD naturally 2-3 times in this section.
 
 """
-        sections_to_generate.append("PROPERTY LOCALITY DESCRIPTION")
     
     # Section 3: Property Description (FULL PROPERTY DETAILS)
-    if data['property_needs_generation']:
-        highlights_text = ""
-        if data['highlights']:
-            highlights_text = '<br>'.join([h for h in data['highlights'][:10]])
-        else:
-            highlights_text = "Create 8-10 bullet points about property features"
-        
-        prompt += f"""
-=== PROPERTY DESCRIPTION ===
+    if section_name == "PROPERTY DESCRIPTION":
+        return """
+SECTION: PROPERTY DESCRIPTION
 
 **KEYWORD USAGE (2-3 times in ABOUT section):**
-- Use "{primary_keyword}" 1-2 times in ABOUT section
-- Use property name 2-3 times throughout
-- Use "{location_keyword}" 2-3 times
+- Use the PRIMARY KEYWORD 1-2 times in ABOUT section
+- Use the PROJECT name 2-3 times throughout
+- Use the LOCATION KEYWORD 2-3 times
 
-<p><strong>OVERVIEW</strong><br>
-<strong>Project Name:</strong> {data['project_name']}<br>
-<strong>Builder:</strong> {data['builder'] or 'Developer name'}<br>
-<strong>Location:</strong> {location}<br>
-<strong>Configurations:</strong> {', '.join(configurations) if configurations else 'Various'}<br>
-<strong>Area Range:</strong> {data['area_range'] or 'Varies'}<br>
-<strong>Price Range:</strong> {data['price_range'] or 'Contact for pricing'}<br>
-<strong>Possession:</strong> {data['possession_date'] or data['status'] or 'Contact for details'}</p>
+Start with the OVERVIEW block given in the request, copied exactly as written (same lines, same values).
 
 <p><strong>ABOUT</strong><br>
-{data['project_name']} by {data['builder'] or 'the developer'} is a premium residential project offering {property_type}. Write 250-300 words naturally incorporating "{primary_keyword}" 1-2 times. These "{primary_keyword}" are designed for modern families seeking luxury and comfort in {location_keyword}. Describe the project's unique features, spacious configurations, lifestyle benefits, and what makes these "{primary_keyword}" stand out in the market. Highlight the living experience, community atmosphere, and quality construction standards that make {data['project_name']} exceptional among "{primary_keyword}".</p>
+The PROJECT by the BUILDER is a premium residential project offering the PROPERTY TYPE. Write 250-300 words naturally incorporating the PRIMARY KEYWORD 1-2 times. These homes are designed for modern families seeking luxury and comfort in the LOCATION KEYWORD. Describe the project's unique features, spacious configurations, lifestyle benefits, and what makes them stand out in the market. Highlight the living experience, community atmosphere, and quality construction standards that make the PROJECT exceptional.</p>
 
 <p><strong>HIGHLIGHTS</strong><br>
-{highlights_text}</p>
+List the HIGHLIGHTS given in the request separated by <br>, or create 8-10 bullet points about property features if none are given.</p>
 
 <p><strong>AMENITIES</strong><br>
-Write 200 words about amenities: {', '.join(data['amenities'][:20]) if data['amenities'] else 'Modern amenities'}. Group by categories (fitness, leisure, convenience, security). Describe how these amenities enhance the lifestyle experience for residents of these "{primary_keyword}".</p>
+Write 200 words about the AMENITIES given in the request. Group by categories (fitness, leisure, convenience, security). Describe how these amenities enhance the lifestyle experience for residents of these PRIMARY KEYWORD homes.</p>
 
 <p><strong>SPECIFICATIONS</strong><br>
-Write 100 words about unit specifications: area ranges {data['area_range'] or ''}, possession {data['possession_date'] or ''}, RERA {data['rera_id'] or 'Contact for details'}, total units, and other technical details.</p>
+Write 100 words about unit specifications: AREA, POSSESSION, RERA, total units, and other technical details.</p>
 
 <p><strong>WHO SHOULD BUY THIS</strong></p>
 
 <p><strong>Ideal for Families:</strong><br>
-Write 3-4 sentences explaining why {data['project_name']} is perfect for families. Mention proximity to schools, safe environment, and spacious living.</p>
+Write 3-4 sentences explaining why the PROJECT is perfect for families. Mention proximity to schools, safe environment, and spacious living.</p>
 
 <p><strong>Perfect for Working Professionals:</strong><br>
 Write 3-4 sentences about benefits for professionals. Mention connectivity to IT hubs, modern amenities, work-life balance.</p>
 
 <p><strong>Smart Investment Opportunity:</strong><br>
-Write 3-4 sentences about investment potential in {location_keyword}. Mention appreciation prospects, rental demand, and quality construction.</p>
+Write 3-4 sentences about investment potential in the LOCATION KEYWORD. Mention appreciation prospects, rental demand, and quality construction.</p>
 
 """
-        sections_to_generate.append("PROPERTY DESCRIPTION")
     
     # Section 4: Developer Details (COMPANY BACKGROUND)
-    if data['developer_details_needs_generation']:
-        prompt += f"""
-=== DEVELOPER DETAILS DESCRIPTION ===
+    if section_name == "DEVELOPER DETAILS DESCRIPTION":
+        return """
+SECTION: DEVELOPER DETAILS DESCRIPTION
 
-Write 250-300 words ABOUT {data.get('builder', 'THE DEVELOPER')} COMPANY ONLY.
+Write 250-300 words ABOUT THE BUILDER COMPANY ONLY.
 This is COMPANY INFORMATION - history, experience, completed projects.
 DO NOT write about location or property.
 DO NOT write about "why choose" or buyer benefits.
 DO NOT use keywords about apartments or location here.
 
-<p>Paragraph 1: {data.get('builder', 'The developer')} is a prominent real estate developer with a vision to create exceptional living spaces. Discuss company founding year, establishment story, initial projects, and how it started in the real estate business...</p>
+<p>Paragraph 1: The BUILDER is a prominent real estate developer with a vision to create exceptional living spaces. Discuss company founding year, establishment story, initial projects, and how it started in the real estate business...</p>
 
-<p>Paragraph 2: With extensive experience in construction, {data.get('builder', 'The developer')} has successfully delivered numerous residential and commercial projects. Mention years in business, types of projects completed, scale of developments, and expertise areas...</p>
+<p>Paragraph 2: With extensive experience in construction, the BUILDER has successfully delivered numerous residential and commercial projects. Mention years in business, types of projects completed, scale of developments, and expertise areas...</p>
 
-<p>Paragraph 3: {data.get('builder', 'The developer')} maintains high quality standards through modern construction methods, premium materials, strict safety protocols, and industry certifications. Discuss building practices and quality assurance...</p>
+<p>Paragraph 3: The BUILDER maintains high quality standards through modern construction methods, premium materials, strict safety protocols, and industry certifications. Discuss building practices and quality assurance...</p>
 
-<p>Paragraph 4: Customer satisfaction is central to {data.get('builder', 'The developer')}'s operations. The company ensures transparency, maintains strong client relationships, provides excellent service, and has built a solid market reputation...</p>
+<p>Paragraph 4: Customer satisfaction is central to the BUILDER's operations. The company ensures transparency, maintains strong client relationships, provides excellent service, and has built a solid market reputation...</p>
 
-Web context: {web_context[:500] if web_context else 'Leading real estate developer with proven track record'}
+Use the WEB CONTEXT given in the request for facts about the BUILDER.
 
 """
-        sections_to_generate.append("DEVELOPER DETAILS DESCRIPTION")
     
     # Section 5: Developer Listing (WHY CHOOSE THIS BUILDER)
-    if data['developer_listing_needs_generation']:
-        prompt += f"""
-=== DEVELOPER LISTING DESCRIPTION ===
+    if section_name == "DEVELOPER LISTING DESCRIPTION":
+        return """
+SECTION: DEVELOPER LISTING DESCRIPTION
 
-Write 250-300 words about WHY HOMEBUYERS SHOULD CHOOSE {data.get('builder', 'THIS DEVELOPER')}.
+Write 250-300 words about WHY HOMEBUYERS SHOULD CHOOSE THE BUILDER.
 This is BUYER BENEFITS section - not company history.
 DO NOT repeat company background from previous section.
 DO NOT write about location or specific property.
@@ -959,26 +1124,49 @@ DO NOT use apartment/location keywords here.
 
 <p>Paragraph 1: Choosing the right developer is crucial for homebuyers when investing in real estate. The developer's reputation directly impacts construction quality, timely delivery, and long-term property value. Explain why trust and reliability matter...</p>
 
-<p>Paragraph 2: {data.get('builder', 'This developer')} demonstrates unwavering commitment to quality construction through use of premium materials, adherence to safety standards, and focus on durability. Homes built by {data.get('builder', 'this developer')} are designed to last, providing long-term value to buyers...</p>
+<p>Paragraph 2: The BUILDER demonstrates unwavering commitment to quality construction through use of premium materials, adherence to safety standards, and focus on durability. Homes built by the BUILDER are designed to last, providing long-term value to buyers...</p>
 
-<p>Paragraph 3: {data.get('builder', 'This developer')} has an excellent track record of timely project delivery, ensuring buyers can move into their homes as scheduled. This reliability provides peace of mind and demonstrates professionalism in project execution and timeline management...</p>
+<p>Paragraph 3: The BUILDER has an excellent track record of timely project delivery, ensuring buyers can move into their homes as scheduled. This reliability provides peace of mind and demonstrates professionalism in project execution and timeline management...</p>
 
-<p>Paragraph 4: {data.get('builder', 'This developer')} prioritizes customer service excellence, offering value for money, comprehensive after-sales support, warranty programs, and maintenance assistance. This customer-first approach ensures buyer satisfaction extends well beyond the purchase...</p>
+<p>Paragraph 4: The BUILDER prioritizes customer service excellence, offering value for money, comprehensive after-sales support, warranty programs, and maintenance assistance. This customer-first approach ensures buyer satisfaction extends well beyond the purchase...</p>
 
 """
-        sections_to_generate.append("DEVELOPER LISTING DESCRIPTION")
     
-    if not sections_to_generate:
-        return None
+    raise ValueError(f"Unknown section: {section_name}")
+
+def build_seo_system_prompt() -> str:
+    """Instruction prefix shared by every SEO request, so providers can cache it"""
+    prompt = """You are an expert SEO content writer for Homes247.in real estate portal.
+
+Each request gives the PROPERTY DATA, the KEYWORDS and the list of SECTIONS TO GENERATE.
+Words in capitals below (PROJECT, BUILDER, LOCALITY, CITY, LOCATION, PROPERTY TYPE,
+PRIMARY KEYWORD, SECONDARY KEYWORD, LOCATION KEYWORD, ...) refer to those request values.
+Always write the actual values, never the capitalised placeholder words.
+
+**CRITICAL SEO INSTRUCTIONS:**
+1. Generate ONLY the sections listed in the request, in the order listed, each COMPLETELY DIFFERENT
+2. Each section starts with: === SECTION_NAME ===
+3. Use the PRIMARY KEYWORD 3-4 times naturally across all sections
+4. Use the SECONDARY KEYWORD 2-4 times naturally
+5. Use the LOCATION KEYWORD frequently (4-6 times total)
+6. NO dash symbols (–, -, —)
+7. Use only <p>, <strong>, <br> tags
+8. Write in clean HTML paragraphs
+9. Keywords should appear naturally, not forced
+
+**SECTION INSTRUCTIONS:**
+"""
+    for section_name, _, _ in SEO_SECTIONS:
+        prompt += build_section_block(section_name)
     
-    prompt += f"""
+    prompt += """
 
 **FINAL CRITICAL RULES:**
 1. Start each section with: === SECTION_NAME ===
 2. Make each section COMPLETELY DIFFERENT in content
-3. USE PRIMARY KEYWORD "{primary_keyword}" 2-3 TIMES TOTAL (naturally distributed)
-4. USE SECONDARY KEYWORD "{secondary_keyword}" 2-3 TIMES TOTAL
-5. USE LOCATION "{location_keyword}" 6-7 TIMES TOTAL
+3. USE THE PRIMARY KEYWORD 2-3 TIMES TOTAL (naturally distributed)
+4. USE THE SECONDARY KEYWORD 2-3 TIMES TOTAL
+5. USE THE LOCATION KEYWORD 6-7 TIMES TOTAL
 6. Keywords must flow naturally in sentences
 7. Location section = ONLY about locality (no property, no builder)
 8. Property Locality = PROPERTY + LOCATION combination (use primary keyword 2-3 times)
@@ -989,81 +1177,351 @@ DO NOT use apartment/location keywords here.
 13. Clean HTML paragraphs only
 
 **KEYWORD DISTRIBUTION SUMMARY:**
-- Location Description: "{secondary_keyword}" × 2, "{location_keyword}" × 2-4
-- Property Locality Description: "{primary_keyword}" × 2-3, "{location_keyword}" × 2-3
-- Property Description: "{primary_keyword}" × 1-2 in ABOUT section
-- Developer sections: NO apartment/location keywords
+- Location Description: SECONDARY KEYWORD × 2, LOCATION KEYWORD × 2-4
+- Property Locality Description: PRIMARY KEYWORD × 2-3, LOCATION KEYWORD × 2-3
+- Property Description: PRIMARY KEYWORD × 1-2 in ABOUT section
+- Developer sections: NO apartment/location keywords"""
+    return prompt
+
+def build_property_data_block(data: Dict[str, Any], ctx: Dict[str, Any]) -> str:
+    """Property facts and keywords: the variable part of every SEO request"""
+    configurations = ctx['configurations']
+    return f"""**PROPERTY DATA:**
+PROJECT: {data['project_name']}
+BUILDER: {data.get('builder') or 'the developer'}
+LOCATION: {ctx['location']}
+LOCALITY: {ctx['locality']}
+CITY: {ctx['city']}
+PROPERTY TYPE: {ctx['property_type']}
+CONFIGURATIONS: {', '.join(configurations) if configurations else 'Various'}
+AREA: {data.get('area_range') or 'Varies'}
+PRICE: {data.get('price_range') or 'Contact for pricing'}
+POSSESSION: {data.get('possession_date') or data.get('status') or 'Contact for details'}
+RERA: {data.get('rera_id') or 'Contact for details'}
+
+**KEYWORDS:**
+PRIMARY KEYWORD: "{ctx['primary_keyword']}"
+SECONDARY KEYWORD: "{ctx['secondary_keyword']}"
+LOCATION KEYWORD: "{ctx['location_keyword']}"
 
-Generate ALL sections NOW with natural keyword usage:"""
+"""
+
+def build_overview_block(data: Dict[str, Any], ctx: Dict[str, Any]) -> str:
+    """The PROPERTY DESCRIPTION's OVERVIEW facts, filled in here rather than left to the model"""
+    configurations = ctx['configurations']
+    return f"""<p><strong>OVERVIEW</strong><br>
+<strong>Project Name:</strong> {data['project_name']}<br>
+<strong>Builder:</strong> {data.get('builder') or 'Developer name'}<br>
+<strong>Location:</strong> {ctx['location']}<br>
+<strong>Configurations:</strong> {', '.join(configurations) if configurations else 'Various'}<br>
+<strong>Area Range:</strong> {data.get('area_range') or 'Varies'}<br>
+<strong>Price Range:</strong> {data.get('price_range') or 'Contact for pricing'}<br>
+<strong>Possession:</strong> {data.get('possession_date') or data.get('status') or 'Contact for details'}</p>"""
+
+def build_section_values(section_name: str, data: Dict[str, Any], ctx: Dict[str, Any]) -> str:
+    """Request values only one section needs"""
+    if section_name == "PROPERTY DESCRIPTION":
+        highlights = '<br>'.join(data['highlights'][:10]) if data['highlights'] else 'None given'
+        amenities = ', '.join(data['amenities'][:20]) if data['amenities'] else 'Modern amenities'
+        return f"OVERVIEW (copy exactly):\n{build_overview_block(data, ctx)}\nHIGHLIGHTS: {highlights}\nAMENITIES: {amenities}\n"
+    if section_name == "DEVELOPER DETAILS DESCRIPTION":
+        web_context = ctx['web_context']
+        return f"WEB CONTEXT: {web_context[:500] if web_context else 'Leading real estate developer with proven track record'}\n"
+    return ""
+
+def build_sections_request(data: Dict[str, Any], ctx: Dict[str, Any], sections: List[str]) -> str:
+    """Variable suffix of an SEO request: property data, keywords and the sections wanted"""
+    prompt = build_property_data_block(data, ctx)
+    
+    values = "".join(build_section_values(name, data, ctx) for name in sections)
+    if values:
+        prompt += f"**SECTION DETAILS:**\n{values}\n"
+    
+    prompt += "**SECTIONS TO GENERATE (in this order):**\n"
+    prompt += "".join(f"=== {name} ===\n" for name in sections)
+    
+    if len(sections) == 1:
+        prompt += f"\nGenerate ONLY the {sections[0]} section NOW with natural keyword usage:"
+    else:
+        prompt += "\nGenerate ALL listed sections NOW with natural keyword usage:"
+    return prompt
+
+def create_optimized_prompt(data: Dict[str, Any]) -> str:
+    """Create the request for every section that needs generation (send with SEO_SYSTEM_PROMPT)"""
+    
+    sections_to_generate = get_sections_to_generate(data)
+    if not sections_to_generate:
+        return None
+    
+    ctx = build_prompt_context(data)
+    prompt = build_sections_request(data, ctx, sections_to_generate)
     
     logger.info(f"📝 Will generate {len(sections_to_generate)} sections: {', '.join(sections_to_generate)}")
-    logger.info(f"🎯 Target keyword occurrences: '{primary_keyword}' (3-4×), '{secondary_keyword}' (2-3×)")
+    logger.info(f"🎯 Target keyword occurrences: '{ctx['primary_keyword']}' (3-4×), '{ctx['secondary_keyword']}' (2-3×)")
     
     return prompt
 
-# Update the generate_seo_content function to include keyword validation
+def create_section_prompt(data: Dict[str, Any], section_name: str, ctx: Dict[str, Any]) -> str:
+    """Create the request for one SEO section (per-section mode, send with SEO_SYSTEM_PROMPT)"""
+    return build_sections_request(data, ctx, [section_name])
+
+# Built once: identical for every SEO request
+SEO_SYSTEM_PROMPT = build_seo_system_prompt()
+
+
+# ============= STREAMING SECTION PARSER =============
+
+SECTION_MARKER_PATTERN = re.compile(r'===\s*([A-Z][A-Z ]*?)\s*===')
+SEO_SECTION_NAMES = {name for name, _, _ in SEO_SECTIONS}
+
+# Longest marker we expect, used to rescan a marker split across two chunks
+MAX_MARKER_LENGTH = 64
+
+class SectionStreamParser:
+    """Splits a streamed completion at === SECTION === markers as tokens arrive"""
+    
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.buffer = ""
+        self.current: Optional[str] = None
+        self.scan_from = 0
+    
+    @property
+    def text(self) -> str:
+        """Everything received so far"""
+        return "".join(self.chunks)
+    
+    def feed(self, chunk: str) -> List[tuple]:
+        """Add a chunk and return (section_name, raw_content) for sections that just closed"""
+        self.chunks.append(chunk)
+        self.buffer += chunk
+        finished = []
+        
+        while True:
+            match = SECTION_MARKER_PATTERN.search(self.buffer, self.scan_from)
+            if not match:
+                self.scan_from = max(0, len(self.buffer) - MAX_MARKER_LENGTH)
+                break
+            
+            name = re.sub(r'\s+', ' ', match.group(1)).strip()
+            if name not in SEO_SECTION_NAMES:
+                self.scan_from = match.end()
+                continue
+            
+            if self.current:
+                finished.append((self.current, self.buffer[:match.start()]))
+            
+            # Drop everything up to the marker, the buffer only holds the open section
+            self.current = name
+            self.buffer = self.buffer[match.end():]
+            self.scan_from = 0
+        
+        return finished
+    
+    def finish(self) -> List[tuple]:
+        """Close the last open section once the stream ends"""
+        if not self.current:
+            return []
+        finished = [(self.current, self.buffer)]
+        self.current = None
+        self.buffer = ""
+        return finished
+
+def finalize_streamed_section(section_name: str, raw_content: str) -> Optional[str]:
+    """Clean and validate one section cut from the stream (None if it is unusable)"""
+    content = clean_generated_content(raw_content)
+    paragraphs = re.findall(r'<p>.*?</p>', content, re.DOTALL)
+    if not paragraphs:
+        return None
+    
+    result = clean_generated_content('\n'.join(paragraphs))
+    word_count = count_words(result)
+    if word_count <= 50:
+        logger.warning(f"⚠️ Streamed {section_name} too short ({word_count} words)")
+        return None
+    
+    logger.info(f"✅ Streamed {section_name}: {word_count} words")
+    return result
 
 # ============= CONTENT GENERATOR =============
 
-async def generate_seo_content(data: Dict[str, Any]) -> Dict[str, Any]:
+# "per_section" sends one request per section concurrently, "single" sends one combined prompt,
+# "stream" streams the combined prompt and hands out each section as soon as it is complete
+SEO_GENERATION_MODE = "per_section"
+
+# Called as on_section(section_name, content) when a generated section is final
+SectionCallback = Callable[[str, Optional[str]], None]
+
+def get_existing_content(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Existing (sufficient) content for every section, keyed like the generation result"""
+    return {result_key: data.get(result_key) for _, _, result_key in SEO_SECTIONS}
+
+async def generate_single_section(
+    data: Dict[str, Any],
+    section_name: str,
+    ctx: Dict[str, Any],
+    use_cache: bool = True
+) -> Optional[str]:
+    """Generate and extract one SEO section from its own completion"""
+    prompt = create_section_prompt(data, section_name, ctx)
+    generated_text = await generate_with_openai(
+        prompt, temperature=0.8, use_cache=use_cache, budget=plan_output_budget([section_name]), system_prompt=SEO_SYSTEM_PROMPT
+    )
+    generated_text = clean_generated_content(generated_text)
+    
+    content = extract_section(generated_text, section_name)
+    if not content:
+        # The response only holds this section, so every paragraph belongs to it
+        paragraphs = re.findall(r'<p>.*?</p>', generated_text, re.DOTALL)
+        content = '\n'.join(paragraphs).strip() if paragraphs else None
+    
+    # A slice can end on a bare [Skip] line the full-text pass kept (its $ only matches at the end)
+    return clean_generated_content(content) if content else None
+
+async def generate_sections_concurrently(
+    data: Dict[str, Any],
+    sections: List[str],
+    on_section: Optional[SectionCallback] = None
+) -> Dict[str, Optional[str]]:
+    """Run one completion per section concurrently and map section name -> content"""
+    ctx = await asyncio.to_thread(build_prompt_context, data)
+    
+    async def run_section(name: str) -> Optional[str]:
+        try:
+            content = await generate_single_section(data, name, ctx)
+        except Exception:
+            notify_section(on_section, name, None)
+            raise
+        notify_section(on_section, name, content)
+        return content
+    
+    logger.info(f"📝 Generating {len(sections)} sections concurrently: {', '.join(sections)}")
+    results = await asyncio.gather(
+        *[run_section(name) for name in sections],
+        return_exceptions=True
+    )
+    
+    contents = {}
+    errors = []
+    for name, outcome in zip(sections, results):
+        if isinstance(outcome, Exception):
+            logger.error(f"❌ Section {name} failed: {outcome}")
+            errors.append(outcome)
+            contents[name] = None
+        else:
+            contents[name] = outcome
+    
+    if errors and len(errors) == len(sections):
+        raise errors[0]
+    
+    return contents
+
+async def generate_sections_combined(
+    data: Dict[str, Any],
+    sections: List[str],
+    on_section: Optional[SectionCallback] = None
+) -> Dict[str, Optional[str]]:
+    """Generate every section from one combined prompt and map section name -> content"""
+    # Prompt building may scrape the web, keep it off the event loop
+    prompt = await asyncio.to_thread(create_optimized_prompt, data)
+    
+    # Generate with higher temperature for more variety
+    generated_text = await generate_with_openai(
+        prompt, temperature=0.8, budget=plan_output_budget(sections), system_prompt=SEO_SYSTEM_PROMPT
+    )
+    
+    logger.info(f"📄 Generated text length: {len(generated_text)} chars")
+    
+    # Clean the generated text
+    generated_text = clean_generated_content(generated_text)
+    
+    # Extract every section from one index; slices get a final pass for [Skip] lines they now end on
+    contents = {
+        name: clean_generated_content(content) if content else None
+        for name, content in extract_sections(generated_text, sections).items()
+    }
+    for name in sections:
+        notify_section(on_section, name, contents[name])
+    
+    return contents
+
+async def generate_sections_streaming(
+    data: Dict[str, Any],
+    sections: List[str],
+    on_section: Optional[SectionCallback] = None
+) -> Dict[str, Optional[str]]:
+    """Stream the combined prompt and finalize each section as soon as its end marker arrives"""
+    # Prompt building may scrape the web, keep it off the event loop
+    prompt = await asyncio.to_thread(create_optimized_prompt, data)
+    
+    parser = SectionStreamParser()
+    contents: Dict[str, Optional[str]] = {}
+    
+    def accept(finished: List[tuple]) -> None:
+        for name, raw_content in finished:
+            if name not in sections or contents.get(name):
+                continue
+            content = finalize_streamed_section(name, raw_content)
+            if content:
+                contents[name] = content
+                notify_section(on_section, name, content)
+    
+    async for chunk in stream_with_openai(
+        prompt, temperature=0.8, budget=plan_output_budget(sections), system_prompt=SEO_SYSTEM_PROMPT
+    ):
+        accept(parser.feed(chunk))
+    accept(parser.finish())
+    
+    # Sections the marker scan could not cut cleanly go through the full-text extractor
+    missing = [name for name in sections if not contents.get(name)]
+    if missing:
+        logger.warning(f"⚠️ Falling back to full-text extraction for: {', '.join(missing)}")
+        generated_text = clean_generated_content(parser.text)
+        for name, content in extract_sections(generated_text, missing).items():
+            contents[name] = clean_generated_content(content) if content else None
+            notify_section(on_section, name, contents[name])
+    
+    return contents
+
+def notify_section(on_section: Optional[SectionCallback], section_name: str, content: Optional[str]) -> None:
+    """Invoke the section callback without letting it break generation"""
+    if on_section is None:
+        return
+    try:
+        on_section(section_name, content)
+    except Exception as e:
+        logger.warning(f"⚠️ Section callback failed for {section_name}: {e}")
+
+async def generate_seo_content(
+    data: Dict[str, Any],
+    mode: Optional[str] = None,
+    on_section: Optional[SectionCallback] = None
+) -> Dict[str, Any]:
     """Generate SEO content - SIMPLIFIED VERSION WITHOUT KEYWORD VALIDATION"""
     try:
-        prompt = create_optimized_prompt(data)
+        sections = get_sections_to_generate(data)
         
-        # If prompt is None, all content is sufficient
-        if prompt is None:
+        # If nothing needs generation, all content is sufficient
+        if not sections:
             logger.info("✨ All content sufficient - returning existing content")
-            return {
-                "locality_description": data.get('locality_description'),
-                "prop_locality_description": data.get('prop_locality_description'),
-                "property_description": data.get('property_description'),
-                "developer_details_description": data.get('developer_details_description'),
-                "developer_listing_description": data.get('developer_listing_description'),
-                "generation_skipped": True
-            }
-        
-        logger.info(f"🔄 Generating content...")
-        
-        # Generate with higher temperature for more variety
-        generated_text = generate_with_openai(prompt, max_tokens=16000, temperature=0.8)
-        
-        logger.info(f"📄 Generated text length: {len(generated_text)} chars")
-        
-        # Clean the generated text
-        generated_text = clean_generated_content(generated_text)
-        
-        # Extract each section
-        result = {}
-        
-        if data['locality_needs_generation']:
-            content = extract_section(generated_text, 'LOCATION DESCRIPTION')
-            result['locality_description'] = clean_generated_content(content) if content else None
-        else:
-            result['locality_description'] = data.get('locality_description')
-        
-        if data['prop_locality_needs_generation']:
-            content = extract_section(generated_text, 'PROPERTY LOCALITY DESCRIPTION')
-            result['prop_locality_description'] = clean_generated_content(content) if content else None
-        else:
-            result['prop_locality_description'] = data.get('prop_locality_description')
+            result = get_existing_content(data)
+            result['generation_skipped'] = True
+            return result
         
-        if data['property_needs_generation']:
-            content = extract_section(generated_text, 'PROPERTY DESCRIPTION')
-            result['property_description'] = clean_generated_content(content) if content else None
-        else:
-            result['property_description'] = data.get('property_description')
+        mode = mode or SEO_GENERATION_MODE
+        logger.info(f"🔄 Generating content ({mode} mode)...")
         
-        if data['developer_details_needs_generation']:
-            content = extract_section(generated_text, 'DEVELOPER DETAILS DESCRIPTION')
-            result['developer_details_description'] = clean_generated_content(content) if content else None
+        if mode == "per_section":
+            contents = await generate_sections_concurrently(data, sections, on_section)
+        elif mode == "stream":
+            contents = await generate_sections_streaming(data, sections, on_section)
         else:
-            result['developer_details_description'] = data.get('developer_details_description')
+            contents = await generate_sections_combined(data, sections, on_section)
         
-        if data['developer_listing_needs_generation']:
-            content = extract_section(generated_text, 'DEVELOPER LISTING DESCRIPTION')
-            result['developer_listing_description'] = clean_generated_content(content) if content else None
-        else:
-            result['developer_listing_description'] = data.get('developer_listing_description')
+        result = get_existing_content(data)
+        for name, flag, result_key in SEO_SECTIONS:
+            if data.get(flag):
+                result[result_key] = contents.get(name)
         
         result['generation_skipped'] = False
         
@@ -1073,101 +1531,170 @@ async def generate_seo_content(data: Dict[str, Any]) -> Dict[str, Any]:
         raise RuntimeError(f"Content generation failed: {str(e)}")
     
 
-def extract_section(text: str, section_name: str) -> Optional[str]:
-    """Extract sections with multiple fallback strategies - ULTRA ROBUST VERSION"""
-    try:
-        if not text or not text.strip():
+
+# ============= SECTION INDEX =============
+
+OVERVIEW_TAG = '<p><strong>OVERVIEW'
+PARAGRAPH_PATTERN = re.compile(r'<p>.*?</p>', re.DOTALL)
+
+def find_all(haystack: str, needle: str) -> List[int]:
+    """Non-overlapping offsets of a literal (C-level str.find, far faster than a regex alternation)"""
+    positions = []
+    index = haystack.find(needle)
+    while index != -1:
+        positions.append(index)
+        index = haystack.find(needle, index + len(needle))
+    return positions
+
+class SectionIndex:
+    """
+    Offsets of every section marker in a completion, built once: fence runs (===, ###),
+    section names (any case) and OVERVIEW tags are located with literal searches over
+    the text and one lowercased copy, then walked in order. Each section is looked up
+    the way extract_section always did (=== NAME ===, then ### NAME, then the bare
+    name, then OVERVIEW, then by position), but from the recorded offsets: paragraphs
+    are matched inside the section's span without copying the text.
+    """
+    
+    def __init__(self, text: str):
+        self.source = text
+        self.text = text.strip()
+        self.fences: List[tuple] = []                      # (start, end, fence char)
+        self.markers: Dict[str, Dict[str, List[tuple]]] = {
+            name: {"===": [], "###": [], "bare": []} for name in SEO_SECTION_NAMES
+        }
+        self.overviews: List[tuple] = []
+        self._all_paragraphs: Optional[List[str]] = None
+        self._scan()
+    
+    def _gap_is_space(self, start: int, end: int) -> bool:
+        return start == end or self.text[start:end].isspace()
+    
+    @staticmethod
+    def _add(occurrences: List[tuple], span: tuple) -> None:
+        # Occurrences never overlap, as with re.split
+        if not occurrences or span[0] >= occurrences[-1][1]:
+            occurrences.append(span)
+    
+    def _tokens(self) -> List[tuple]:
+        """(start, end, kind, value) for every fence run, section name and OVERVIEW tag, in order"""
+        text = self.text
+        tokens = []
+        for fence in '=#':
+            index = text.find(fence * 3)
+            while index != -1:
+                end = index + 3
+                while end < len(text) and text[end] == fence:
+                    end += 1
+                tokens.append((index, end, 'fence', fence))
+                index = text.find(fence * 3, end)
+        
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            for name in SEO_SECTION_NAMES:
+                tokens.extend((i, i + len(name), 'name', name) for i in find_all(lowered, name.lower()))
+            tokens.extend((i, i + len(OVERVIEW_TAG), 'overview', None) for i in find_all(lowered, OVERVIEW_TAG.lower()))
+        else:
+            # Lowercasing changed some character's length, offsets would not line up
+            for name in SEO_SECTION_NAMES:
+                tokens.extend((m.start(), m.end(), 'name', name) for m in re.finditer(re.escape(name), text, re.IGNORECASE))
+            tokens.extend((m.start(), m.end(), 'overview', None) for m in re.finditer(re.escape(OVERVIEW_TAG), text, re.IGNORECASE))
+        
+        tokens.sort()
+        return tokens
+    
+    def _scan(self) -> None:
+        pending = []                                       # (name, start, end) waiting for a closing ===
+        for start, end, kind, value in self._tokens():
+            if kind == 'fence':
+                self.fences.append((start, end, value))
+                if value == '=':
+                    for name, m_start, m_end in pending:
+                        if self._gap_is_space(m_end, start):
+                            self._add(self.markers[name]["==="], (m_start, start + 3))
+                pending = []
+            elif kind == 'overview':
+                self.overviews.append((start, end))
+                pending = []
+            else:
+                name = value
+                self.markers[name]["bare"].append((start, end))
+                pending = []
+                if self.fences:
+                    f_start, f_end, fence = self.fences[-1]
+                    if self._gap_is_space(f_end, start):
+                        if fence == '#':
+                            self._add(self.markers[name]["###"], (f_end - 3, end))
+                        else:
+                            pending.append((name, f_end - 3, end))
+    
+    def _section_end(self, start: int, limit: int) -> int:
+        """First '===' or '###' followed by whitespace in [start, limit), else limit"""
+        for f_start, f_end, _ in self.fences:
+            if f_end - max(f_start, start) >= 3 and f_end < limit and self.text[f_end].isspace():
+                return f_end - 3
+        return limit
+    
+    def paragraphs(self, start: int = 0, end: Optional[int] = None) -> List[str]:
+        return PARAGRAPH_PATTERN.findall(self.text, start, len(self.text) if end is None else end)
+    
+    @property
+    def all_paragraphs(self) -> List[str]:
+        if self._all_paragraphs is None:
+            self._all_paragraphs = self.paragraphs()
+        return self._all_paragraphs
+    
+    def _marker_spans(self, section_name: str) -> List[tuple]:
+        """(label, occurrences) in the order extract_section has always tried them"""
+        found = self.markers[section_name]
+        spans = [
+            (f"=== {section_name} ===", found["==="]),
+            (f"### {section_name}", found["###"]),
+            (section_name, found["bare"]),
+        ]
+        if section_name == 'PROPERTY DESCRIPTION':
+            spans.append(("<p><strong>OVERVIEW", self.overviews))
+        return spans
+    
+    def extract(self, section_name: str) -> Optional[str]:
+        """One section's paragraphs, or None if every strategy fails"""
+        if not self.text:
             logger.error(f"❌ Empty text provided for extraction")
             return None
+        if section_name not in SEO_SECTION_NAMES:
+            logger.error(f"❌ Unknown section {section_name}")
+            return None
         
-        text = text.strip()
         logger.info(f"🔍 Attempting to extract: {section_name}")
-        logger.info(f"📄 Full text length: {len(text)} chars, {len(text.split())} words")
-        
-        # Strategy 1: Try === SECTION_NAME === markers
-        section_patterns = {
-            'LOCATION DESCRIPTION': [
-                r'===\s*LOCATION DESCRIPTION\s*===',
-                r'###\s*LOCATION DESCRIPTION',
-                r'LOCATION DESCRIPTION'
-            ],
-            'PROPERTY LOCALITY DESCRIPTION': [
-                r'===\s*PROPERTY LOCALITY DESCRIPTION\s*===',
-                r'###\s*PROPERTY LOCALITY DESCRIPTION',
-                r'PROPERTY LOCALITY DESCRIPTION'
-            ],
-            'PROPERTY DESCRIPTION': [
-                r'===\s*PROPERTY DESCRIPTION\s*===',
-                r'###\s*PROPERTY DESCRIPTION',
-                r'PROPERTY DESCRIPTION',
-                r'<p><strong>OVERVIEW'
-            ],
-            'DEVELOPER DETAILS DESCRIPTION': [
-                r'===\s*DEVELOPER DETAILS DESCRIPTION\s*===',
-                r'###\s*DEVELOPER DETAILS DESCRIPTION',
-                r'DEVELOPER DETAILS DESCRIPTION'
-            ],
-            'DEVELOPER LISTING DESCRIPTION': [
-                r'===\s*DEVELOPER LISTING DESCRIPTION\s*===',
-                r'###\s*DEVELOPER LISTING DESCRIPTION',
-                r'DEVELOPER LISTING DESCRIPTION'
-            ]
-        }
-        
-        patterns = section_patterns.get(section_name, [section_name])
         
-        # Try each pattern
-        for pattern in patterns:
-            try:
-                # Split by this pattern
-                parts = re.split(pattern, text, flags=re.IGNORECASE)
-                
-                if len(parts) > 1:
-                    logger.info(f"✅ Found section marker: {pattern}")
-                    content = parts[1]
-                    
-                    # Find the end of this section (next === or ### or end)
-                    next_section = re.search(r'(===|###)\s+', content)
-                    if next_section:
-                        content = content[:next_section.start()]
-                    
-                    # Extract all paragraphs
-                    paragraphs = re.findall(r'<p>.*?</p>', content, re.DOTALL)
-                    
-                    if paragraphs:
-                        result = '\n'.join(paragraphs).strip()
-                        word_count = count_words(result)
-                        
-                        if word_count > 50:
-                            logger.info(f"✅ Extracted {section_name}: {word_count} words via pattern '{pattern}'")
-                            return result
-                        else:
-                            logger.warning(f"⚠️ Content too short ({word_count} words)")
-                            
-            except Exception as e:
-                logger.warning(f"⚠️ Pattern '{pattern}' failed: {e}")
+        # Strategy 1: marker forms; the section runs to the next ===/### or the next identical marker
+        for label, occurrences in self._marker_spans(section_name):
+            if not occurrences:
                 continue
-        
-        # Strategy 2: PROPERTY DESCRIPTION - Look for OVERVIEW tag
-        if section_name == 'PROPERTY DESCRIPTION':
-            overview_match = re.search(
-                r'(<p><strong>OVERVIEW.*?)(?:===|###|\Z)',
-                text,
-                re.DOTALL | re.IGNORECASE
-            )
-            if overview_match:
-                content = overview_match.group(1).strip()
-                word_count = count_words(content)
-                if word_count > 100:
-                    logger.info(f"✅ Extracted {section_name} via OVERVIEW: {word_count} words")
-                    return content
-        
-        # Strategy 3: Split text into 5 equal chunks and assign by position
+            start = occurrences[0][1]
+            limit = occurrences[1][0] if len(occurrences) > 1 else len(self.text)
+            paragraphs = self.paragraphs(start, self._section_end(start, limit))
+            if paragraphs:
+                result = '\n'.join(paragraphs).strip()
+                word_count = count_words(result)
+                if word_count > 50:
+                    logger.info(f"✅ Extracted {section_name}: {word_count} words via marker '{label}'")
+                    return result
+                logger.warning(f"⚠️ Content too short ({word_count} words)")
+        
+        # Strategy 2: PROPERTY DESCRIPTION - everything from the OVERVIEW tag to the next fence
+        if section_name == 'PROPERTY DESCRIPTION' and self.overviews:
+            start = self.overviews[0][0]
+            end = next((f_start for f_start, _, _ in self.fences if f_start >= self.overviews[0][1]), len(self.text))
+            content = self.text[start:end].strip()
+            word_count = count_words(content)
+            if word_count > 100:
+                logger.info(f"✅ Extracted {section_name} via OVERVIEW: {word_count} words")
+                return content
+        
+        # Strategy 3: assign paragraphs by position (shared paragraph list for every section)
         logger.warning(f"⚠️ No markers found. Attempting smart paragraph distribution...")
-        
-        all_paragraphs = re.findall(r'<p>.*?</p>', text, re.DOTALL)
-        total_paragraphs = len(all_paragraphs)
-        
+        total_paragraphs = len(self.all_paragraphs)
         logger.info(f"📊 Total paragraphs found: {total_paragraphs}")
         
         if total_paragraphs < 10:
@@ -1185,23 +1712,133 @@ def extract_section(text: str, section_name: str) -> Optional[str]:
             'DEVELOPER LISTING DESCRIPTION': (chunk_size * 4 + chunk_size // 2, total_paragraphs)
         }
         
-        if section_name in section_ranges:
-            start, end = section_ranges[section_name]
-            selected_paragraphs = all_paragraphs[start:end]
-            
-            if selected_paragraphs:
-                result = '\n'.join(selected_paragraphs).strip()
-                word_count = count_words(result)
-                logger.info(f"✅ Extracted {section_name} via smart distribution: {word_count} words (paragraphs {start}-{end})")
-                return result
+        start, end = section_ranges[section_name]
+        selected_paragraphs = self.all_paragraphs[start:end]
+        if selected_paragraphs:
+            result = '\n'.join(selected_paragraphs).strip()
+            word_count = count_words(result)
+            logger.info(f"✅ Extracted {section_name} via smart distribution: {word_count} words (paragraphs {start}-{end})")
+            return result
         
         logger.error(f"❌ All extraction strategies failed for {section_name}")
         return None
-        
+    
+    def extract_all(self, section_names: List[str]) -> Dict[str, Optional[str]]:
+        return {name: self.extract(name) for name in section_names}
+
+_last_section_index: Optional[SectionIndex] = None
+
+def index_sections(text: str) -> SectionIndex:
+    """Section index for a completion; the last one is reused for repeated lookups"""
+    global _last_section_index
+    index = _last_section_index
+    if index is None or index.source is not text and index.source != text:
+        index = SectionIndex(text)
+        _last_section_index = index
+        logger.info(f"📄 Indexed {len(index.text)} chars: {len(index.fences)} fences, {len(index.overviews)} OVERVIEW tags")
+    return index
+
+def extract_sections(text: str, section_names: List[str]) -> Dict[str, Optional[str]]:
+    """Every requested section from one index of the completion"""
+    if not text or not text.strip():
+        logger.error(f"❌ Empty text provided for extraction")
+        return {name: None for name in section_names}
+    try:
+        return index_sections(text).extract_all(section_names)
+    except Exception as e:
+        logger.error(f"❌ Fatal error extracting {', '.join(section_names)}: {e}")
+        return {name: None for name in section_names}
+
+def extract_section(text: str, section_name: str) -> Optional[str]:
+    """Extract sections with multiple fallback strategies - ULTRA ROBUST VERSION"""
+    try:
+        if not text or not text.strip():
+            logger.error(f"❌ Empty text provided for extraction")
+            return None
+        return index_sections(text).extract(section_name)
     except Exception as e:
         logger.error(f"❌ Fatal error extracting {section_name}: {e}")
         return None
 
+# ============= NEAR-DUPLICATE GATE =============
+
+# Regenerate (once) a generated section that nearly repeats another property's stored section
+DUPLICATE_GATE_ENABLED = True
+
+# generate_seo_content result key -> output / store field (see format_output)
+SECTION_OUTPUT_FIELDS = {
+    "locality_description": "locality_desc",
+    "prop_locality_description": "prop_locality_desc",
+    "property_description": "prop_desc",
+    "developer_details_description": "builder_desc_details",
+    "developer_listing_description": "builder_desc_listing",
+}
+
+async def apply_duplicate_gate(
+    data: Dict[str, Any],
+    generated_content: Dict[str, Any],
+    skip_keys: tuple = ()
+) -> Dict[str, Any]:
+    """
+    Check the generated sections (except skip_keys) against the stored corpus
+    (near_duplicates.py) and regenerate, concurrently and without the LLM cache, those
+    that repeat another property's section. A regenerated text is kept only if it is
+    no longer a near duplicate.
+    """
+    if not DUPLICATE_GATE_ENABLED or generated_content.get('generation_skipped'):
+        return generated_content
+    
+    owner = {"propid": data.get('propertyID'), "localityid": data.get('localityID'), "builderid": data.get('BuilderID')}
+    candidates = [
+        (name, result_key, SECTION_OUTPUT_FIELDS[result_key])
+        for name, flag, result_key in SEO_SECTIONS
+        if result_key not in skip_keys and data.get(flag) and generated_content.get(result_key)
+    ]
+    if not candidates:
+        return generated_content
+    
+    def check_all() -> List[Optional[tuple]]:
+        return [find_near_duplicate(generated_content[key], field, owner) for _, key, field in candidates]
+    
+    try:
+        matches = await asyncio.to_thread(check_all)
+    except Exception as e:
+        logger.warning(f"⚠️ Near-duplicate gate skipped: {e}")
+        return generated_content
+    
+    flagged = []
+    for (name, result_key, field), match in zip(candidates, matches):
+        if match:
+            logger.warning(f"⚠️ {name} is a near duplicate of {match[0]} ({match[1]:.0%} similar) - regenerating")
+            flagged.append((name, result_key, field))
+    if not flagged:
+        return generated_content
+    
+    try:
+        ctx = await asyncio.to_thread(build_prompt_context, data)
+    except Exception as e:
+        logger.error(f"❌ Regenerating near duplicates failed: {e}")
+        return generated_content
+    
+    async def regenerate(name: str, field: str) -> Optional[str]:
+        try:
+            replacement = await generate_single_section(data, name, ctx, use_cache=False)
+            if replacement and not await asyncio.to_thread(find_near_duplicate, replacement, field, owner):
+                return replacement
+        except Exception as e:
+            logger.error(f"❌ Regenerating {name} failed: {e}")
+            return None
+        logger.warning(f"⚠️ Regenerated {name} is still a near duplicate, keeping the first version")
+        return None
+    
+    replacements = await asyncio.gather(*(regenerate(name, field) for name, _, field in flagged))
+    for (name, result_key, _), replacement in zip(flagged, replacements):
+        if replacement:
+            generated_content[result_key] = replacement
+            logger.info(f"✅ Replaced near-duplicate {name}")
+    
+    return generated_content
+
 def validate_extracted_content(
     locality_desc: Optional[str],
     prop_locality_desc: Optional[str],
@@ -1351,11 +1988,8 @@ async def send_to_company_api(payload: Dict[str, Any]) -> Dict[str, Any]:
         logger.info(f"📊 Form data keys: {list(form_payload.keys())}")
         logger.info(f"📏 Payload size: {len(str(form_payload))} bytes")
 
-        response = requests.post(
-            COMPANY_CALLBACK_API,
-            data=form_payload,
-            timeout=30
-        )
+        client = get_async_client()
+        response = await client.post(COMPANY_CALLBACK_API, data=form_payload, timeout=30)
 
         logger.info(f"📨 Response status code: {response.status_code}")
         logger.info(f"📨 Response text: {response.text[:500]}")
@@ -1372,11 +2006,11 @@ async def send_to_company_api(payload: Dict[str, Any]) -> Dict[str, Any]:
 
         return result
 
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         logger.error(f"❌ Timeout sending to company API: {COMPANY_CALLBACK_API}")
         result["error"] = "timeout"
         return result
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"❌ Request failed to company API: {str(e)}")
         result["error"] = str(e)
         return result
@@ -1385,6 +2019,100 @@ async def send_to_company_api(payload: Dict[str, Any]) -> Dict[str, Any]:
         result["error"] = str(e)
         return result
 
+# ============= GENERATION PIPELINE =============
+
+async def generate_content_bundle(
+    transformed_data: Dict[str, Any],
+    body_data: Dict[str, Any],
+    fallback_on_seo_error: bool = False
+) -> tuple:
+    """
+    Generate SEO content, reviews and FAQs for one property.
+    Reviews only need the transformed data and start right away; FAQs start as soon
+    as the property description is final instead of waiting for the remaining
+    (developer) sections.
+    Returns (generated_content, reviews, faqs, seo_generation_error)
+    """
+    property_ready = asyncio.get_running_loop().create_future()
+    property_gate: Optional[asyncio.Task] = None
+    
+    async def gate_property_description(content: Optional[str]) -> Optional[str]:
+        gated = await apply_duplicate_gate(transformed_data, {'property_description': content})
+        return gated['property_description']
+    
+    def on_section(section_name: str, content: Optional[str]) -> None:
+        # FAQs are built from the property description, so it passes the near-duplicate gate first
+        nonlocal property_gate
+        if section_name != "PROPERTY DESCRIPTION" or property_gate is not None or property_ready.done():
+            return
+        property_gate = asyncio.create_task(gate_property_description(content))
+        
+        def resolve(task: asyncio.Task) -> None:
+            if property_ready.done():
+                return
+            if task.cancelled() or task.exception() is not None:
+                property_ready.set_result(content)
+            else:
+                property_ready.set_result(task.result())
+        property_gate.add_done_callback(resolve)
+    
+    if not transformed_data.get('property_needs_generation'):
+        property_ready.set_result(transformed_data.get('property_description'))
+    
+    async def generate_downstream() -> tuple:
+        logger.info("🔄 Generating reviews...")
+        reviews_task = asyncio.create_task(generate_reviews(transformed_data, count=10))
+        try:
+            property_description = await property_ready
+        except asyncio.CancelledError:
+            reviews_task.cancel()
+            raise
+        full_seo = property_description or get_fallback_seo_text_from_payload(body_data)
+        
+        logger.info("🔄 Generating FAQs...")
+        reviews, faqs = await asyncio.gather(
+            reviews_task,
+            generate_faqs(transformed_data, full_seo),
+            return_exceptions=True
+        )
+        if isinstance(reviews, Exception):
+            logger.error(f"❌ Review generation failed: {reviews}")
+            reviews = []
+        if isinstance(faqs, Exception):
+            logger.error(f"❌ FAQ generation failed: {faqs}")
+            faqs = []
+        logger.info(f"✅ Generated {len(reviews)} reviews and {len(faqs)} FAQs")
+        return reviews, faqs
+    
+    downstream_task = asyncio.create_task(generate_downstream())
+    
+    seo_generation_error = None
+    try:
+        generated_content = await generate_seo_content(transformed_data, on_section=on_section)
+        skip_keys = ()
+        if property_gate is not None and generated_content.get('property_description'):
+            generated_content['property_description'] = await property_ready
+            skip_keys = ('property_description',)
+        generated_content = await apply_duplicate_gate(transformed_data, generated_content, skip_keys)
+        logger.info("✅ Content generation completed")
+    except Exception as e:
+        if property_gate is not None:
+            property_gate.cancel()
+        if not fallback_on_seo_error:
+            downstream_task.cancel()
+            raise
+        seo_generation_error = str(e)
+        logger.error(f"❌ Content generation failed: {seo_generation_error}")
+        # Use existing content as fallback
+        generated_content = get_existing_content(transformed_data)
+        generated_content['generation_skipped'] = False
+    
+    if not property_ready.done():
+        property_ready.set_result(generated_content.get('property_description'))
+    
+    reviews, faqs = await downstream_task
+    return generated_content, reviews, faqs, seo_generation_error
+
 # ============= BACKGROUND PROCESSOR =============
 
 async def process_data_background(body_data: Any, raw_body: bytes):
@@ -1399,47 +2127,11 @@ async def process_data_background(body_data: Any, raw_body: bytes):
                 logger.info("✅ Data transformed successfully")
                 
                 logger.info("🔄 Generating content (conditional based on word counts)...")
-                generated_content = None
-                seo_generation_error = None
-                try:
-                    generated_content = await generate_seo_content(transformed_data)
-                    logger.info("✅ Content generation completed")
-                except Exception as e:
-                    seo_generation_error = str(e)
-                    logger.error(f"❌ Content generation failed: {seo_generation_error}")
-                    # Use existing content as fallback
-                    generated_content = {
-                        "locality_description": transformed_data.get('locality_description'),
-                        "prop_locality_description": transformed_data.get('prop_locality_description'),
-                        "property_description": transformed_data.get('property_description'),
-                        "developer_details_description": transformed_data.get('developer_details_description'),
-                        "developer_listing_description": transformed_data.get('developer_listing_description'),
-                        "generation_skipped": False
-                    }
-                
-                # Combine property description with full SEO content if needed
-                if generated_content.get('property_description'):
-                    full_seo = generated_content['property_description']
-                else:
-                    full_seo = get_fallback_seo_text_from_payload(body_data)
-                
-                logger.info("🔄 Generating reviews...")
-                reviews = []
-                try:
-                    reviews = generate_reviews(full_seo, count=10)
-                    logger.info(f"✅ Generated {len(reviews)} reviews")
-                except Exception as e:
-                    logger.error(f"❌ Review generation failed: {e}")
-                    reviews = []
-                
-                logger.info("🔄 Generating FAQs...")
-                faqs = []
-                try:
-                    faqs = generate_faqs(transformed_data, full_seo)
-                    logger.info(f"✅ Generated {len(faqs)} FAQs")
-                except Exception as e:
-                    logger.error(f"❌ FAQ generation failed: {e}")
-                    faqs = []
+                generated_content, reviews, faqs, seo_generation_error = await generate_content_bundle(
+                    transformed_data,
+                    body_data,
+                    fallback_on_seo_error=True
+                )
                 
                 formatted_output = format_output(
                     transformed_data,
@@ -1452,6 +2144,7 @@ async def process_data_background(body_data: Any, raw_body: bytes):
                 logger.info("✅ Output formatted successfully")
                 
                 save_generated_data(formatted_output)
+                await index_generated_data(formatted_output)
                 
                 callback_result = await send_to_company_api(formatted_output)
                 logger.info(f"📡 Callback result: {callback_result}")
@@ -1558,12 +2251,7 @@ async def generate_manual(request: Request):
         incoming_data = IncomingPropertyData(**body_data)
         transformed_data = DataTransformer.transform(incoming_data)
         
-        generated_content = await generate_seo_content(transformed_data)
-        
-        full_seo = generated_content.get('property_description') or get_fallback_seo_text_from_payload(body_data)
-        
-        reviews = generate_reviews(full_seo, count=10)
-        faqs = generate_faqs(transformed_data, full_seo)
+        generated_content, reviews, faqs, _ = await generate_content_bundle(transformed_data, body_data)
         
         formatted_output = format_output(
             transformed_data,
@@ -1617,13 +2305,19 @@ async def root():
 async def health_check():
     return {
         "status": "healthy",
-        "ai_provider": "OpenAI",
-        "ai_model": "gpt-4o-mini",
+        "ai_provider": get_provider(OPENAI_MODEL).label,
+        "ai_model": OPENAI_MODEL,
+        "llm_backend": LLM_BACKEND,
         "timestamp": datetime.now().isoformat(),
         "openai_ready": True,
-        "review_generator_ready": generate_reviews_from_text is not None,
+        "review_generator_ready": generate_reviews_from_features_async is not None,
         "faq_generator_ready": True,
         "smart_validation": True,
+        "llm_cache": llm_cache.stats(),
+        "token_budget": token_budget_stats,
+        "rate_limits": rate_limit_stats(),
+        "resilience": resilience_stats(),
+        "http_transport": transport_stats(),
         "callback_api": COMPANY_CALLBACK_API
     }
 
@@ -1639,12 +2333,7 @@ async def process_property_debug(request: Request):
 
         transformed_data = DataTransformer.transform(incoming_data)
 
-        generated_content = await generate_seo_content(transformed_data)
-        
-        full_seo = generated_content.get('property_description') or get_fallback_seo_text_from_payload(body_data)
-
-        reviews = generate_reviews(full_seo, count=10)
-        faqs = generate_faqs(transformed_data, full_seo)
+        generated_content, reviews, faqs, _ = await generate_content_bundle(transformed_data, body_data)
 
         formatted_output = format_output(
             transformed_data,
@@ -1693,12 +2382,7 @@ async def test_callback(request: Request):
         incoming_data = IncomingPropertyData(**body_data)
         transformed_data = DataTransformer.transform(incoming_data)
         
-        generated_content = await generate_seo_content(transformed_data)
-        
-        full_seo = generated_content.get('property_description') or get_fallback_seo_text_from_payload(body_data)
-        
-        reviews = generate_reviews(full_seo, count=10)
-        faqs = generate_faqs(transformed_data, full_seo)
+        generated_content, reviews, faqs, _ = await generate_content_bundle(transformed_data, body_data)
         
         formatted_output = format_output(
             transformed_data,
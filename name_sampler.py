@@ -0,0 +1,98 @@
+# name_sampler.py - Name allocation shared by FAQ (main.py) and review (app.py) generation
+"""
+Name pools are registered once at import time: duplicates are dropped and the pools
+are frozen into tuples. Each property then gets its own NameSampler, which hands out
+distinct first names without replacement in O(1) per draw (LazyShuffle, a lazy
+Fisher-Yates shuffle: only the swapped positions are remembered, so nothing is copied
+or rescanned). app.py reuses LazyShuffle for review dates.
+
+When a pool runs out, the sampler starts a new pass and adds a two-digit suffix to
+first names so they stay distinguishable, as the old review name generator did.
+"""
+import random
+from typing import Dict, Iterable, Optional, Tuple
+
+DEFAULT_REGION = "general"
+
+
+class LazyShuffle:
+    """Indices 0..size-1 in random order, one per call, O(1) each (sparse Fisher-Yates)"""
+
+    def __init__(self, size: int, rng: Optional[random.Random] = None):
+        self.size = size
+        self.rng = rng or random
+        self._swaps: Dict[int, int] = {}
+        self._cursor = 0
+
+    def remaining(self) -> int:
+        return self.size - self._cursor
+
+    def next_index(self) -> int:
+        if self._cursor >= self.size:
+            raise IndexError("LazyShuffle exhausted")
+        i = self._cursor
+        j = self.rng.randrange(i, self.size)
+        picked = self._swaps.get(j, j)
+        self._swaps[j] = self._swaps.get(i, i)
+        self._swaps.pop(i, None)
+        self._cursor += 1
+        return picked
+
+
+class NamePool:
+    """Deduplicated, immutable first / last name lists for one region"""
+
+    def __init__(self, region: str, first: Iterable[str], last: Iterable[str] = ()):
+        self.region = region
+        self.first: Tuple[str, ...] = tuple(dict.fromkeys(n.strip() for n in first if n and n.strip()))
+        self.last: Tuple[str, ...] = tuple(dict.fromkeys(n.strip() for n in last if n and n.strip()))
+        if not self.first:
+            raise ValueError(f"Name pool '{region}' has no first names")
+
+
+class NameSampler:
+    """Per-property sampler: distinct first names until the pool is exhausted"""
+
+    def __init__(self, pool: NamePool, rng: Optional[random.Random] = None):
+        self.pool = pool
+        self.rng = rng or random
+        self._order = LazyShuffle(len(pool.first), self.rng)
+        self._passes = 0
+
+    def next_first(self) -> str:
+        if not self._order.remaining():
+            self._order = LazyShuffle(len(self.pool.first), self.rng)
+            self._passes += 1
+
+        name = self.pool.first[self._order.next_index()]
+        if self._passes:
+            name = f"{name}{self.rng.randint(10, 99)}"
+        return name
+
+    def next_last(self) -> str:
+        return self.rng.choice(self.pool.last) if self.pool.last else ""
+
+    def next_name(self) -> Tuple[str, str]:
+        """(first_name, last_name) with a first name not yet used by this sampler"""
+        return self.next_first(), self.next_last()
+
+
+_pools: Dict[str, NamePool] = {}
+
+
+def register_name_pool(region: str, first: Iterable[str], last: Iterable[str] = ()) -> NamePool:
+    pool = NamePool(region, first, last)
+    _pools[region] = pool
+    return pool
+
+
+def get_name_pool(region: str) -> NamePool:
+    """Pool for a region, falling back to the general pool"""
+    pool = _pools.get(region) or _pools.get(DEFAULT_REGION)
+    if pool is None:
+        raise RuntimeError(f"No name pool registered for '{region}' and no '{DEFAULT_REGION}' fallback")
+    return pool
+
+
+def name_sampler(region: str = DEFAULT_REGION) -> NameSampler:
+    return NameSampler(get_name_pool(region))
@@ -0,0 +1,418 @@
+# near_duplicates.py - MinHash / LSH near-duplicate index over the generated corpus
+"""
+main.validate_extracted_content only compares the sections of one property with
+each other. This module answers "what in the whole stored corpus is this similar
+to?" without comparing against every document:
+
+  - every section and review is reduced to word 5-gram shingles, and each shingle
+    is hashed once (crc32);
+  - a MinHash signature (NUM_PERM multiply-shift hashes, computed for all shingles
+    at once with NumPy) estimates Jaccard similarity as the share of equal slots;
+  - the signature is cut into LSH_BANDS bands. Documents that share a band bucket
+    are the only candidates checked, so a lookup touches a handful of documents
+    instead of the whole corpus.
+
+Signatures are cached in SQLite by text digest, so rebuilding the index over
+generated_content.json only hashes new or changed texts.
+
+Matches inside the same property are ignored. So are matches between copies of a
+shared field (a locality description reused for another project in the same
+locality, builder descriptions of the same builder).
+
+Used two ways:
+  - generation-time gate: main.apply_duplicate_gate regenerates a section that
+    nearly repeats another property's stored section;
+  - batch audit over the store:
+        python near_duplicates.py audit [generated_content.json] [--threshold 0.6] [--no-reviews]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from text_metrics import plain_text
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIG --------------------
+SHINGLE_SIZE = 5                     # words per shingle
+NUM_PERM = 128
+LSH_BANDS = 32                       # 32 bands x 4 rows: pairs from ~0.45 Jaccard up usually share a bucket
+DUPLICATE_THRESHOLD = 0.6            # estimated Jaccard reported as a near duplicate
+MINHASH_SEED = 247
+GENERATED_DATA_FILE = "generated_content.json"
+SIGNATURE_DB_FILE = "near_duplicates.sqlite3"
+
+# Output field -> owner field whose documents legitimately share the same text
+SECTION_FIELDS = {
+    "prop_desc": None,
+    "locality_desc": "localityid",
+    "prop_locality_desc": None,
+    "builder_desc_details": "builderid",
+    "builder_desc_listing": "builderid",
+}
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+_rng = np.random.default_rng(MINHASH_SEED)
+HASH_MULTIPLIERS = _rng.integers(1, 2**63, size=NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+HASH_OFFSETS = _rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+
+
+# -------------------- SIGNATURES --------------------
+def shingle_hashes(text: str) -> np.ndarray:
+    """Distinct crc32 hashes of the word shingles of a (possibly HTML) text"""
+    words = WORD_PATTERN.findall(plain_text(text or "").lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    span = min(SHINGLE_SIZE, len(words))
+    hashes = {zlib.crc32(" ".join(words[i:i + span]).encode("utf-8")) for i in range(len(words) - span + 1)}
+    return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    """NUM_PERM-slot MinHash signature (uint32), or None for a text without words"""
+    hashes = shingle_hashes(text)
+    if not hashes.size:
+        return None
+    # Multiply-shift hashing; uint64 products wrap around, the top 32 bits are the hash
+    permuted = (hashes[:, None] * HASH_MULTIPLIERS[None, :] + HASH_OFFSETS[None, :]) >> np.uint64(32)
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def text_digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SignatureStore:
+    """SQLite cache of signatures by text digest; identical texts are hashed once"""
+
+    def __init__(self, db_path: Optional[str] = SIGNATURE_DB_FILE):
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        if db_path:
+            try:
+                self._conn = sqlite3.connect(db_path, check_same_thread=False)
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS signatures (digest TEXT PRIMARY KEY, num_perm INTEGER, signature BLOB)"
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Signature cache unavailable ({e}), hashing everything in memory")
+                self._conn = None
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        return self.signatures([text])[0]
+
+    def signatures(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        digests = [text_digest(t) for t in texts]
+        known: Dict[str, np.ndarray] = {}
+        if self._conn is not None:
+            with self._lock:
+                unique = list(set(digests))
+                for start in range(0, len(unique), 500):
+                    chunk = unique[start:start + 500]
+                    rows = self._conn.execute(
+                        f"SELECT digest, signature FROM signatures WHERE num_perm = ? AND digest IN ({','.join('?' * len(chunk))})",
+                        [NUM_PERM, *chunk],
+                    ).fetchall()
+                    known.update((digest, np.frombuffer(blob, dtype=np.uint32)) for digest, blob in rows)
+
+        new_rows = []
+        results = []
+        for text, digest in zip(texts, digests):
+            if digest not in known:
+                signature = minhash(text)
+                if signature is None:
+                    results.append(None)
+                    continue
+                known[digest] = signature
+                new_rows.append((digest, NUM_PERM, signature.tobytes()))
+            results.append(known[digest])
+
+        if new_rows and self._conn is not None:
+            with self._lock:
+                try:
+                    self._conn.executemany("INSERT OR REPLACE INTO signatures VALUES (?, ?, ?)", new_rows)
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️ Could not store signatures: {e}")
+        return results
+
+
+# -------------------- LSH INDEX --------------------
+class NearDuplicateIndex:
+    """In-memory LSH buckets over MinHash signatures, keyed by document key"""
+
+    def __init__(self, bands: int = LSH_BANDS):
+        if NUM_PERM % bands:
+            raise ValueError(f"NUM_PERM ({NUM_PERM}) must be divisible by the band count ({bands})")
+        self.bands = bands
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.meta: Dict[str, Dict[str, Any]] = {}
+        self.by_property: Dict[str, Set[str]] = {}
+        self.buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [row.tobytes() for row in signature.reshape(self.bands, -1)]
+
+    def add(self, key: str, signature: np.ndarray, meta: Dict[str, Any]) -> None:
+        self.remove(key)
+        self.signatures[key] = signature
+        self.meta[key] = meta
+        self.by_property.setdefault(str(meta.get("propid")), set()).add(key)
+        for bucket, band_key in zip(self.buckets, self.band_keys(signature)):
+            bucket.setdefault(band_key, set()).add(key)
+
+    def remove(self, key: str) -> None:
+        signature = self.signatures.pop(key, None)
+        if signature is None:
+            return
+        meta = self.meta.pop(key)
+        self.by_property.get(str(meta.get("propid")), set()).discard(key)
+        for bucket, band_key in zip(self.buckets, self.band_keys(signature)):
+            keys = bucket.get(band_key)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del bucket[band_key]
+
+    def remove_property(self, propid: Any) -> None:
+        for key in list(self.by_property.pop(str(propid), ())):
+            self.remove(key)
+
+    def candidates(self, signature: np.ndarray) -> Set[str]:
+        """Documents sharing at least one band bucket with the signature"""
+        found: Set[str] = set()
+        for bucket, band_key in zip(self.buckets, self.band_keys(signature)):
+            found.update(bucket.get(band_key, ()))
+        return found
+
+    def similarity(self, key: str, signature: np.ndarray) -> float:
+        return float(np.mean(self.signatures[key] == signature))
+
+    def query(self, signature: np.ndarray, threshold: float = DUPLICATE_THRESHOLD,
+              owner: Optional[Dict[str, Any]] = None, field: Optional[str] = None) -> List[Tuple[str, float]]:
+        """(key, estimated Jaccard) of stored documents at or above threshold, most similar first"""
+        matches = []
+        for key in self.candidates(signature):
+            if owner is not None and is_shared_copy(owner, field, self.meta[key]):
+                continue
+            similarity = self.similarity(key, signature)
+            if similarity >= threshold:
+                matches.append((key, similarity))
+        matches.sort(key=lambda m: -m[1])
+        return matches
+
+
+def is_shared_copy(owner: Dict[str, Any], field: Optional[str], meta: Dict[str, Any]) -> bool:
+    """Same property, or the same shared field (locality / builder text) of the same locality or builder"""
+    if str(owner.get("propid")) == str(meta.get("propid")):
+        return True
+    scope = SECTION_FIELDS.get(field) if field else None
+    return bool(scope) and field == meta.get("field") and owner.get(scope) is not None \
+        and str(owner.get(scope)) == str(meta.get("scope"))
+
+
+def owner_of(meta: Dict[str, Any]) -> Dict[str, Any]:
+    """Owner fields (propid and the shared-scope id) of an indexed document"""
+    owner = {"propid": meta.get("propid")}
+    scope = SECTION_FIELDS.get(meta.get("field"))
+    if scope:
+        owner[scope] = meta.get("scope")
+    return owner
+
+
+# -------------------- CORPUS --------------------
+def output_documents(output: Dict[str, Any], include_reviews: bool = True) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """(key, text, meta) for every section and review of one stored output"""
+    propid = output.get("propid")
+    for field, scope in SECTION_FIELDS.items():
+        text = output.get(field)
+        if isinstance(text, str) and text.strip():
+            meta = {"propid": propid, "field": field, "scope": output.get(scope) if scope else None}
+            yield f"{propid}/{field}", text, meta
+    if include_reviews:
+        for index, review in enumerate(output.get("reviews") or []):
+            if isinstance(review, dict) and review.get("review"):
+                yield f"{propid}/review/{index}", review["review"], {"propid": propid, "field": "review", "scope": None}
+
+
+def load_corpus(path: str = GENERATED_DATA_FILE) -> Dict[str, Any]:
+    file_path = Path(path)
+    if not file_path.exists():
+        return {}
+    with open(file_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data if isinstance(data, dict) else {}
+
+
+def build_index(corpus: Dict[str, Any], store: Optional[SignatureStore] = None,
+                include_reviews: bool = True) -> NearDuplicateIndex:
+    store = store or SignatureStore(None)
+    documents = [doc for output in corpus.values() if isinstance(output, dict)
+                 for doc in output_documents(output, include_reviews)]
+    index = NearDuplicateIndex()
+    signatures = store.signatures([text for _, text, _ in documents])
+    for (key, _, meta), signature in zip(documents, signatures):
+        if signature is not None:
+            index.add(key, signature, meta)
+    return index
+
+
+def index_output(index: NearDuplicateIndex, output: Dict[str, Any], store: Optional[SignatureStore] = None,
+                 include_reviews: bool = True) -> None:
+    """Replace one property's documents in the index with those of a freshly saved output"""
+    store = store or SignatureStore(None)
+    index.remove_property(output.get("propid"))
+    documents = list(output_documents(output, include_reviews))
+    for (key, _, meta), signature in zip(documents, store.signatures([text for _, text, _ in documents])):
+        if signature is not None:
+            index.add(key, signature, meta)
+
+
+# -------------------- GENERATION-TIME GATE --------------------
+_corpus_index: Optional[NearDuplicateIndex] = None
+_corpus_store: Optional[SignatureStore] = None
+_corpus_lock = threading.Lock()
+
+
+def get_corpus_index(path: str = GENERATED_DATA_FILE) -> NearDuplicateIndex:
+    """Process-wide index over the stored sections, built on first use (blocking, run it off the loop)"""
+    global _corpus_index, _corpus_store
+    with _corpus_lock:
+        if _corpus_index is None:
+            _corpus_store = SignatureStore()
+            _corpus_index = build_index(load_corpus(path), _corpus_store, include_reviews=False)
+            logger.info(f"🧬 Near-duplicate index ready: {len(_corpus_index)} sections")
+        return _corpus_index
+
+
+def find_near_duplicate(text: str, field: str, owner: Dict[str, Any],
+                        threshold: float = DUPLICATE_THRESHOLD) -> Optional[Tuple[str, float]]:
+    """
+    Most similar stored section of another property, or None. Blocking (the index may
+    be built on first use), run it off the loop. Drafts are hashed in memory only; the
+    signature cache holds saved text alone (record_output).
+    """
+    index = get_corpus_index()
+    signature = minhash(text)
+    if signature is None:
+        return None
+    with _corpus_lock:
+        matches = index.query(signature, threshold, owner=owner, field=field)
+    return matches[0] if matches else None
+
+
+def record_output(output: Dict[str, Any]) -> None:
+    """Keep the gate's index and signature cache in step with the store (no-op until the index was built)"""
+    if _corpus_index is None:
+        return
+    with _corpus_lock:
+        index_output(_corpus_index, output, _corpus_store, include_reviews=False)
+
+
+# -------------------- BATCH AUDIT --------------------
+def audit_corpus(path: str = GENERATED_DATA_FILE, threshold: float = DUPLICATE_THRESHOLD,
+                 limit: int = 20, include_reviews: bool = True) -> Dict[str, Any]:
+    """
+    Groups of near-duplicate documents across properties in the store. Documents with
+    identical signatures are checked once, and documents already in the same group
+    are not compared again, so templated texts do not blow up into all pairs.
+    """
+    corpus = load_corpus(path)
+    index = build_index(corpus, SignatureStore(), include_reviews)
+
+    # Identical signatures form one class; shared copies keep a class per locality / builder
+    classes: Dict[tuple, List[str]] = {}
+    for key, signature in index.signatures.items():
+        meta = index.meta[key]
+        class_key = (signature.tobytes(),)
+        if SECTION_FIELDS.get(meta["field"]):
+            class_key += (meta["field"], str(meta["scope"]))
+        classes.setdefault(class_key, []).append(key)
+    members_of = {members[0]: members for members in classes.values()}
+
+    parent = {representative: representative for representative in members_of}
+
+    def find(key: str) -> str:
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for representative in members_of:
+        meta = index.meta[representative]
+        owner = owner_of(meta)
+        signature = index.signatures[representative]
+        for other in index.candidates(signature):
+            if other not in members_of or find(other) == find(representative):
+                continue
+            if is_shared_copy(owner, meta["field"], index.meta[other]):
+                continue
+            if index.similarity(other, signature) >= threshold:
+                parent[find(other)] = find(representative)
+
+    components: Dict[str, List[str]] = {}
+    for representative in members_of:
+        components.setdefault(find(representative), []).append(representative)
+
+    groups = []
+    for representatives in components.values():
+        keys = [key for representative in representatives for key in members_of[representative]]
+        properties = {str(index.meta[key]["propid"]) for key in keys}
+        # A single class of a shared field is one text reused within its locality / builder
+        shared_only = len(representatives) == 1 and SECTION_FIELDS.get(index.meta[keys[0]]["field"])
+        if len(properties) > 1 and not shared_only:
+            fields: Dict[str, int] = {}
+            for key in keys:
+                fields[index.meta[key]["field"]] = fields.get(index.meta[key]["field"], 0) + 1
+            groups.append({"documents": len(keys), "properties": len(properties), "fields": fields, "keys": sorted(keys)[:5]})
+    groups.sort(key=lambda g: (-g["documents"], g["keys"]))
+
+    by_field: Dict[str, int] = {}
+    for group in groups:
+        for field, count in group["fields"].items():
+            by_field[field] = by_field.get(field, 0) + count
+
+    return {
+        "properties": len(corpus),
+        "documents": len(index),
+        "threshold": threshold,
+        "groups": len(groups),
+        "duplicated_documents": sum(group["documents"] for group in groups),
+        "by_field": dict(sorted(by_field.items(), key=lambda item: -item[1])),
+        "examples": groups[:limit],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Near-duplicate detection over generated content")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("audit", help="report groups of near-duplicate sections and reviews across properties")
+    p.add_argument("path", nargs="?", default=GENERATED_DATA_FILE)
+    p.add_argument("--threshold", type=float, default=DUPLICATE_THRESHOLD)
+    p.add_argument("--limit", type=int, default=20, help="largest groups to print")
+    p.add_argument("--no-reviews", action="store_true", help="only index the SEO sections")
+    args = parser.parse_args()
+
+    if args.command == "audit":
+        if not Path(args.path).exists():
+            raise SystemExit(f"{args.path} not found")
+        report = audit_corpus(args.path, args.threshold, args.limit, include_reviews=not args.no_reviews)
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
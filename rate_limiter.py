@@ -0,0 +1,207 @@
+# rate_limiter.py - Process-wide RPM/TPM limiter shared by every LLM call
+"""
+One limiter per provider, each with a requests-per-minute and a tokens-per-minute
+token bucket. Callers wait for capacity *before* sending, so concurrent background
+tasks queue up behind the quota instead of all hitting 429 and retrying together.
+A 429 with Retry-After pauses the whole provider for that long.
+
+Works from async code (acquire) and from worker threads (acquire_sync).
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIG --------------------
+# Per-provider quotas (requests / tokens per minute). Keep slightly under the account limits.
+RATE_LIMITS = {
+    "openai": {"requests_per_minute": 450, "tokens_per_minute": 180000},   # SEO + FAQ (gpt-4o-mini)
+    "groq": {"requests_per_minute": 28, "tokens_per_minute": 5500},        # reviews (app.REVIEW_MODEL)
+    "local": {"requests_per_minute": 100000, "tokens_per_minute": 100000000},  # offline backend, effectively unlimited
+}
+
+MAX_WAIT_SLICE_SECONDS = 1.0   # re-check capacity at least this often while waiting
+CHARS_PER_TOKEN = 4            # rough prompt size estimate
+
+
+def estimate_request_tokens(prompt: Any, max_tokens: int) -> int:
+    """Tokens a request counts against TPM: prompt estimate plus the reserved completion"""
+    return int(len(str(prompt)) / CHARS_PER_TOKEN) + int(max_tokens)
+
+
+def retry_after_from_error(error: Exception) -> Optional[float]:
+    """Read Retry-After (seconds or milliseconds) from an SDK/HTTP error, if present"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        return None
+    return retry_after_from_headers(headers)
+
+
+def retry_after_from_headers(headers: Any) -> Optional[float]:
+    try:
+        retry_ms = headers.get("retry-after-ms")
+        if retry_ms:
+            return float(retry_ms) / 1000.0
+        retry = headers.get("retry-after")
+        if retry:
+            return float(retry)
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at capacity per minute"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = float(per_minute) / 60.0
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def seconds_until(self, amount: float) -> float:
+        """Time until `amount` tokens are available (0 when they already are)"""
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+
+class ProviderRateLimiter:
+    """RPM + TPM buckets for a single provider"""
+
+    def __init__(self, name: str, requests_per_minute: float, tokens_per_minute: float):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.paused_until = 0.0
+        self.waiting = 0
+        self.granted = 0
+        self.throttled = 0
+        self.total_wait_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _try_acquire(self, tokens: int) -> float:
+        """Take capacity and return 0, or return how long to wait before trying again"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            wait = max(self.requests.seconds_until(1), self.tokens.seconds_until(tokens))
+            if wait > 0:
+                return wait
+            self.requests.tokens -= 1
+            self.tokens.tokens -= min(tokens, self.tokens.capacity)
+            self.granted += 1
+            return 0.0
+
+    async def acquire(self, tokens: int = 0) -> float:
+        """Wait (without blocking the event loop) until a request of `tokens` may be sent"""
+        started = time.monotonic()
+        with self._lock:
+            self.waiting += 1
+        try:
+            while True:
+                wait = self._try_acquire(tokens)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(min(wait, MAX_WAIT_SLICE_SECONDS))
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        return self._record_wait(started)
+
+    def acquire_sync(self, tokens: int = 0) -> float:
+        """Blocking variant for code running in worker threads"""
+        started = time.monotonic()
+        with self._lock:
+            self.waiting += 1
+        try:
+            while True:
+                wait = self._try_acquire(tokens)
+                if wait <= 0:
+                    break
+                time.sleep(min(wait, MAX_WAIT_SLICE_SECONDS))
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        return self._record_wait(started)
+
+    def _record_wait(self, started: float) -> float:
+        waited = time.monotonic() - started
+        if waited > 0.01:
+            with self._lock:
+                self.throttled += 1
+                self.total_wait_seconds += waited
+            logger.info(f"⏳ {self.name} rate limiter held request for {waited:.2f}s")
+        return waited
+
+    def settle(self, reserved_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Return unused reserved tokens (or charge the overrun) once usage is known"""
+        if actual_tokens is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self.tokens.refill(now)
+            self.tokens.tokens = min(self.tokens.capacity, self.tokens.tokens + (reserved_tokens - actual_tokens))
+
+    def refund(self, reserved_tokens: int) -> None:
+        """Give back a reservation whose request failed, was cancelled or lost a hedge race"""
+        if reserved_tokens:
+            self.settle(reserved_tokens, 0)
+
+    def penalize(self, seconds: float) -> None:
+        """Pause every caller of this provider (e.g. after a 429 with Retry-After)"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + max(0.0, seconds))
+        logger.warning(f"🚦 {self.name} rate limited, pausing all requests for {seconds:.2f}s")
+
+    @property
+    def queue_depth(self) -> int:
+        return self.waiting
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            return {
+                "queue_depth": self.waiting,
+                "paused_for_seconds": round(max(0.0, self.paused_until - now), 2),
+                "requests_available": int(self.requests.tokens),
+                "tokens_available": int(self.tokens.tokens),
+                "granted": self.granted,
+                "throttled": self.throttled,
+                "total_wait_seconds": round(self.total_wait_seconds, 2),
+            }
+
+
+_limiters: Dict[str, ProviderRateLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> ProviderRateLimiter:
+    """Shared limiter for a provider (created on first use from RATE_LIMITS)"""
+    with _registry_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limits = RATE_LIMITS.get(provider, {"requests_per_minute": 60, "tokens_per_minute": 60000})
+            limiter = ProviderRateLimiter(provider, limits["requests_per_minute"], limits["tokens_per_minute"])
+            _limiters[provider] = limiter
+        return limiter
+
+
+def rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
@@ -0,0 +1,339 @@
+# resilience.py - Error classification, timeouts, hedging and circuit breaking for LLM calls
+"""
+Wraps a single provider call so that:
+  - permanent errors (bad key, bad request, exhausted quota) fail immediately,
+  - every attempt has its own timeout,
+  - an attempt running past the observed p95 latency gets a hedged duplicate,
+  - a circuit breaker fails fast while the provider keeps failing.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIG --------------------
+FAILURE_THRESHOLD = 5            # consecutive failures that open the breaker
+RECOVERY_SECONDS = 30.0          # how long the breaker stays open before a probe
+LATENCY_WINDOW = 200             # samples kept per latency tracker
+MIN_SAMPLES_FOR_HEDGE = 20       # do not hedge before p95 is meaningful
+MAX_HEDGES_IN_FLIGHT = 4         # cap on duplicate requests across the process
+BASE_BACKOFF_SECONDS = 1.0
+
+RETRYABLE = "retryable"
+RATE_LIMITED = "rate_limited"
+PERMANENT = "permanent"
+
+PERMANENT_STATUS_CODES = {400, 401, 403, 404, 422}
+PERMANENT_ERROR_NAMES = {
+    "AuthenticationError", "PermissionDeniedError", "BadRequestError",
+    "NotFoundError", "UnprocessableEntityError", "ValueError", "TypeError",
+}
+# Permanent errors that say the account cannot use the provider at all; the rest
+# (bad or oversized prompts) are the request's fault and leave the breaker alone
+ACCOUNT_STATUS_CODES = {401, 403}
+ACCOUNT_ERROR_NAMES = {"AuthenticationError", "PermissionDeniedError"}
+ACCOUNT_ERROR_MARKERS = ("insufficient_quota", "invalid_api_key")
+
+
+class PermanentError(RuntimeError):
+    """The request will never succeed as sent; retrying is pointless"""
+
+
+class CircuitOpenError(RuntimeError):
+    """The provider is considered degraded; the call was not attempted"""
+
+
+class RetriesExhaustedError(RuntimeError):
+    """Every attempt failed with a retryable error"""
+
+
+def classify_error(error: BaseException) -> str:
+    """Return RETRYABLE, RATE_LIMITED or PERMANENT for an exception from a provider call"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return RETRYABLE
+
+    message = str(error).lower()
+    if any(marker in message for marker in ACCOUNT_ERROR_MARKERS):
+        return PERMANENT
+
+    status = getattr(error, "status_code", None)
+    if status is None:
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+    if status == 429:
+        return RATE_LIMITED
+    if status in PERMANENT_STATUS_CODES:
+        return PERMANENT
+    if status is not None:
+        return RETRYABLE
+
+    if type(error).__name__ in PERMANENT_ERROR_NAMES:
+        return PERMANENT
+    if type(error).__name__ == "RateLimitError" or "rate_limit" in message or "429" in message:
+        return RATE_LIMITED
+    return RETRYABLE
+
+
+def is_account_error(error: BaseException) -> bool:
+    """Bad key, missing permission or exhausted quota: every request to the provider will fail"""
+    message = str(error).lower()
+    if any(marker in message for marker in ACCOUNT_ERROR_MARKERS):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status in ACCOUNT_STATUS_CODES or type(error).__name__ in ACCOUNT_ERROR_NAMES
+
+
+def retry_delay(attempt: int, base: float = BASE_BACKOFF_SECONDS) -> float:
+    """Exponential backoff with jitter so concurrent callers do not retry in lockstep"""
+    return base * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if len(self.samples) < MIN_SAMPLES_FOR_HEDGE:
+                return None
+            ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def p95(self) -> Optional[float]:
+        return self.percentile(95)
+
+
+class CircuitBreaker:
+    """closed -> open after repeated failures -> half_open probe after a cool-down"""
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD, recovery_seconds: float = RECOVERY_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.recovery_seconds:
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def before_call(self) -> None:
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit open: provider degraded, failing fast")
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != "closed":
+                logger.info(f"✅ {self.name} circuit closed again")
+            self.state = "closed"
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Forget an unfinished half-open probe (e.g. the call was cancelled)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.error(f"🔌 {self.name} circuit opened after {self.failures} failures")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures, "rejected": self.rejected}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_latencies: Dict[str, LatencyTracker] = {}
+_registry_lock = threading.Lock()
+_hedges_in_flight = 0
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    with _registry_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+def get_latency_tracker(name: str) -> LatencyTracker:
+    with _registry_lock:
+        if name not in _latencies:
+            _latencies[name] = LatencyTracker()
+        return _latencies[name]
+
+
+def resilience_stats() -> Dict[str, Any]:
+    with _registry_lock:
+        breakers = dict(_breakers)
+        latencies = dict(_latencies)
+    return {
+        "circuit_breakers": {name: b.stats() for name, b in breakers.items()},
+        "p95_latency_seconds": {
+            name: (round(t.p95(), 2) if t.p95() is not None else None) for name, t in latencies.items()
+        },
+        "hedges_in_flight": _hedges_in_flight,
+    }
+
+
+async def _timed_attempt(
+    make_call: Callable[[], Awaitable[Any]],
+    attempt_timeout: Optional[float],
+    latency: Optional[LatencyTracker],
+    release: Optional[Callable[[Any], None]],
+) -> Any:
+    """One call on capacity that is already reserved; the reservation is released if the call fails"""
+    started = time.monotonic()
+    try:
+        result = await asyncio.wait_for(make_call(), timeout=attempt_timeout)
+    except BaseException:
+        if release is not None:
+            release(None)
+        raise
+    if latency is not None:
+        latency.record(time.monotonic() - started)
+    return result
+
+
+async def _reserved_attempt(make_call, before_attempt, attempt_timeout, latency, release) -> Any:
+    if before_attempt is not None:
+        await before_attempt()
+    return await _timed_attempt(make_call, attempt_timeout, latency, release)
+
+
+async def _hedged_attempt(make_call, before_attempt, attempt_timeout, latency, hedge: bool, release) -> Any:
+    """
+    Run one attempt; if the call itself outlives p95 latency, race a duplicate against
+    it. Waiting in before_attempt does not count towards the hedge delay.
+    """
+    global _hedges_in_flight
+
+    if before_attempt is not None:
+        await before_attempt()
+    primary = asyncio.create_task(_timed_attempt(make_call, attempt_timeout, latency, release))
+    hedge_after = latency.p95() if (hedge and latency is not None) else None
+    if hedge_after is None or (attempt_timeout is not None and hedge_after >= attempt_timeout):
+        return await primary
+
+    done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+    if done or _hedges_in_flight >= MAX_HEDGES_IN_FLIGHT:
+        return await primary
+
+    logger.info(f"🏇 Attempt exceeded p95 ({hedge_after:.1f}s), sending hedged request")
+    _hedges_in_flight += 1
+    secondary = asyncio.create_task(_reserved_attempt(make_call, before_attempt, attempt_timeout, latency, release))
+    pending = {primary, secondary}
+    first_error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            succeeded = [task for task in done if task.exception() is None]
+            if succeeded:
+                # Both finished in the same tick: the unused response still has to be settled
+                for task in succeeded[1:]:
+                    if release is not None:
+                        release(task.result())
+                return succeeded[0].result()
+            first_error = first_error or next(iter(done)).exception()
+        raise first_error
+    finally:
+        _hedges_in_flight -= 1
+        for task in pending:
+            task.cancel()
+
+
+async def call_with_resilience(
+    make_call: Callable[[], Awaitable[Any]],
+    *,
+    name: str,
+    attempt_timeout: Optional[float],
+    max_attempts: int = 5,
+    before_attempt: Optional[Callable[[], Awaitable[Any]]] = None,
+    on_rate_limited: Optional[Callable[[BaseException, int], None]] = None,
+    latency_key: Optional[str] = None,
+    hedge: bool = True,
+    release_attempt: Optional[Callable[[Any], None]] = None,
+) -> Any:
+    """
+    Call make_call() with per-attempt timeout, hedging, retries for retryable errors
+    and the provider's circuit breaker. before_attempt (e.g. a rate limiter acquire)
+    runs before each attempt and is not counted against the attempt timeout.
+    release_attempt(response) is called for every attempt that passed before_attempt
+    but whose response is not returned: with None when it failed or was cancelled,
+    with the response when a hedge lost the race.
+    """
+    breaker = get_circuit_breaker(name)
+    latency = get_latency_tracker(latency_key or name)
+
+    for attempt in range(1, max_attempts + 1):
+        breaker.before_call()
+        try:
+            result = await _hedged_attempt(make_call, before_attempt, attempt_timeout, latency, hedge, release_attempt)
+            breaker.record_success()
+            return result
+        except asyncio.CancelledError:
+            breaker.release_probe()
+            raise
+        except Exception as e:
+            kind = classify_error(e)
+            error_msg = str(e) or type(e).__name__
+            logger.warning(f"{name} request failed (attempt {attempt}/{max_attempts}, {kind}): {error_msg}")
+
+            if kind == PERMANENT:
+                # A bad prompt says nothing about the provider; a dead key or quota does
+                if is_account_error(e):
+                    breaker.record_failure()
+                else:
+                    breaker.release_probe()
+                raise PermanentError(f"{name} API error (not retried): {error_msg}") from e
+            if kind == RATE_LIMITED:
+                # Quota pressure is not provider degradation: the provider answered
+                breaker.record_success()
+                if attempt == max_attempts:
+                    raise RetriesExhaustedError(f"{name} API rate limit exceeded: {error_msg}") from e
+                if on_rate_limited is not None:
+                    on_rate_limited(e, attempt)
+                else:
+                    await asyncio.sleep(retry_delay(attempt))
+                continue
+
+            breaker.record_failure()
+            if attempt == max_attempts:
+                raise RetriesExhaustedError(f"{name} API error: {error_msg}") from e
+            await asyncio.sleep(retry_delay(attempt))
+
+    raise RetriesExhaustedError(f"{name} generation failed after all retries")
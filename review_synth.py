@@ -0,0 +1,191 @@
+# review_synth.py - Local template review synthesizer (no network)
+"""
+Builds short reviews from sentence templates filled with the property features. Each
+review is an opener, one or two sentences for the review mode (see
+app.decide_review_mode) and a closer, all picked for the slot's sentiment. Regional
+slots get a line about the city or state.
+
+One ReviewSynthesizer per property: every template list is drawn without replacement
+(LazyShuffle), so reviews of the same property do not repeat sentences until a list
+is exhausted. A review takes microseconds, so app.py uses this both as the instant
+fallback when the remote model fails and as the primary source for bulk runs.
+"""
+import random
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from name_sampler import LazyShuffle
+
+OPENERS = {
+    "positive": [
+        "Really happy with our decision to buy at {project}.",
+        "We have been following {project} for a while and it has not let us down.",
+        "{project} turned out better than we expected.",
+        "Booked a flat in {project} last year and no regrets so far.",
+        "Honest review of {project} from a buyer.",
+        "Visited {project} twice before booking and liked it both times.",
+    ],
+    "negative": [
+        "Mixed experience with {project} so far.",
+        "{project} looked fine on paper but a few things need attention.",
+        "Expected a bit more from {project}.",
+        "Sharing my experience with {project} so others can plan better.",
+        "Not fully satisfied with {project} yet.",
+    ],
+}
+
+MODE_SENTENCES = {
+    "locality": {
+        "positive": [
+            "{locality} has schools, hospitals and daily needs shops close by.",
+            "Connectivity from {locality} to the main roads is easy.",
+            "The neighbourhood around {locality} is calm and family friendly.",
+            "Markets and supermarkets are a short drive from {locality}.",
+        ],
+        "negative": [
+            "Roads around {locality} get crowded at peak hours.",
+            "Public transport near {locality} is still limited.",
+            "Some basic shops near {locality} are yet to come up.",
+        ],
+    },
+    "amenities": {
+        "positive": [
+            "The {amenity} is well maintained and the kids love it.",
+            "We use the {amenity} almost every day.",
+            "Security and housekeeping are handled properly.",
+            "Good amount of open space and greenery inside the campus.",
+        ],
+        "negative": [
+            "The {amenity} needs better upkeep.",
+            "Maintenance response is slow at times.",
+            "Parking gets tight in the evenings.",
+        ],
+    },
+    "hand_over": {
+        "positive": [
+            "Handover was smooth and {builder} shared all documents on time.",
+            "The possession process was well organised.",
+            "Snag list items were fixed quickly after handover.",
+        ],
+        "negative": [
+            "Handover paperwork took longer than promised.",
+            "A few snag list items were still pending at possession.",
+            "Coordination with the team from {builder} during handover could be better.",
+        ],
+    },
+    "under_construction": {
+        "positive": [
+            "Construction is moving at a steady pace and possession is planned for {possession}.",
+            "{builder} shares regular construction updates.",
+            "Looks like a good investment at this stage of construction.",
+        ],
+        "negative": [
+            "Construction looks slower than the timeline for {possession} suggests.",
+            "Updates from {builder} on progress are not very regular.",
+            "Hoping the work speeds up before {possession}.",
+        ],
+    },
+    "general": {
+        "positive": [
+            "Flats are spacious with good ventilation and light.",
+            "{builder} has delivered on the quality they promised.",
+            "Layouts of the {area} units are practical.",
+            "Pricing felt fair for what {project} offers.",
+        ],
+        "negative": [
+            "Pricing is on the higher side for the {area} units.",
+            "Finishing quality in some areas could be better.",
+            "Communication from {builder} could be more regular.",
+        ],
+    },
+}
+
+CLOSERS = {
+    "positive": [
+        "Worth considering if you are looking in {locality}.",
+        "Would recommend it to families.",
+        "Overall a good choice for the price.",
+        "Happy to call this place home.",
+        "Good option for both living and investment.",
+    ],
+    "negative": [
+        "Visit the site yourself before deciding.",
+        "Hope {builder} sorts these out soon.",
+        "Okay overall, but check the details carefully.",
+        "Could work out once these issues are fixed.",
+    ],
+}
+
+REGIONAL_SENTENCES = {
+    "positive": [
+        "A nice place for families settling in {city}.",
+        "Among the better options we saw in {city}.",
+    ],
+    "negative": [
+        "There are other options in {city} worth comparing.",
+    ],
+}
+
+
+def display_month(value: Optional[str]) -> Optional[str]:
+    """"2027-12-01" -> "Dec 2027"; anything unparseable is returned as given"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value)).strftime("%b %Y")
+    except ValueError:
+        return str(value)
+
+
+class ReviewSynthesizer:
+    """Per-property template review generator; sentences are not repeated while choices remain"""
+
+    def __init__(self, features: Dict, rng: Optional[random.Random] = None):
+        self.rng = rng or random
+        self.values = self.template_values(features)
+        self.amenities = [a.strip() for a in str(features.get("amenities") or "").split(",") if a.strip()]
+        self._orders: Dict[Tuple[str, ...], LazyShuffle] = {}
+        self._seen = set()
+
+    @staticmethod
+    def template_values(features: Dict) -> Dict[str, str]:
+        location = features.get("locality_name") or features.get("location") or features.get("city")
+        return {
+            "project": features.get("project_name") or features.get("property_name") or "the project",
+            "builder": features.get("builder") or "the builder",
+            "locality": str(location).split(",")[0].strip() if location else "the area",
+            "city": features.get("city_name") or features.get("city") or features.get("state") or "the city",
+            "area": features.get("area") or "available",
+            "possession": display_month(features.get("possession_date")) or "the promised date",
+        }
+
+    def pick(self, key: Tuple[str, ...], options: List[str]) -> str:
+        """Next option for this key without replacement; reshuffles once all were used"""
+        order = self._orders.get(key)
+        if order is None or not order.remaining():
+            order = LazyShuffle(len(options), self.rng)
+            self._orders[key] = order
+        return options[order.next_index()]
+
+    def fill(self, template: str) -> str:
+        amenity = self.rng.choice(self.amenities) if self.amenities else "clubhouse"
+        sentence = template.format(amenity=amenity.lower(), **self.values)
+        return sentence[:1].upper() + sentence[1:]
+
+    def compose(self, mode: str, sentiment: str, lang: str = "general") -> str:
+        sentiment = sentiment if sentiment in OPENERS else "positive"
+        mode_sentences = MODE_SENTENCES.get(mode, MODE_SENTENCES["general"])[sentiment]
+        text = ""
+        for _ in range(3):
+            parts = [self.pick(("opener", sentiment), OPENERS[sentiment])]
+            parts.append(self.pick(("mode", mode, sentiment), mode_sentences))
+            if lang != "general":
+                parts.append(self.pick(("regional", sentiment), REGIONAL_SENTENCES[sentiment]))
+            elif mode != "general" and self.rng.random() < 0.5:
+                parts.append(self.pick(("mode", "general", sentiment), MODE_SENTENCES["general"][sentiment]))
+            parts.append(self.pick(("closer", sentiment), CLOSERS[sentiment]))
+            text = " ".join(self.fill(p) for p in parts)
+            if text not in self._seen:
+                break
+        self._seen.add(text)
+        return text
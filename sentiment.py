@@ -0,0 +1,184 @@
+# sentiment.py - Batch lexicon sentiment scoring for review ratings
+"""
+Scores many reviews in one call: every review is tokenized once, the tokens of the
+whole batch are looked up against a sorted, weighted lexicon with NumPy and the
+per-review sums come out of a single bincount. Whole-word matching means "issue"
+no longer fires inside "tissue". A negator ("not", "never", "isn't", ...) flips the
+lexicon words in the next NEGATION_WINDOW tokens of the same clause.
+
+Each review gets a 1-5 rating and a 0-1 confidence (0 when no lexicon word was
+found). The same engine audits the stored corpus:
+
+    python sentiment.py audit [generated_content.json] [--limit 20]
+"""
+import argparse
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# -------------------- CONFIG --------------------
+POSITIVE_LEXICON = {
+    "good": 1.0, "great": 1.5, "excellent": 2.0, "love": 1.5, "loved": 1.5, "nice": 1.0,
+    "amazing": 2.0, "comfortable": 1.0, "super": 1.5, "happy": 1.0, "spacious": 1.0,
+    "peaceful": 1.0, "clean": 0.5, "convenient": 1.0, "recommend": 1.5, "worth": 1.0,
+    "satisfied": 1.0, "beautiful": 1.0, "safe": 0.5, "best": 1.5, "well": 0.5,
+}
+NEGATIVE_LEXICON = {
+    "bad": 1.5, "poor": 1.5, "noisy": 1.0, "dirty": 1.5, "delay": 1.0, "delayed": 1.0,
+    "delays": 1.0, "slow": 1.0, "problem": 1.0, "problems": 1.0, "issue": 1.0, "issues": 1.0,
+    "disappointed": 2.0, "disappointing": 2.0, "worst": 2.0, "expensive": 0.5, "crowded": 0.5,
+    "leakage": 1.5, "unsafe": 1.5, "traffic": 0.5, "congested": 1.0,
+}
+NEGATORS = {
+    "not", "no", "never", "nothing", "hardly", "without", "cannot",
+    "isn't", "wasn't", "aren't", "weren't", "don't", "doesn't", "didn't", "can't", "won't",
+}
+NEGATION_WINDOW = 3          # tokens after a negator whose polarity is flipped
+RATING_SCALE = 2.0           # lexicon weight that moves a rating ~1.5 stars from neutral
+NEUTRAL_RATING = 3
+AUDIT_MIN_CONFIDENCE = 0.5   # only confident disagreements are reported
+AUDIT_MIN_GAP = 2            # stars between stored and scored rating to count as a mismatch
+GENERATED_DATA_FILE = "generated_content.json"
+
+CLAUSE_BREAKS = np.array(list(".,;:!?"))
+TOKEN_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?|[.,;:!?]")   # punctuation ends a negation
+
+
+def build_lexicon() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sorted vocabulary with signed weights and a negator flag, for searchsorted lookups"""
+    entries = {word: weight for word, weight in POSITIVE_LEXICON.items()}
+    entries.update({word: -weight for word, weight in NEGATIVE_LEXICON.items()})
+    entries.update({word: 0.0 for word in NEGATORS if word not in entries})
+    vocab = np.array(sorted(entries))
+    weights = np.array([entries[w] for w in vocab], dtype=np.float64)
+    negators = np.array([w in NEGATORS for w in vocab], dtype=bool)
+    return vocab, weights, negators
+
+
+LEXICON_VOCAB, LEXICON_WEIGHTS, LEXICON_NEGATORS = build_lexicon()
+
+
+# -------------------- SCORING --------------------
+def tokenize_batch(texts: Sequence[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """All tokens of the batch in one array, plus the index of the review each came from"""
+    tokens: List[str] = []
+    doc_ids: List[int] = []
+    for idx, text in enumerate(texts):
+        words = TOKEN_PATTERN.findall((text or "").lower().replace("’", "'"))
+        tokens.extend(words)
+        doc_ids.extend([idx] * len(words))
+    return np.array(tokens, dtype=str), np.array(doc_ids, dtype=np.int64)
+
+
+def score_texts(texts: Sequence[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ratings (int, 1-5) and confidences (float, 0-1) for every text, in input order.
+    Texts without any lexicon word get NEUTRAL_RATING and confidence 0.
+    """
+    count = len(texts)
+    ratings = np.full(count, NEUTRAL_RATING, dtype=np.int64)
+    confidence = np.zeros(count, dtype=np.float64)
+    if not count:
+        return ratings, confidence
+
+    tokens, doc_ids = tokenize_batch(texts)
+    if not tokens.size:
+        return ratings, confidence
+
+    positions = np.minimum(np.searchsorted(LEXICON_VOCAB, tokens), len(LEXICON_VOCAB) - 1)
+    known = LEXICON_VOCAB[positions] == tokens
+    weights = np.where(known, LEXICON_WEIGHTS[positions], 0.0)
+    is_negator = known & LEXICON_NEGATORS[positions]
+
+    # A token is negated if a negator from the same review and clause precedes it within the window
+    clause_ids = np.cumsum(np.isin(tokens, CLAUSE_BREAKS)) + doc_ids * tokens.size
+    negated = np.zeros(tokens.size, dtype=bool)
+    for shift in range(1, NEGATION_WINDOW + 1):
+        if shift >= tokens.size:
+            break
+        negated[shift:] |= is_negator[:-shift] & (clause_ids[:-shift] == clause_ids[shift:])
+    weights = np.where(negated, -weights, weights)
+
+    score = np.bincount(doc_ids, weights=weights, minlength=count)
+    mass = np.bincount(doc_ids, weights=np.abs(weights), minlength=count)
+    has_signal = mass > 0
+
+    polarity = np.divide(score, mass, out=np.zeros(count), where=has_signal)
+    stars = NEUTRAL_RATING + 2 * np.tanh(score / RATING_SCALE)
+    ratings = np.where(has_signal, np.clip(np.floor(stars + 0.5), 1, 5), NEUTRAL_RATING).astype(np.int64)
+    confidence = np.abs(polarity) * (1 - np.exp(-mass / RATING_SCALE))
+    return ratings, np.round(confidence, 3)
+
+
+def rating_stars(score: int) -> str:
+    return "⭐" * score + "☆" * (5 - score)
+
+
+# -------------------- CORPUS AUDIT --------------------
+def load_corpus_reviews(path: str) -> List[Dict[str, Any]]:
+    """Flatten the reviews of every stored property into {propid, index, rating_value, review}"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    rows = []
+    for prop_id, output in data.items():
+        reviews = output.get("reviews") if isinstance(output, dict) else None
+        for index, review in enumerate(reviews or []):
+            if isinstance(review, dict) and review.get("review"):
+                rows.append({
+                    "propid": prop_id,
+                    "index": index,
+                    "rating_value": review.get("rating_value"),
+                    "review": review["review"],
+                })
+    return rows
+
+
+def audit_corpus(path: str = GENERATED_DATA_FILE, limit: int = 20) -> Dict[str, Any]:
+    """Re-score every stored review in one batch and report confident disagreements"""
+    rows = load_corpus_reviews(path)
+    ratings, confidence = score_texts([row["review"] for row in rows])
+
+    stored = np.array([row["rating_value"] if isinstance(row["rating_value"], int) else 0 for row in rows], dtype=np.int64)
+    mismatched = (stored > 0) & (np.abs(stored - ratings) >= AUDIT_MIN_GAP) & (confidence >= AUDIT_MIN_CONFIDENCE)
+    examples = []
+    for idx in np.flatnonzero(mismatched)[:limit]:
+        row = rows[idx]
+        examples.append({
+            "propid": row["propid"],
+            "index": row["index"],
+            "stored_rating": int(stored[idx]),
+            "scored_rating": int(ratings[idx]),
+            "confidence": float(confidence[idx]),
+            "review": row["review"][:160],
+        })
+
+    return {
+        "reviews": len(rows),
+        "properties": len({row["propid"] for row in rows}),
+        "stored_distribution": {str(r): int((stored == r).sum()) for r in range(1, 6)},
+        "scored_distribution": {str(r): int((ratings == r).sum()) for r in range(1, 6)},
+        "no_signal": int((confidence == 0).sum()),
+        "mismatches": int(mismatched.sum()),
+        "examples": examples,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lexicon sentiment scoring for review ratings")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("audit", help="re-score stored reviews and report rating mismatches")
+    p.add_argument("path", nargs="?", default=GENERATED_DATA_FILE)
+    p.add_argument("--limit", type=int, default=20, help="mismatch examples to print")
+    args = parser.parse_args()
+
+    if args.command == "audit":
+        if not Path(args.path).exists():
+            raise SystemExit(f"{args.path} not found")
+        print(json.dumps(audit_corpus(args.path, args.limit), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
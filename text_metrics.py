@@ -0,0 +1,286 @@
+# text_metrics.py - Plain text and word counts from HTML without building a DOM
+"""
+main.strip_html_tags / count_words used to build a full BeautifulSoup tree just to
+read the text back out. This module yields the same text nodes (what
+BeautifulSoup's stripped_strings gives with "html.parser") in a single forward scan:
+
+  - fast path: text with no markup, or markup made only of simple tags (<p>,
+    <br/>, <strong>, <p class=intro> ...), is cut between the matches of one
+    precompiled regex and well-formed entities (&amp; &#45; &#x2014;) are decoded
+    per text node; this covers generated content and most payload fields;
+  - anything else (comments, quoted attributes, script/style, stray "<", an
+    unknown or unterminated entity such as "&foo;" or "a&ampb") goes through
+    TextScanner, an html.parser subclass that only collects text.
+
+Entities are decoded the way BeautifulSoup's html.parser builder does it (its entity
+table, numeric references through UnicodeDammit), not with html.unescape, whose HTML5
+rules read "&ampb" as "&b". Like BeautifulSoup, text inside script, style and
+template is ignored and CDATA is kept.
+
+    python text_metrics.py check               # equivalence against BeautifulSoup
+    python text_metrics.py bench [--iterations 200]
+"""
+import argparse
+import random
+import re
+import time
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional
+
+from bs4.dammit import EntitySubstitution, UnicodeDammit
+
+# -------------------- CONFIG --------------------
+SKIPPED_TEXT_TAGS = {"script", "style", "template"}
+SIMPLE_TAG_PATTERN = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9]*)(?:\s[^<>\"'&]*)?/?>")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+ENTITY_PATTERN = re.compile(r"&(?:#([0-9]+)|#[xX]([0-9a-fA-F]+)|([a-zA-Z][a-zA-Z0-9]*));")
+DECIMAL_REFERENCE_PATTERN = re.compile(r"^([0-9]+)(.*)", re.DOTALL)
+HEX_REFERENCE_PATTERN = re.compile(r"^([0-9a-f]+)(.*)", re.DOTALL)
+ENTITY_CHARACTERS = EntitySubstitution.HTML_ENTITY_TO_CHARACTER
+
+
+# -------------------- ENTITIES --------------------
+def decode_charref(name: str) -> str:
+    """Text for a numeric reference as html.parser reports it ("45", "x2014", "45x")"""
+    base, pattern = 10, DECIMAL_REFERENCE_PATTERN
+    if name[:1] in ("x", "X"):
+        name, base, pattern = name[1:], 16, HEX_REFERENCE_PATTERN
+    extra = ""
+    try:
+        number = int(name, base)
+    except ValueError:
+        match = pattern.search(name)
+        if match is None:
+            return name
+        number, extra = int(match.group(1), base), match.group(2)
+    return UnicodeDammit.numeric_character_reference(number)[0] + extra
+
+
+def decode_entities(text: str) -> Optional[str]:
+    """Decode well-formed references, or None if any "&" needs the full scanner"""
+    pieces = []
+    position = 0
+    for match in ENTITY_PATTERN.finditer(text):
+        decimal, hexadecimal, name = match.groups()
+        if name is not None:
+            character = ENTITY_CHARACTERS.get(name)
+            if character is None:
+                return None
+        else:
+            character = UnicodeDammit.numeric_character_reference(int(decimal or hexadecimal, 10 if decimal else 16))[0]
+        pieces.append(text[position:match.start()])
+        pieces.append(character)
+        position = match.end()
+    if text.count("&") != len(pieces) // 2:
+        return None
+    pieces.append(text[position:])
+    return "".join(pieces)
+
+
+# -------------------- SCANNERS --------------------
+class TextScanner(HTMLParser):
+    """Collects the stripped, non-empty text nodes of a document"""
+
+    def __init__(self):
+        # References are decoded in handle_charref / handle_entityref, as BeautifulSoup does
+        super().__init__(convert_charrefs=False)
+        self.nodes: List[str] = []
+        self._pending: List[str] = []
+        self._skip_depth = 0
+
+    def flush(self) -> None:
+        if self._pending:
+            text = "".join(self._pending).strip()
+            self._pending = []
+            if text and not self._skip_depth:
+                self.nodes.append(text)
+
+    def handle_starttag(self, tag, attrs):
+        self.flush()
+        if tag in SKIPPED_TEXT_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        self.flush()
+        if tag in SKIPPED_TEXT_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.flush()
+
+    def handle_data(self, data):
+        self._pending.append(data)
+
+    def handle_charref(self, name):
+        self._pending.append(decode_charref(name))
+
+    def handle_entityref(self, name):
+        self._pending.append(ENTITY_CHARACTERS.get(name, f"&{name}"))
+
+    def unknown_decl(self, data):
+        # <![CDATA[...]]> is text to BeautifulSoup
+        self.flush()
+        if data.startswith("CDATA["):
+            self._pending.append(data[6:])
+            self.flush()
+
+    def handle_comment(self, data):
+        self.flush()
+
+    def handle_decl(self, decl):
+        self.flush()
+
+    def handle_pi(self, data):
+        self.flush()
+
+
+def simple_text_nodes(html_text: str) -> Optional[List[str]]:
+    """Text nodes via the regex fast path, or None if the markup needs the full scanner"""
+    entities = "&" in html_text
+    segments = []
+    position = 0
+    for match in SIMPLE_TAG_PATTERN.finditer(html_text):
+        if match.group(2).lower() in SKIPPED_TEXT_TAGS:
+            return None
+        segments.append(html_text[position:match.start()])
+        position = match.end()
+    if html_text.count("<") != len(segments):
+        return None
+    segments.append(html_text[position:])
+
+    nodes = []
+    for text in segments:
+        if entities and "&" in text:
+            text = decode_entities(text)
+            if text is None:
+                return None
+        text = text.strip()
+        if text:
+            nodes.append(text)
+    return nodes
+
+
+def text_nodes(html_text: str) -> List[str]:
+    """Stripped, non-empty text nodes in document order"""
+    if not html_text:
+        return []
+    nodes = simple_text_nodes(html_text)
+    if nodes is not None:
+        return nodes
+    scanner = TextScanner()
+    scanner.feed(html_text)
+    scanner.close()
+    scanner.flush()
+    return scanner.nodes
+
+
+def plain_text(html_text: str) -> str:
+    """Text with tags removed and whitespace collapsed (main.strip_html_tags)"""
+    return WHITESPACE_PATTERN.sub(" ", " ".join(text_nodes(html_text))).strip()
+
+
+def word_count(html_text: str) -> int:
+    return len(plain_text(html_text).split())
+
+
+# -------------------- EQUIVALENCE CHECK AND BENCHMARK --------------------
+SAMPLE_HTML = [
+    "",
+    "Plain text without any markup at all.",
+    "<p>Located in Whitefield, Bengaluru.</p>\n<p>Close to ITPL &amp; the metro.</p>",
+    "<p><strong>Connectivity:</strong> 2 km from the ORR<br>Schools nearby<br/>Hospitals</p>",
+    "<p class=intro>Spacious 2 and 3 BHK homes</p><ul><li>Pool</li><li>Gym</li></ul>",
+    '<div class="desc"><p style="text-align: justify;">Well-known builder&nbsp;&nbsp;with 20 years</p></div>',
+    "<h2>Overview</h2><!-- editor note --><p>Price from ₹ 0.45 Cr - 0.80 Cr</p>",
+    "<p>a<script>var x = 1 < 2;</script>b</p><style>p { color: red }</style>c",
+    "<!DOCTYPE html><html><body><p>Full page</p></body></html>",
+    "1 < 2 and 3 > 2, text <",
+    "<p>Unclosed paragraph<p>another one",
+    "<p>x</p  >y<br />z<textarea>t<b>bold</b></textarea>",
+    "a<![CDATA[raw]]>b &#45; &#x2014; c",
+    "<p>a&ampb &foo; &amp &#150; &#0; &#x110000; &#45x &#; & alone &copy2024</p>",
+]
+SAMPLE_PIECES = [
+    "<p>", "</p>", "word", " well-known ", " — ", "\n\n", "<br>", "<strong>Bold</strong>", "&amp;",
+    "&nbsp;", " x - y ", "<ul><li>one</li><li>two</li></ul>", "  ", "\n", "<div class='a-b'>",
+    "</div>", "text–dash", "<!-- c -->", "<p class=lead>", "<em>", "</em>", "3 < 4", "<br/>",
+    "&ampb", "&foo;", "&amp", "&#150;", "&#x2014;", "&#45x", "&", "&lt;", "&copy", "&nbsp", "&#",
+]
+
+
+def reference_text_nodes(html_text: str) -> List[str]:
+    from bs4 import BeautifulSoup
+    return list(BeautifulSoup(html_text, "html.parser").stripped_strings) if html_text else []
+
+
+def reference_plain_text(html_text: str) -> str:
+    """The previous main.strip_html_tags"""
+    if not html_text:
+        return ""
+    from bs4 import BeautifulSoup
+    text = BeautifulSoup(html_text, "html.parser").get_text(separator=" ", strip=True)
+    return WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def sample_documents(count: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    generated = ["".join(rng.choice(SAMPLE_PIECES) for _ in range(rng.randint(0, 40))) for _ in range(count)]
+    return SAMPLE_HTML + generated
+
+
+def check_equivalence(count: int = 2000) -> Dict[str, int]:
+    """Compare text nodes, plain text and word counts with BeautifulSoup"""
+    result = {"documents": 0, "text_node_mismatches": 0, "plain_text_mismatches": 0, "word_count_mismatches": 0}
+    for html_text in sample_documents(count):
+        result["documents"] += 1
+        if text_nodes(html_text) != reference_text_nodes(html_text):
+            result["text_node_mismatches"] += 1
+        expected = reference_plain_text(html_text)
+        if plain_text(html_text) != expected:
+            result["plain_text_mismatches"] += 1
+        if word_count(html_text) != len(expected.split()):
+            result["word_count_mismatches"] += 1
+    return result
+
+
+def benchmark(iterations: int = 200) -> Dict[str, Dict[str, float]]:
+    """Time plain_text against the BeautifulSoup version on typical property fields"""
+    description = "\n".join(f"<p>Paragraph {i} about the project, its amenities &amp; the locality.</p>" for i in range(30))
+    generated = "\n\n".join(f"<p><strong>Point {i}:</strong> spacious homes near the metro<br>schools nearby</p>" for i in range(20))
+    documents = {"payload description": description, "generated section": generated, "plain text": "word " * 400}
+
+    def timed(func: Callable[[str], str], text: str) -> float:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func(text)
+        return (time.perf_counter() - start) / iterations * 1e6
+
+    results = {}
+    for name, text in documents.items():
+        old = timed(reference_plain_text, text)
+        new = timed(plain_text, text)
+        results[name] = {"beautifulsoup_us": round(old, 1), "text_metrics_us": round(new, 1), "speedup": round(old / new, 1)}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Streaming HTML text metrics")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("check", help="compare against BeautifulSoup over sample HTML")
+    p.add_argument("--documents", type=int, default=2000, help="random documents on top of the fixed samples")
+    p = sub.add_parser("bench", help="benchmark against the BeautifulSoup version")
+    p.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.command == "check":
+        result = check_equivalence(args.documents)
+        print(result)
+        if any(value for key, value in result.items() if key.endswith("_mismatches")):
+            raise SystemExit(1)
+    elif args.command == "bench":
+        for name, timing in benchmark(args.iterations).items():
+            print(f"{name:20s} {timing['beautifulsoup_us']:9.1f} us -> {timing['text_metrics_us']:8.1f} us  ({timing['speedup']}x)")
+
+
+if __name__ == "__main__":
+    main()